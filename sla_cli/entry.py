@@ -21,6 +21,7 @@ if __name__ == '__main__':
 from sla_cli.src.common.logger.init_logger import init_logger
 from sla_cli.src.common.versioning import get_version
 from sla_cli.src.common.console import init_colorama, init_progress_bars
+from sla_cli.src.common.events import PROGRESS_MODES
 from sla_cli.src.common.config import Config
 
 from sla_cli.src.cli.context import GROUP_CONTEXT_SETTINGS
@@ -45,9 +46,12 @@ class CliParameters:
 @click.option("-v", "--version", is_flag=True, help="Show the current version of the tool.")
 @click.option("-d", "--debug", is_flag=True, help="Runs the tool in debug mode.")
 @click.option("-f", "--config-file", type=click.STRING, help="Explicitly load a file configuration from a given path.")
+@click.option("--progress", type=click.Choice(PROGRESS_MODES), default="auto", show_default=True,
+              help="How progress is reported. 'bar' draws progress bars, 'jsonl' writes JSON line events to stderr, 'auto' draws bars on a terminal and writes events otherwise.")
+@click.option("--progress-interval", type=click.FloatRange(min=0), default=1.0, show_default=True, help="The minimum seconds between progress events of a task, in 'jsonl' mode.")
 @init_colorama
-@init_progress_bars
 @init_logger
+@init_progress_bars
 @kwargs_to_dataclass(CliParameters)
 @click.pass_context
 def cli(ctx: Context, params: CliParameters):
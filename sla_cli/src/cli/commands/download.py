@@ -6,7 +6,7 @@ Date:       10 April 2021
 import logging
 import os
 from typing import List
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, asdict, replace
 
 import click
 from click import Context
@@ -14,9 +14,13 @@ from click import Context
 from sla_cli.src.cli.context import COMMAND_CONTEXT_SETTINGS
 from sla_cli.src.cli.utils import kwargs_to_dataclass, default_from_context
 from sla_cli.src.db.accessors import AccessorFactory
-from sla_cli.src.download import Downloader, DownloaderOptions, DummyDownloader
+from sla_cli.src.download import Downloader, DownloaderOptions, DummyDownloader, FileDownloader, HttpClient
+from sla_cli.src.download.scheduler import DownloadScheduler, DownloadJob
 
 from sla_cli.src.download.isic import IsicMetadataDownloader, IsicImageDownloader
+from sla_cli.src.download.isic.query import QueryError, validate
+from sla_cli.src.download.isic.consolidated import ConsolidatedIsicDownloader
+from sla_cli.src.download.isic.metadata import METADATA_COLUMNS
 from sla_cli.src.download.ph2 import Ph2Downloader
 from sla_cli.src.download.pad_ufes_20 import PadUfes20Downloader
 from sla_cli.src.download.mednode import MednodeDownloader
@@ -33,6 +37,15 @@ class DownloadParameters:
     skip: bool
     metadata_as_name: bool
     isic_meta: bool
+    refresh: bool
+    jobs: int
+    where: str
+    per_class: int
+    max_images: int
+    seed: int
+    label: List[str]
+    metadata_only: bool
+    repair: bool
 
 
 @click.command(**COMMAND_CONTEXT_SETTINGS, short_help="Downloads available datasets.")
@@ -42,6 +55,15 @@ class DownloadParameters:
 @click.option("-c", "--clean", type=click.BOOL, is_flag=True, help="Remove archive files directly after extraction.")
 @click.option("-s", "--skip", type=click.BOOL, is_flag=True, help="Skip the download phase, useful for running builds on previously downloaded archives.")
 @click.option("--isic-meta", type=click.BOOL, is_flag=True, help="Download the ISIC Archive metadata instead of a dataset.")
+@click.option("--refresh", type=click.BOOL, is_flag=True, help="With '--isic-meta', only fetch the ISIC Archive metadata added or changed since the last sync.")
+@click.option("-w", "--where", type=click.STRING, default=None, help="Only download the ISIC images whose metadata matches an expression, i.e. \"dx in ['melanoma', 'nevus'] and age_approx >= 40\".")
+@click.option("--per-class", type=click.IntRange(min=1), default=None, help="Download at most N ISIC images of each diagnosis ('dx') class.")
+@click.option("--max-images", type=click.IntRange(min=1), default=None, help="Download at most N ISIC images, sampled in proportion to the diagnosis ('dx') classes.")
+@click.option("--seed", type=click.INT, default=0, show_default=True, help="The seed of the '--per-class' and '--max-images' samples.")
+@click.option("--label", type=click.STRING, multiple=True, help="Only fetch the images of a diagnosis, for datasets labelled by their folders, i.e. MEDNODE. May be given more than once.")
+@click.option("--metadata-only", type=click.BOOL, is_flag=True, help="Only fetch the metadata of ZIP datasets, i.e. PAD-UFES-20.")
+@click.option("--repair", type=click.BOOL, is_flag=True, help="Only fetch the images and metadata missing from an existing ZIP dataset.")
+@click.option("-j", "--jobs", type=click.INT, default=None, help="The number of datasets to download at the same time. Default is 'scheduler.max_datasets' from the config.")
 @click.option("--metadata-as-name", type=click.BOOL, is_flag=True, help="Saves the dataset metadata as the dataset name. Helpful for viewing in excel, not optimal for ML pipelines.")
 @kwargs_to_dataclass(DownloadParameters)
 @click.pass_context
@@ -58,36 +80,123 @@ def download(ctx: Context, params: DownloadParameters):
 
     params.datasets = keep
 
+    # Size the shared connection pool to the configured download concurrency, within the global limits.
+    HttpClient.configure(ctx.obj)
+
+    # Check the expression before any download starts.
+    if params.where:
+        try:
+            validate(params.where, columns=METADATA_COLUMNS)
+        except QueryError as e:
+            raise click.BadParameter(e.__str__(), param_hint="'-w' / '--where'")
+
     options = DownloaderOptions(
         destination_directory=params.directory,
         config=ctx.obj,
         force=params.force,
         metadata_as_name=params.metadata_as_name,
         clean=params.clean,
-        skip=params.skip
+        skip=params.skip,
+        where=params.where,
+        per_class=params.per_class,
+        max_images=params.max_images,
+        seed=params.seed,
+        labels=list(params.label),
+        metadata_only=params.metadata_only,
+        repair=params.repair
     )
 
     # Download only the ISIC metadata.
     if params.isic_meta:
         options.url = datasets.datasets["ham10000"].info.download[0]
-        IsicMetadataDownloader(options=options)
+        downloader = IsicMetadataDownloader(options=options)
+
+        if params.refresh:
+            downloader.refresh()
+        else:
+            downloader.download()
     else:
         size = sum([datasets.datasets[dataset].info.size for dataset in params.datasets])
         logger.info(f"Total size of requested download: {size} MB.")
 
+        if params.where or params.per_class or params.max_images:
+            for dataset in params.datasets:
+                if downloader_factory(dataset) is not IsicImageDownloader:
+                    logger.warning(f"'--where', '--per-class' and '--max-images' only apply to ISIC datasets, all of '{dataset}' will be downloaded.")
+
+        if params.label or params.metadata_only or params.repair:
+            for dataset in params.datasets:
+                downloader = downloader_factory(dataset)
+                if not (issubclass(downloader, FileDownloader) and downloader.fetches_members()):
+                    logger.warning(f"'--label', '--metadata-only' and '--repair' only apply to ZIP datasets, all of '{dataset}' will be downloaded.")
+                elif params.label and not downloader.__layout__.labels:
+                    logger.warning(f"'--label' only applies to datasets labelled by their folders, all images of '{dataset}' will be fetched.")
+
+        jobs = []
+        consolidated = []
         for dataset in params.datasets:
-            # Get the downloader object for the given dataset.
-            downloader = downloader_factory(dataset)
+            # Each dataset gets its own options, as downloads run at the same time.
+            dataset_options = replace(
+                options,
+                dataset=dataset,
+                url=datasets.datasets[dataset].info.download[0],
+                size=datasets.datasets[dataset].info.size,
+                checksum=datasets.datasets[dataset].info.checksum
+            )
+
+            if downloader_factory(dataset) is IsicImageDownloader:
+                consolidated.append(dataset_options)
+            else:
+                jobs.append(DownloadJob(name=dataset, size=dataset_options.size, run=make_download(dataset, dataset_options)))
+
+        if ctx.obj.isic.consolidate and ctx.obj.unzip and len(consolidated) > 1:
+            # Download the ISIC datasets together, in shared full batches.
+            size = sum(dataset_options.size for dataset_options in consolidated)
+            jobs.append(DownloadJob(name="isic", size=size, run=make_consolidated_download(consolidated)))
+        else:
+            for dataset_options in consolidated:
+                jobs.append(DownloadJob(name=dataset_options.dataset, size=dataset_options.size, run=make_download(dataset_options.dataset, dataset_options)))
 
-            # Add dataset to options.
-            options.dataset = dataset
-            options.url = datasets.datasets[dataset].info.download[0]
-            options.size = datasets.datasets[dataset].info.size
+        max_datasets = params.jobs if params.jobs is not None else ctx.obj.scheduler.max_datasets
+        failed = DownloadScheduler(max_datasets=max(1, max_datasets)).run(jobs)
 
-            # Download the dataset.
-            downloader = downloader(options=options)
+        # The other datasets are downloaded first, then the command fails so CI and headless runs see it.
+        if failed:
+            logger.error(f"Failed to download: {', '.join(failed)}.")
+            ctx.exit(1)
 
-            downloader.download()
+
+def make_download(dataset: str, options: DownloaderOptions) -> callable:
+    """
+    Creates the callable that downloads a dataset.
+
+    :param dataset: The dataset name.
+    :param options: The options of the dataset downloader.
+    :return: A callable creating the downloader and downloading the dataset.
+    """
+
+    def run():
+        # Get the downloader object for the given dataset.
+        downloader = downloader_factory(dataset)
+
+        # Download the dataset.
+        downloader(options=options).download()
+
+    return run
+
+
+def make_consolidated_download(options: List[DownloaderOptions]) -> callable:
+    """
+    Creates the callable that downloads several ISIC datasets in shared batches.
+
+    :param options: The options of each ISIC dataset downloader.
+    :return: A callable creating the downloaders and downloading the datasets.
+    """
+
+    def run():
+        ConsolidatedIsicDownloader([IsicImageDownloader(options=dataset_options) for dataset_options in options]).download()
+
+    return run
 
 
 def downloader_factory(dataset) -> Downloader:
@@ -5,4 +5,6 @@ Date:       10 April 2021
 
 from .config import Config
 from .config import Isic
+from .config import Http
+from .config import Scheduler
 from .utils import inject_config
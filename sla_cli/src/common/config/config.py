@@ -12,7 +12,7 @@ import attr
 from attr.validators import instance_of
 import yaml
 
-from sla_cli.src.common.config.validators import is_between, greater_than
+from sla_cli.src.common.config.validators import is_between, greater_than, one_of
 
 logger = logging.getLogger(__name__)
 
@@ -22,6 +22,41 @@ class Isic:
     """Maps the 'isic' options in the config file."""
     batch_size: int = attr.ib(validator=[instance_of(int), is_between(0, 300)], default=300)
     max_workers: int = attr.ib(validator=[instance_of(int), greater_than(0)], default=5)
+    engine: str = attr.ib(validator=[instance_of(str), one_of(["threads", "asyncio"])], converter=lambda x: x.lower(), default="threads")
+    max_in_flight: int = attr.ib(validator=[instance_of(int), greater_than(0)], default=5)
+    stream_extract: bool = attr.ib(validator=instance_of(bool), default=True)
+    extract_workers: int = attr.ib(validator=[instance_of(int), greater_than(0)], default=2)
+    extract_queue_size: int = attr.ib(validator=[instance_of(int), greater_than(-1)], default=4)
+    adaptive: bool = attr.ib(validator=instance_of(bool), default=False)
+    retry_attempts: int = attr.ib(validator=[instance_of(int), greater_than(-1)], default=3)
+    retry_batch_size: int = attr.ib(validator=[instance_of(int), is_between(1, 300)], default=10)
+    metadata_workers: int = attr.ib(validator=[instance_of(int), greater_than(0)], default=4)
+    stream_metadata: bool = attr.ib(validator=instance_of(bool), default=False)
+    per_dataset_metadata: bool = attr.ib(validator=instance_of(bool), default=False)
+    consolidate: bool = attr.ib(validator=instance_of(bool), default=False)
+
+
+@attr.s
+class Http:
+    """Maps the 'http' options in the config file."""
+    connect_timeout: float = attr.ib(validator=[instance_of(float), greater_than(0)], converter=float, default=10.0)
+    read_timeout: float = attr.ib(validator=[instance_of(float), greater_than(0)], converter=float, default=60.0)
+    retries: int = attr.ib(validator=[instance_of(int), greater_than(-1)], default=5)
+    backoff: float = attr.ib(validator=[instance_of(float), greater_than(-1)], converter=float, default=0.5)
+    max_backoff: float = attr.ib(validator=[instance_of(float), greater_than(-1)], converter=float, default=30.0)
+    breaker_threshold: int = attr.ib(validator=[instance_of(int), greater_than(0)], default=10)
+    breaker_reset: float = attr.ib(validator=[instance_of(float), greater_than(-1)], converter=float, default=30.0)
+    segments: int = attr.ib(validator=[instance_of(int), greater_than(0)], default=4)
+    min_segment_size: float = attr.ib(validator=[instance_of(float), greater_than(0)], converter=float, default=8.0)
+    buffer_size: float = attr.ib(validator=[instance_of(float), is_between(1, 1024)], converter=float, default=1.0)
+
+
+@attr.s
+class Scheduler:
+    """Maps the 'scheduler' options in the config file."""
+    max_datasets: int = attr.ib(validator=[instance_of(int), greater_than(0)], default=4)
+    max_connections: int = attr.ib(validator=[instance_of(int), greater_than(-1)], default=0)
+    max_bandwidth: float = attr.ib(validator=[instance_of(float), greater_than(-1)], converter=float, default=0.0)
 
 
 def flag_if_empty(func):
@@ -44,7 +79,10 @@ class Config:
     isic: Isic = attr.ib(validator=instance_of(Isic), converter=lambda config: Isic(**config))
     data_directory: str = attr.ib(validator=instance_of(str), default=os.getcwd())
     unzip: bool = attr.ib(validator=instance_of(bool), default=True)
+    extract_workers: int = attr.ib(validator=[instance_of(int), greater_than(-1)], default=0)
     convert: str = attr.ib(validator=instance_of(str), converter=lambda x: x.lower(), default="original")
+    http: Http = attr.ib(validator=instance_of(Http), converter=lambda config: Http(**config), default=attr.Factory(dict))
+    scheduler: Scheduler = attr.ib(validator=instance_of(Scheduler), converter=lambda config: Scheduler(**config), default=attr.Factory(dict))
 
     def __getitem__(self, item):
         """Allows [] indexing"""
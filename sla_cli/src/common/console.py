@@ -6,9 +6,13 @@ Date:       09 April 2021
 import logging
 from functools import wraps
 
+import click
 import colorama
 from alive_progress import config_handler
 
+from sla_cli.src.common.events import EventStream, EventLogHandler, resolve_mode
+from sla_cli.src.common.progress import Progress
+
 logger = logging.getLogger(__name__)
 
 
@@ -25,10 +29,15 @@ def init_colorama(func):
 
 
 def init_progress_bars(func):
-    """Initialises the progress bar configuration."""
+    """
+    Initialises the progress bar configuration.
+
+    In 'jsonl' mode, or in 'auto' mode when stdout is not a terminal, progress bars are replaced by
+    structured events written to stderr as JSON lines, with warnings and errors forwarded as events.
+    """
 
     @wraps(func)
-    def init_progress_bars_wrapper(*args, **kwargs):
+    def init_progress_bars_wrapper(*args, progress: str = "auto", progress_interval: float = 1.0, **kwargs):
         config_handler.set_global(
             title_length=40,
             spinner="classic",
@@ -36,6 +45,19 @@ def init_progress_bars(func):
             bar="classic"
         )
 
+        if resolve_mode(progress) == "jsonl":
+            events = EventStream(interval=progress_interval)
+            handler = EventLogHandler(events)
+            Progress.events = events
+            logging.getLogger().addHandler(handler)
+
+            def reset():
+                Progress.events = None
+                logging.getLogger().removeHandler(handler)
+
+            # Events stay enabled while the sub-command runs, after this group callback returns.
+            click.get_current_context().call_on_close(reset)
+
         return func(*args, **kwargs)
 
     return init_progress_bars_wrapper
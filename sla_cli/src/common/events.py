@@ -0,0 +1,111 @@
+"""
+Author:     David Walshe
+Date:       17 October 2026
+"""
+
+import logging
+import sys
+import json
+import time
+import threading
+from typing import Dict, TextIO, Union
+
+logger = logging.getLogger(__name__)
+
+# Progress reporting modes accepted by '--progress'.
+PROGRESS_MODES = ["auto", "bar", "jsonl"]
+
+
+def resolve_mode(mode: str, stream: TextIO = None) -> str:
+    """
+    Resolves the progress mode, 'auto' showing bars on a terminal and emitting events otherwise.
+
+    :param mode: The requested mode.
+    :param stream: The stream progress bars are drawn on, stdout if not given.
+    :return: Either 'bar' or 'jsonl'.
+    """
+    if mode != "auto":
+        return mode
+
+    stream = stream if stream is not None else sys.stdout
+    try:
+        return "bar" if stream.isatty() else "jsonl"
+    except (AttributeError, ValueError):
+        return "jsonl"
+
+
+class EventStream:
+
+    def __init__(self, stream: TextIO = None, interval: float = 1.0):
+        """
+        Writes structured events as JSON lines, for headless runs tracked by another program.
+
+        Every event is one JSON object with at least the 'event' type and a 'time' in seconds since
+        the epoch. Progress events are limited to one per task each 'interval' seconds, other events,
+        such as phase transitions, batches and errors, are written as they happen.
+
+        :param stream: The stream to write to, stderr if not given.
+        :param interval: The minimum seconds between progress events of a task.
+        """
+        self.stream = stream if stream is not None else sys.stderr
+        self.interval = interval
+        self._last: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def emit(self, event: str, **fields) -> None:
+        """
+        Writes an event.
+
+        :param event: The event type, i.e. 'phase', 'progress', 'batch' or 'error'.
+        :param fields: The fields of the event, None values are left out.
+        """
+        record = {"event": event, "time": round(time.time(), 3)}
+        record.update({key: value for key, value in fields.items() if value is not None})
+        line = json.dumps(record, default=str)
+
+        with self._lock:
+            self.stream.write(line + "\n")
+            self.stream.flush()
+
+    def progress(self, task: str, force: bool = False, **fields) -> bool:
+        """
+        Writes a progress event for a task, unless one was written for it within the interval.
+
+        :param task: The name of the task.
+        :param force: Write the event regardless of the interval, i.e. for the final state.
+        :param fields: The fields of the event.
+        :return: True if the event was written.
+        """
+        now = time.monotonic()
+        with self._lock:
+            if not force and now - self._last.get(task, float("-inf")) < self.interval:
+                return False
+            self._last[task] = now
+
+        self.emit("progress", task=task, **fields)
+
+        return True
+
+
+class EventLogHandler(logging.Handler):
+
+    def __init__(self, events: EventStream, level: int = logging.WARNING):
+        """
+        Forwards warning and error log records as events.
+
+        :param events: The event stream to write to.
+        :param level: The lowest level forwarded.
+        """
+        super().__init__(level=level)
+        self.events = events
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            self.events.emit("error" if record.levelno >= logging.ERROR else "warning", message=record.getMessage(), logger=record.name)
+        except Exception:
+            self.handleError(record)
+
+
+def task_name(name: Union[str, None], title: Union[str, None]) -> str:
+    """Returns the name a task is reported under, its dataset if known, otherwise its title."""
+    return name or (title or "").replace("[SLA] - INFO - - - ", "").strip()
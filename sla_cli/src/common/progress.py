@@ -0,0 +1,269 @@
+"""
+Author:     David Walshe
+Date:       17 October 2026
+"""
+
+import logging
+import time
+import threading
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Union
+
+from alive_progress import alive_bar
+
+from sla_cli.src.common.events import EventStream, task_name
+
+logger = logging.getLogger(__name__)
+
+_local = threading.local()
+
+# Seconds between progress updates published by a ProgressTicker.
+TICK_INTERVAL = 0.2
+
+
+class TaskProgress:
+
+    def __init__(self, title: str, total: Union[float, None], manual: bool = False):
+        """
+        Progress of a single task reported into a combined view, mirroring the alive_bar handle.
+
+        :param title: The title of the task.
+        :param total: The total count of the task, or None if unknown.
+        :param manual: If the task reports a completed fraction instead of counts.
+        """
+        self.title = title
+        self.total = total
+        self.manual = manual
+        self.count = 0
+        self.fraction = 0.0
+        self.message = ""
+        self._lock = threading.Lock()
+
+    def __call__(self, *args, text: str = None, incr: int = 1):
+        """Advances the task, by a count, or to a fraction for manual tasks."""
+        with self._lock:
+            if self.manual:
+                if args:
+                    self.fraction = float(args[0])
+            else:
+                self.count += max(0, int(incr))
+            if text is not None:
+                self.message = text
+
+    def text(self, text: str):
+        """Sets the status text of the task."""
+        self.message = text
+
+    @property
+    def percent(self) -> Union[float, None]:
+        """Returns the completed percentage, or None if it is unknown."""
+        if self.manual:
+            return 100 * self.fraction
+        if not self.total:
+            return None
+
+        return 100 * self.count / self.total
+
+    def summary(self) -> str:
+        """Returns a short description of the task state."""
+        percent = self.percent
+        state = self.title.replace("[SLA] - INFO - - - ", "").strip() if percent is None else f"{percent:.0f}%"
+
+        return state
+
+
+class EventTask(TaskProgress):
+
+    def __init__(self, events: EventStream, task: str, title: str, total: Union[float, None], manual: bool = False, unit: str = None):
+        """
+        Progress of a unit of work reported as events instead of a bar, mirroring the alive_bar handle.
+
+        The start and end of the work are written as 'phase' events, its progress as rate limited
+        'progress' events with the count, total and rate in the unit of the work.
+
+        :param events: The event stream to write to.
+        :param task: The name of the task the work belongs to.
+        :param title: The title of the work.
+        :param total: The total count of the work, or None if unknown.
+        :param manual: If the work reports a completed fraction instead of counts.
+        :param unit: The unit counted, i.e. 'images' or 'MB'.
+        """
+        super().__init__(title, total, manual)
+        self.events = events
+        self.task = task
+        self.phase = task_name(None, title)
+        self.unit = unit
+        self.started = time.monotonic()
+
+    def __enter__(self):
+        self.started = time.monotonic()
+        self.events.emit("phase", task=self.task, phase=self.phase, state="start", total=self.total, unit=self.unit)
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self._publish(force=True)
+        self.events.emit("phase", task=self.task, phase=self.phase, state="end" if exc_type is None else "error",
+                         seconds=round(time.monotonic() - self.started, 3), error=None if exc_val is None else str(exc_val))
+
+    def __call__(self, *args, text: str = None, incr: int = 1):
+        super().__call__(*args, text=text, incr=incr)
+        self._publish()
+
+    def _publish(self, force: bool = False):
+        """Writes a progress event, at most one each event interval unless forced."""
+        count = self.fraction * self.total if self.manual and self.total else self.count
+        elapsed = max(time.monotonic() - self.started, 1e-9)
+        self.events.progress(self.task, force=force, phase=self.phase, count=round(count, 3), total=self.total, unit=self.unit,
+                             fraction=round(self.fraction, 4) if self.manual else None, rate=round(count / elapsed, 3),
+                             message=self.message or None)
+
+
+class CombinedProgress:
+
+    def __init__(self, names: List[str], title: str, refresh: float = 0.5):
+        """
+        A single progress view over several tasks running at the same time.
+
+        One bar counts the finished tasks while its text shows the state of each running task,
+        refreshed by a background thread so concurrent tasks never draw over each other.
+
+        :param names: The names of the tasks.
+        :param title: The title of the combined bar.
+        :param refresh: The seconds between refreshes of the status text.
+        """
+        self.names = names
+        self.title = title
+        self.refresh = refresh
+        self.tasks: Dict[str, TaskProgress] = {}
+        self._bar = None
+        self._stop = threading.Event()
+        self._ticker: Union[threading.Thread, None] = None
+
+    def __enter__(self):
+        self._context = alive_bar(len(self.names), title=self.title, enrich_print=False)
+        self._bar = self._context.__enter__()
+        self._ticker = threading.Thread(target=self._tick, daemon=True)
+        self._ticker.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self._stop.set()
+        self._ticker.join()
+        return self._context.__exit__(exc_type, exc_val, exc_tb)
+
+    @contextmanager
+    def task(self, name: str, title: str, total: Union[float, None], manual: bool = False):
+        """
+        Registers a phase of a task, replacing the previous phase of the same name.
+
+        :param name: The name of the task.
+        :param title: The title of the phase.
+        :param total: The total count of the phase.
+        :param manual: If the phase reports a completed fraction instead of counts.
+        """
+        task = TaskProgress(title, total, manual)
+        self.tasks[name] = task
+        yield task
+
+    def finished(self, name: str):
+        """Marks a task as finished."""
+        self.tasks.pop(name, None)
+        self._bar()
+
+    def status(self) -> str:
+        """Returns the status text of the running tasks."""
+        return " | ".join(f"{name}: {task.summary()}" for name, task in list(self.tasks.items()))
+
+    def _tick(self):
+        """Refreshes the status text until the view is closed."""
+        while not self._stop.wait(self.refresh):
+            self._bar.text(self.status())
+
+
+class ProgressTicker:
+
+    def __init__(self, publish: Callable[[], None], interval: float = TICK_INTERVAL):
+        """
+        Publishes progress from a background thread at a fixed rate, so byte loops only count.
+
+        The publish callable reads whatever counters the work updates and reports them, i.e. to a
+        progress bar. It is called once more when the ticker stops, so the final state is shown.
+
+        :param publish: Called to report the current progress.
+        :param interval: The seconds between reports.
+        """
+        self.publish = publish
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread: Union[threading.Thread, None] = None
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self._tick, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self._stop.set()
+        self._thread.join()
+        self.publish()
+
+    def _tick(self):
+        """Publishes the progress until the ticker is stopped."""
+        while not self._stop.wait(self.interval):
+            self.publish()
+
+
+class Progress:
+    """
+    Process wide switch between a progress bar per task and a combined view.
+    """
+    reporter: Union[CombinedProgress, None] = None
+    events: Union[EventStream, None] = None
+
+    @staticmethod
+    def set_task_name(name: Union[str, None]) -> None:
+        """Names the task run by the current thread in the combined view."""
+        _local.name = name
+
+    @staticmethod
+    def task_name() -> Union[str, None]:
+        """Returns the name of the task run by the current thread."""
+        return getattr(_local, "name", None)
+
+
+def emit_event(event: str, **fields) -> None:
+    """
+    Writes a structured event when events are enabled, i.e. a completed batch, tagged with the current task.
+
+    :param event: The event type.
+    :param fields: The fields of the event.
+    """
+    events = Progress.events
+    if events is not None:
+        fields.setdefault("task", Progress.task_name())
+        events.emit(event, **fields)
+
+
+def progress_bar(total: Union[float, None] = None, title: str = None, **options):
+    """
+    Returns a progress bar context manager for a unit of work.
+
+    Uses an alive_bar of its own, unless events are enabled in which case the work is reported as
+    events, or a combined view is active in which case the work is reported as a phase of the
+    current thread's task.
+
+    :param total: The total count of the work, or None if unknown.
+    :param title: The title of the bar.
+    :param options: Any further alive_bar options, and the 'unit' counted by the work.
+    :return: A progress bar context manager.
+    """
+    unit = options.pop("unit", None)
+    events = Progress.events
+    if events is not None:
+        return EventTask(events, task_name(Progress.task_name(), title), title, total, manual=options.get("manual", False), unit=unit)
+
+    reporter = Progress.reporter
+    if reporter is None:
+        return alive_bar(total, title, **options)
+
+    return reporter.task(getattr(_local, "name", None) or title, title, total, manual=options.get("manual", False))
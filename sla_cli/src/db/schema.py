@@ -8,7 +8,7 @@ from typing import Dict, List, Union
 import json
 
 import attr
-from attr.validators import instance_of
+from attr.validators import instance_of, optional
 from colorama import Fore
 
 from sla_cli.src.common.path import Path
@@ -31,6 +31,7 @@ class Info(Schema):
     size: float = attr.ib(validator=instance_of(float), converter=lambda size: round(float(size), 2))
     references: Union[List[str]] = attr.ib(validator=instance_of(list))
     download: Union[List[str], None] = attr.ib(default=[""], converter=lambda config: [] if config is None else config)
+    checksum: Union[str, None] = attr.ib(default=None, validator=optional(instance_of(str)))
 
     def __getitem__(self, item):
         """Allows for [] indexing."""
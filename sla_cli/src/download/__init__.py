@@ -4,4 +4,6 @@ Date:       10 April 2021
 """
 
 from .downloader import Downloader, DownloaderOptions, FileDownloader, DummyDownloader
-from .utils import inject_http_session, download_file, unzip_file, move_images
+from .utils import inject_http_session, download_file, unzip_file, move_images, HashingWriter
+from .stream_zip import StreamingZipExtractor
+from .http import HttpClient
@@ -0,0 +1,54 @@
+"""
+Author:     David Walshe
+Date:       17 October 2026
+"""
+
+import logging
+import hashlib
+from dataclasses import dataclass
+
+logger = logging.getLogger(__name__)
+
+
+class ChecksumError(IOError):
+    """Raised when a downloaded archive does not match the checksum recorded for it."""
+
+
+@dataclass
+class Checksum:
+    """
+    :param algorithm: The hashlib algorithm, i.e. 'sha256'.
+    :param digest: The expected hex digest.
+    """
+    algorithm: str
+    digest: str
+
+    @staticmethod
+    def parse(checksum: str) -> "Checksum":
+        """
+        Parses a checksum written as '<algorithm>:<hex digest>', i.e. 'sha256:9f86d0...'.
+
+        :param checksum: The checksum to parse.
+        """
+        algorithm, _, digest = checksum.partition(":")
+        algorithm = algorithm.strip().lower()
+        if not digest or algorithm not in hashlib.algorithms_available:
+            raise ValueError(f"Checksum '{checksum}' is not of the form '<algorithm>:<hex digest>' with a hashlib algorithm.")
+
+        return Checksum(algorithm, digest.strip().lower())
+
+    def hasher(self):
+        """Returns a new hash object of the checksum algorithm."""
+        return hashlib.new(self.algorithm)
+
+    def verify(self, hexdigest: str, name: str) -> None:
+        """
+        Checks a computed digest against the expected one.
+
+        :param hexdigest: The digest of the downloaded bytes.
+        :param name: The name of the download, for the error message.
+        """
+        if hexdigest.lower() != self.digest:
+            raise ChecksumError(f"{name} is corrupt, its {self.algorithm} checksum is {hexdigest} but {self.digest} was expected.")
+
+        logger.debug(f"{name} matches its {self.algorithm} checksum.")
@@ -8,12 +8,15 @@ import os
 from abc import ABCMeta, abstractmethod
 from dataclasses import dataclass
 from functools import wraps
+from typing import List
 import shutil
 
-from alive_progress import alive_bar
 from requests import Session
 
 from sla_cli.src.common.config import Config
+from sla_cli.src.common.progress import progress_bar
+from sla_cli.src.download.layout import Layout, Placed, Rule, IMAGE, METADATA
+from sla_cli.src.download.remote_zip import RemoteZipError
 from sla_cli.src.download.utils import inject_http_session
 
 logger = logging.getLogger(__name__)
@@ -31,6 +34,14 @@ class DownloaderOptions:
     url: str = ""
     dataset: str = ""
     size: float = 0
+    where: str = None
+    per_class: int = None
+    max_images: int = None
+    seed: int = 0
+    checksum: str = None
+    labels: List[str] = None
+    metadata_only: bool = False
+    repair: bool = False
 
 
 class Downloader(metaclass=ABCMeta):
@@ -80,6 +91,10 @@ class Downloader(metaclass=ABCMeta):
     def size(self) -> float:
         return self.options.size
 
+    @property
+    def checksum(self) -> str:
+        return self.options.checksum
+
     @property
     def skip_download(self) -> bool:
         return self.options.skip
@@ -88,6 +103,34 @@ class Downloader(metaclass=ABCMeta):
     def clean(self) -> bool:
         return self.options.clean
 
+    @property
+    def where(self) -> str:
+        return self.options.where
+
+    @property
+    def per_class(self) -> int:
+        return self.options.per_class
+
+    @property
+    def max_images(self) -> int:
+        return self.options.max_images
+
+    @property
+    def seed(self) -> int:
+        return self.options.seed
+
+    @property
+    def labels(self) -> List[str]:
+        return self.options.labels
+
+    @property
+    def metadata_only(self) -> bool:
+        return self.options.metadata_only
+
+    @property
+    def repair(self) -> bool:
+        return self.options.repair
+
 
 def unknown_progress(title: str) -> callable:
     """
@@ -97,16 +140,21 @@ def unknown_progress(title: str) -> callable:
     :param type: The type of spinner to use in the progress bar.
     :return: A progress bar context manager.
     """
-    return alive_bar(None, f"[SLA] - INFO - - - {title}", unknown="stars")
+    return progress_bar(None, f"[SLA] - INFO - - - {title}", unknown="stars")
 
 
 class FileDownloader(Downloader, metaclass=ABCMeta):
+    # Declares where the archive members land, downloaders with a layout are materialized in a single pass.
+    __layout__: Layout = None
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
+        self.placed = Placed()
 
     def download(self, session: Session = None):
         """Downloads and formats a file based dataset."""
+        if self.partial and self.fetches_members():
+            return self._pull()
 
         def dont_skip_download():
             return not self.skip_download
@@ -132,17 +180,77 @@ class FileDownloader(Downloader, metaclass=ABCMeta):
             with unknown_progress(f"Parsing metadata"):
                 self._save_metadata()
 
-            with unknown_progress(f"Moving images"):
-                self._move_images()
+            # Laid out datasets are already in place after extraction.
+            if self.__layout__ is None:
+                with unknown_progress(f"Moving images"):
+                    self._move_images()
+
+                with unknown_progress(f"Cleaning up"):
+                    self._clean_up()
+
+    def _pull(self):
+        """
+        Pulls only the archive members selected by '--label', '--metadata-only' and '--repair'.
+
+        The members are fetched from the remote archive over Range requests, or extracted from the
+        archive on disk with '-s/--skip'. If the server does not serve byte ranges, the whole archive
+        is downloaded and the selected members extracted from it.
+        """
+        # Repairs fill in an existing dataset.
+        if not self.repair and not self._does_not_exist_or_forced():
+            return
+        os.makedirs(self.extracted_path, exist_ok=True)
+
+        if self.skip_download and os.path.exists(self.archive_path):
+            with unknown_progress(f"Extracting"):
+                self._extract()
+        else:
+            try:
+                with unknown_progress(f"Fetching archive members"):
+                    self.placed = self.__layout__.fetch(self.url, self.extracted_path, self.layout_metadata_path, keep=self._keep)
+            except RemoteZipError as e:
+                logger.warning(f"{e.__str__()} Downloading the whole archive instead.")
+                self._download()
+                with unknown_progress(f"Extracting"):
+                    self._extract()
+
+        with unknown_progress(f"Parsing metadata"):
+            self._save_metadata()
 
-            with unknown_progress(f"Cleaning up"):
-                self._clean_up()
+    @classmethod
+    def fetches_members(cls) -> bool:
+        """Returns True if single members of the dataset archive can be pulled, which takes a laid out ZIP archive."""
+        return cls.__layout__ is not None and cls.__archive_name__.endswith(".zip")
+
+    @property
+    def partial(self) -> bool:
+        """Returns True if only some members of the dataset archive are pulled."""
+        return bool(self.labels) or self.metadata_only or self.repair
+
+    def _keep(self, rule: Rule, target: str) -> bool:
+        """
+        Returns True if a member matched by the layout is part of the pull.
+
+        :param rule: The rule matching the member.
+        :param target: The path the member lands at.
+        """
+        if self.metadata_only:
+            return rule.kind == METADATA
+        if self.labels and self.__layout__.labels and rule.kind == IMAGE and rule.label not in self.labels:
+            return False
+
+        return not (self.repair and os.path.exists(target))
 
     @property
     def archive_path(self):
         """Returns the archive save path for the given dataset."""
         return os.path.join(self.destination_directory, self.__archive_name__)
 
+    @property
+    def extract_workers(self) -> int:
+        """Returns the number of processes extracting the dataset archive."""
+        return self.config.extract_workers
+
     @property
     def extracted_path(self):
         """Returns the archive save path for the given dataset."""
@@ -160,6 +268,14 @@ class FileDownloader(Downloader, metaclass=ABCMeta):
         else:
             return os.path.join(self.extracted_path, f"metadata.{fmt}")
 
+    @property
+    def layout_metadata_path(self) -> str:
+        """Returns the destination path of the metadata file matched by the layout, in the format of its rule."""
+        rule = next((rule for rule in self.__layout__.rules if rule.kind == METADATA), None)
+        fmt = os.path.splitext(rule.pattern)[1].lstrip(".") if rule is not None else ""
+
+        return self.metadata_path(fmt or "csv")
+
     def _does_not_exist_or_forced(self) -> bool:
         """
         Checks if the given dataset already exists in the destination folder.
@@ -184,23 +300,23 @@ class FileDownloader(Downloader, metaclass=ABCMeta):
     def _download(self):
         pass
 
-    @abstractmethod
     def _extract(self):
-        pass
+        """Extracts the ZIP archive straight into the dataset layout, downloaders without a layout must extract it themselves."""
+        if self.__layout__ is None:
+            raise NotImplementedError(f"{self.__class__.__name__} has no __layout__, it must implement _extract().")
+
+        self.placed = self.__layout__.materialize(self.archive_path, self.extracted_path, self.layout_metadata_path, self.extract_workers, keep=self._keep)
 
-    @abstractmethod
     def _format_metadata(self):
         pass
 
-    @abstractmethod
     def _save_metadata(self):
         pass
 
-    @abstractmethod
     def _collect_images(self):
-        pass
+        """Returns the absolute paths of the placed images."""
+        return list(self.placed.images)
 
-    @abstractmethod
     def _convert_images(self):
         pass
 
@@ -209,11 +325,9 @@ class FileDownloader(Downloader, metaclass=ABCMeta):
         """Returns the destination folder for images."""
         return os.path.join(self.extracted_path, "images")
 
-    @abstractmethod
     def _move_images(self):
         pass
 
-    @abstractmethod
     def _clean_up(self):
         pass
 
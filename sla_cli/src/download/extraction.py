@@ -0,0 +1,172 @@
+"""
+Author:     David Walshe
+Date:       17 October 2026
+"""
+
+import logging
+import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor, Future
+from threading import BoundedSemaphore
+from typing import Callable, List, Tuple, Union
+from zipfile import ZipFile, ZipInfo
+
+logger = logging.getLogger(__name__)
+
+# Archives holding less than this many uncompressed bytes are extracted in the calling process,
+# where starting a process pool costs more than it saves.
+MIN_PARALLEL_SIZE = 32 * 1024 ** 2
+
+# Size of the buffer members are copied out of an archive with.
+COPY_BUFFER_SIZE = 1024 ** 2
+
+
+class ExtractionPool:
+
+    def __init__(self, max_workers: int, max_queued: int):
+        """
+        Process pool that archives are handed to for extraction once downloaded.
+
+        At most 'max_workers' archives are extracted at once and 'max_queued' more may wait.
+        Submitting beyond that blocks the caller, pushing back on the download stage instead
+        of letting finished archives pile up on disk.
+
+        :param max_workers: The number of extraction processes.
+        :param max_queued: The number of archives that may wait for a free process.
+        """
+        self._executor = ProcessPoolExecutor(max_workers=max_workers)
+        self._slots = BoundedSemaphore(max_workers + max_queued)
+        self._futures: List[Future] = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.shutdown()
+        return False
+
+    def submit(self, fn: Callable, *args, on_done: Callable[[any], None] = None) -> Future:
+        """
+        Schedules an extraction, blocking while the queue is full.
+
+        :param fn: A picklable, module level function performing the extraction.
+        :param args: The arguments to call the function with.
+        :param on_done: Called with the function's result once the extraction succeeds.
+        :return: The future of the extraction.
+        """
+        self._slots.acquire()
+        future = self._executor.submit(fn, *args)
+        future.add_done_callback(lambda f: self._done(f, on_done))
+        self._futures.append(future)
+
+        return future
+
+    def _done(self, future: Future, on_done: Callable[[any], None]):
+        """Frees a queue slot and reports the result of an extraction."""
+        self._slots.release()
+        try:
+            result = future.result()
+            if on_done is not None:
+                on_done(result)
+        except Exception as e:
+            logger.warning(f"Extraction failed: {e.__str__()}")
+
+    def shutdown(self):
+        """Waits for all scheduled extractions to finish."""
+        self._executor.shutdown(wait=True)
+
+
+def resolve_workers(max_workers: int) -> int:
+    """Returns the number of extraction processes, one per CPU if 'max_workers' is 0."""
+    return max_workers if max_workers > 0 else (os.cpu_count() or 1)
+
+
+def extract_members(archive: str, members: List[Tuple[str, str]]) -> int:
+    """
+    Extracts some members of a ZIP archive, run in an extraction process with its own file handle.
+
+    :param archive: The path of the archive.
+    :param members: The (member name, target path) of each member to extract.
+    :return: The number of members extracted.
+    """
+    with ZipFile(archive, "r") as zf:
+        for name, target in members:
+            if name.endswith("/"):
+                os.makedirs(target, exist_ok=True)
+                continue
+            with zf.open(name) as src, open(target, "wb") as dst:
+                shutil.copyfileobj(src, dst, COPY_BUFFER_SIZE)
+
+    return len(members)
+
+
+def split_members(infos: List[ZipInfo], parts: int) -> List[List[str]]:
+    """
+    Splits the members of an archive into parts of near equal uncompressed size, largest members placed first.
+
+    :param infos: The members of the archive.
+    :param parts: The maximum number of parts.
+    :return: The member names of each non empty part.
+    """
+    sizes = [0] * max(1, parts)
+    split = [[] for _ in sizes]
+    for info in sorted(infos, key=lambda info: info.file_size, reverse=True):
+        smallest = sizes.index(min(sizes))
+        split[smallest].append(info.filename)
+        sizes[smallest] += info.file_size
+
+    return [members for members in split if members]
+
+
+def extract_archives(archives: List[Tuple[str, str]], max_workers: int = 0, keep: Union[Callable[[str], bool], None] = None,
+                     route: Union[Callable[[str, str], Union[str, None]], None] = None) -> int:
+    """
+    Extracts several ZIP archives at once, splitting the members of each across a process pool.
+
+    Each extraction process opens the archive with its own file handle. The folders of every member
+    are created up front, so the processes never race to create a shared parent folder. Small
+    extractions, or a single worker, run in the calling process.
+
+    :param archives: The (archive, destination) paths of each archive.
+    :param max_workers: The number of extraction processes, one per CPU if 0.
+    :param keep: Predicate on member names, members it rejects are not extracted.
+    :param route: Returns the path a member is written to, given its name and destination, or None to skip
+                  it. Members keep their archive path under the destination if not given.
+    :return: The number of members extracted.
+    """
+    route = route if route is not None else _member_path
+    plan = []
+    total_size = 0
+    for archive, destination in archives:
+        with ZipFile(archive, "r") as zf:
+            infos = [info for info in zf.infolist() if keep is None or keep(info.filename)]
+        targets = {info.filename: route(destination, info.filename) for info in infos}
+        infos = [info for info in infos if targets[info.filename] is not None]
+        for info in infos:
+            os.makedirs(os.path.dirname(targets[info.filename]), exist_ok=True)
+        plan.append((archive, infos, targets))
+        total_size += sum(info.file_size for info in infos)
+
+    workers = resolve_workers(max_workers)
+    if workers <= 1 or total_size < MIN_PARALLEL_SIZE:
+        return sum(extract_members(archive, [(info.filename, targets[info.filename]) for info in infos]) for archive, infos, targets in plan)
+
+    logger.debug(f"Extracting {len(archives)} archives of {total_size} bytes over {workers} processes.")
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(extract_members, archive, [(name, targets[name]) for name in members])
+                   for archive, infos, targets in plan for members in split_members(infos, workers)]
+
+        return sum(future.result() for future in futures)
+
+
+def _member_path(destination: str, name: str) -> str:
+    """
+    Returns the path a member is extracted to, sanitised as ZipFile.extract does.
+
+    :param destination: The path to extract to.
+    :param name: The member name.
+    """
+    parts = os.path.splitdrive(name.replace("/", os.sep))[1].split(os.sep)
+    parts = [part for part in parts if part not in ("", os.curdir, os.pardir)]
+
+    return os.path.join(destination, *parts)
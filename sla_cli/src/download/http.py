@@ -0,0 +1,298 @@
+"""
+Author:     David Walshe
+Date:       17 October 2026
+"""
+
+import logging
+import random
+import time
+from threading import Lock
+from typing import Dict, Union
+from urllib.parse import urlsplit
+
+from requests import Session, Response
+from requests.adapters import HTTPAdapter
+from requests.exceptions import ConnectionError, HTTPError, Timeout
+
+from sla_cli.src.common.config import Config, Http, Scheduler
+
+logger = logging.getLogger(__name__)
+
+# Status codes that indicate a transient server side problem worth retrying.
+RETRY_STATUSES = frozenset([408, 429, 500, 502, 503, 504])
+
+
+class CircuitOpenError(ConnectionError):
+    """Raised when requests to a host are refused because its circuit breaker is open."""
+
+
+class CircuitBreaker:
+
+    def __init__(self, threshold: int, reset_timeout: float):
+        """
+        Stops requests to a host after repeated failures, failing fast instead of piling up hung requests.
+
+        After 'threshold' consecutive failures the breaker opens and refuses requests. Once 'reset_timeout'
+        seconds have passed a single trial request is let through, closing the breaker again on success.
+
+        :param threshold: The number of consecutive failures that opens the breaker.
+        :param reset_timeout: The seconds to wait before trying the host again.
+        """
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Union[float, None] = None
+        self._trial = False
+        self._lock = Lock()
+
+    @property
+    def is_open(self) -> bool:
+        """Checks if the breaker is currently refusing requests."""
+        return self.opened_at is not None
+
+    def before_request(self, host: str) -> None:
+        """
+        Checks a request may be made, raising if the breaker is open.
+
+        :param host: The host being requested, for error reporting.
+        """
+        with self._lock:
+            if self.opened_at is None:
+                return
+            if not self._trial and time.monotonic() - self.opened_at >= self.reset_timeout:
+                # Half open, let one trial request through.
+                self._trial = True
+                return
+
+        raise CircuitOpenError(f"Too many failed requests to '{host}', not retrying for {self.reset_timeout}s.")
+
+    def record_success(self) -> None:
+        """Closes the breaker after a successful request."""
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial = False
+
+    def record_failure(self) -> None:
+        """Counts a failed request, opening the breaker once the threshold is reached."""
+        with self._lock:
+            self.failures += 1
+            if self._trial or self.failures >= self.threshold:
+                if self.opened_at is None or self._trial:
+                    logger.warning(f"Opening circuit breaker after {self.failures} consecutive failed requests.")
+                self.opened_at = time.monotonic()
+                self._trial = False
+
+
+def backoff_delay(attempt: int, backoff: float, max_backoff: float) -> float:
+    """
+    Returns a jittered exponential backoff delay.
+
+    Uses full jitter, a random delay up to the exponential bound, so workers retrying together spread out.
+
+    :param attempt: The number of the failed attempt, starting at 0.
+    :param backoff: The base delay in seconds.
+    :param max_backoff: The upper limit on the delay in seconds.
+    """
+    return random.uniform(0, min(max_backoff, backoff * 2 ** attempt))
+
+
+class Throttle:
+
+    def __init__(self, max_bandwidth: float, burst: float = 1.0):
+        """
+        Token bucket limiting the combined download bandwidth of every worker in the process.
+
+        :param max_bandwidth: The bandwidth limit in MB/s, 0 is unlimited.
+        :param burst: The seconds of bandwidth that may be used in a single burst.
+        """
+        self.rate = max_bandwidth * 1024 ** 2
+        self.capacity = max(self.rate * burst, 1.0)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = Lock()
+
+    @property
+    def unlimited(self) -> bool:
+        """Checks if no bandwidth limit is set."""
+        return self.rate <= 0
+
+    def reserve(self, size: int) -> float:
+        """
+        Takes 'size' bytes from the bucket.
+
+        :param size: The number of bytes received.
+        :return: The seconds the caller must wait to stay within the limit.
+        """
+        if self.unlimited:
+            return 0.0
+
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= size
+
+            return max(0.0, -self.tokens / self.rate)
+
+    def consume(self, size: int) -> None:
+        """Takes 'size' bytes from the bucket, sleeping while the limit is exceeded."""
+        delay = self.reserve(size)
+        if delay > 0:
+            time.sleep(delay)
+
+
+class RetryingSession(Session):
+
+    def __init__(self, settings: Http, pool_size: int, block: bool = False):
+        """
+        HTTP session with a connection pool sized to the download concurrency, default timeouts,
+        retries with jittered exponential backoff and a circuit breaker per host.
+
+        Responses with an error status are raised as HTTPError once the retries are used up.
+
+        :param settings: The HTTP configuration.
+        :param pool_size: The number of connections to keep open per host.
+        :param block: If requests wait for a free connection instead of opening more than 'pool_size' per host.
+        """
+        super().__init__()
+        self.settings = settings
+        self.pool_size = pool_size
+        self.breakers: Dict[str, CircuitBreaker] = {}
+        self._breakers_lock = Lock()
+
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0, pool_block=block)
+        self.mount("http://", adapter)
+        self.mount("https://", adapter)
+
+    @property
+    def timeout(self):
+        """Returns the (connect, read) timeout applied to requests without their own."""
+        return self.settings.connect_timeout, self.settings.read_timeout
+
+    def breaker(self, url: str) -> CircuitBreaker:
+        """Returns the circuit breaker for the host of a URL."""
+        host = urlsplit(url).netloc
+        with self._breakers_lock:
+            if host not in self.breakers:
+                self.breakers[host] = CircuitBreaker(self.settings.breaker_threshold, self.settings.breaker_reset)
+
+            return self.breakers[host]
+
+    def request(self, method: str, url: str, *args, **kwargs) -> Response:
+        """Makes a request, retrying connection errors, timeouts and transient error statuses."""
+        kwargs.setdefault("timeout", self.timeout)
+        breaker = self.breaker(url)
+        host = urlsplit(url).netloc
+
+        attempt = 0
+        while True:
+            breaker.before_request(host)
+            try:
+                res = super().request(method, url, *args, **kwargs)
+                if res.status_code not in RETRY_STATUSES:
+                    breaker.record_success()
+                    res.raise_for_status()
+                    return res
+
+                breaker.record_failure()
+                if attempt >= self.settings.retries:
+                    res.raise_for_status()
+                # Release the connection before waiting to retry.
+                res.close()
+                error = f"HTTP {res.status_code}"
+            except (ConnectionError, Timeout) as e:
+                breaker.record_failure()
+                if attempt >= self.settings.retries:
+                    raise
+                error = e.__class__.__name__
+            except HTTPError:
+                # The outcome was already recorded from the status.
+                raise
+            except BaseException:
+                # Any other error, or an interrupt, still ends the request, so a half open trial is not left running.
+                breaker.record_failure()
+                raise
+
+            delay = backoff_delay(attempt, self.settings.backoff, self.settings.max_backoff)
+            logger.debug(f"{error} from '{host}', retrying in {delay:.2f}s ({attempt + 1}/{self.settings.retries}).")
+            time.sleep(delay)
+            attempt += 1
+
+
+class HttpClient:
+    """
+    Process wide HTTP session shared by every downloader, so connections are reused across datasets.
+    """
+    _session: Union[RetryingSession, None] = None
+    _settings: Http = Http()
+    _pool_size: int = 10
+    _max_connections: int = 0
+    _throttle: Throttle = Throttle(0)
+    _lock = Lock()
+
+    @classmethod
+    def configure(cls, config: Config) -> None:
+        """
+        Sets the HTTP settings, sizes the connection pool to the configured download concurrency
+        and applies the global connection and bandwidth limits of the scheduler.
+
+        :param config: The tool configuration.
+        """
+        scheduler: Scheduler = config.scheduler
+        with cls._lock:
+            pool_size = scheduler.max_connections or max(cls._pool_size, pool_size_for(config))
+            if cls._session is not None and (config.http != cls._settings or pool_size != cls._pool_size):
+                cls._session.close()
+                cls._session = None
+            cls._settings = config.http
+            cls._pool_size = pool_size
+            cls._max_connections = scheduler.max_connections
+            cls._throttle = Throttle(scheduler.max_bandwidth)
+
+    @classmethod
+    def session(cls) -> RetryingSession:
+        """Returns the shared session, creating it on first use."""
+        with cls._lock:
+            if cls._session is None:
+                logger.debug(f"Creating shared HTTP session with a pool of {cls._pool_size} connections.")
+                cls._session = RetryingSession(cls._settings, cls._pool_size, block=cls._max_connections > 0)
+
+            return cls._session
+
+    @classmethod
+    def settings(cls) -> Http:
+        """Returns the HTTP settings."""
+        return cls._settings
+
+    @classmethod
+    def throttle(cls) -> Throttle:
+        """Returns the bandwidth limit shared by every download."""
+        return cls._throttle
+
+    @classmethod
+    def max_connections(cls) -> int:
+        """Returns the limit on open connections per host, 0 if unlimited."""
+        return cls._max_connections
+
+    @classmethod
+    def close(cls) -> None:
+        """Closes the shared session and its pooled connections."""
+        with cls._lock:
+            if cls._session is not None:
+                cls._session.close()
+                cls._session = None
+
+
+def pool_size_for(config: Config) -> int:
+    """
+    Returns the number of connections needed for the configured download concurrency.
+
+    :param config: The tool configuration.
+    """
+    from sla_cli.src.download.isic.adaptive import AimdController
+
+    isic = config.isic
+    workers = AimdController.MAX_WORKERS if isic.adaptive else isic.max_workers
+
+    return max(workers, isic.max_in_flight, isic.metadata_workers, config.http.segments)
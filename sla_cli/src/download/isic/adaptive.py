@@ -0,0 +1,103 @@
+"""
+Author:     David Walshe
+Date:       17 October 2026
+"""
+
+import logging
+from dataclasses import dataclass
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class BatchSample:
+    """
+    :param images: The number of images requested in the batch.
+    :param bytes: The number of bytes received.
+    :param seconds: The time taken to request and receive the batch.
+    :param ok: If the batch completed without error.
+    """
+    images: int
+    bytes: int
+    seconds: float
+    ok: bool
+
+
+class AimdController:
+    # Upper bound on concurrent batch requests in adaptive mode.
+    MAX_WORKERS = 32
+    # Number of images added to the batch size on each additive increase.
+    BATCH_STEP = 25
+    # Fraction of the batches in a round allowed to fail before backing off.
+    ERROR_TOLERANCE = 0.1
+    # Latency growth over the best seen latency treated as congestion.
+    LATENCY_TOLERANCE = 2.0
+
+    def __init__(self, workers: int, batch_size: int, max_batch_size: int):
+        """
+        Additive-increase, multiplicative-decrease controller for the ISIC download concurrency.
+
+        Samples are collected in rounds of one batch per worker. After each round the controller
+        grows the number of workers and the images per batch by a fixed step while the throughput
+        holds and the API responds healthily, and halves both on errors or rising latency.
+
+        :param workers: The starting number of concurrent batch requests.
+        :param batch_size: The starting number of images per batch.
+        :param max_batch_size: The API limit on images per batch.
+        """
+        self.max_batch_size = max_batch_size
+        self.workers = max(1, min(workers, self.MAX_WORKERS))
+        self.batch_size = max(1, min(batch_size, max_batch_size))
+        self._round = []
+        self._best_throughput = 0.0
+        self._best_latency = None
+
+    def record(self, sample: BatchSample) -> None:
+        """
+        Records a completed batch, adjusting the limits once a full round has been seen.
+
+        :param sample: The measurements of the completed batch.
+        """
+        self._round.append(sample)
+        if len(self._round) >= self.workers:
+            self._adjust(self._round)
+            self._round = []
+
+    def _adjust(self, samples) -> None:
+        """Applies the AIMD step for a round of samples."""
+        failures = sum(1 for sample in samples if not sample.ok)
+        succeeded = [sample for sample in samples if sample.ok]
+
+        if failures > self.ERROR_TOLERANCE * len(samples) or not succeeded:
+            self._decrease(f"{failures}/{len(samples)} batches failed")
+            return
+
+        # Latency per image, so rounds with different batch sizes are comparable.
+        latency = sum(sample.seconds for sample in succeeded) / sum(max(1, sample.images) for sample in succeeded)
+        # Aggregate throughput of the round, every worker contributes concurrently.
+        throughput = sum(sample.bytes for sample in succeeded) / max(1e-6, sum(sample.seconds for sample in succeeded)) * self.workers
+
+        if self._best_latency is not None and latency > self.LATENCY_TOLERANCE * self._best_latency:
+            self._decrease(f"latency rose to {latency:.3f}s per image")
+        elif throughput < 0.9 * self._best_throughput:
+            # Growing no longer pays off, hold the current limits.
+            logger.debug(f"[ADAPTIVE] - Throughput fell to {throughput / 1e6:.2f} MB/s, holding {self.workers} workers x {self.batch_size} images.")
+        else:
+            self._increase()
+
+        self._best_latency = latency if self._best_latency is None else min(self._best_latency, latency)
+        self._best_throughput = max(self._best_throughput, throughput)
+
+    def _increase(self) -> None:
+        """Additively grows the concurrency and batch size."""
+        self.workers = min(self.workers + 1, self.MAX_WORKERS)
+        self.batch_size = min(self.batch_size + self.BATCH_STEP, self.max_batch_size)
+        logger.debug(f"[ADAPTIVE] - Increasing to {self.workers} workers x {self.batch_size} images.")
+
+    def _decrease(self, reason: str) -> None:
+        """Multiplicatively shrinks the concurrency and batch size."""
+        self.workers = max(1, self.workers // 2)
+        self.batch_size = max(1, self.batch_size // 2)
+        # Forget the throughput achieved at the higher limits so the controller can grow again.
+        self._best_throughput = 0.0
+        logger.debug(f"[ADAPTIVE] - {reason.capitalize()}, decreasing to {self.workers} workers x {self.batch_size} images.")
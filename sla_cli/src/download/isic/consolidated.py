@@ -0,0 +1,135 @@
+"""
+Author:     David Walshe
+Date:       17 October 2026
+"""
+
+import logging
+import os
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, List, Tuple, Union
+
+from requests import Session
+
+from sla_cli.src.common.progress import progress_bar
+from sla_cli.src.download import inject_http_session, StreamingZipExtractor, HashingWriter
+from sla_cli.src.download.http import HttpClient
+from sla_cli.src.download.isic.download import IsicImageDownloader, is_image_member, make_batches
+from sla_cli.src.download.isic.engine import CHUNK_SIZE
+
+logger = logging.getLogger(__name__)
+
+
+class ConsolidatedIsicDownloader:
+
+    def __init__(self, downloaders: List[IsicImageDownloader]):
+        """
+        Downloads several ISIC datasets as a single stream of full batches.
+
+        The pending image ids of every dataset are merged and requested in batches of the API limit,
+        so no dataset ends on a part filled batch or pays its own ramp up and tail. Each image of a
+        response is extracted straight into the download path of the dataset it belongs to, found
+        from the dataset metadata, and each dataset then verifies and saves its download as usual.
+
+        :param downloaders: The downloaders of the requested ISIC datasets.
+        """
+        self.downloaders = [downloader for downloader in downloaders if downloader.download_path is not None]
+        self.routes: Dict[str, IsicImageDownloader] = {}
+
+    def download(self) -> None:
+        """Downloads every dataset, then completes each dataset download."""
+        if len(self.downloaders) == 0:
+            return
+
+        for downloader in self.downloaders:
+            downloader.load_metadata()
+
+        self._download()
+
+        for downloader in self.downloaders:
+            downloader.finish()
+
+    @property
+    def lead(self) -> IsicImageDownloader:
+        """Returns the downloader whose API URL and settings are used for the shared batches."""
+        return self.downloaders[0]
+
+    def pending_images(self) -> List[Tuple[str, IsicImageDownloader]]:
+        """
+        Maps every image to its dataset, returning the images not yet received with their downloader.
+        """
+        pending = []
+        for downloader in self.downloaders:
+            completed = downloader.journal.completed_ids()
+            for isic_id, image_name in zip(downloader.metadata["isic_id"], downloader.metadata["image_name"]):
+                self.routes[image_name] = downloader
+                if isic_id not in completed:
+                    pending.append((isic_id, downloader))
+
+        return pending
+
+    @inject_http_session
+    def _download(self, session: Session, **kwargs) -> None:
+        """
+        Requests the merged images in full batches on worker threads, journaling each dataset's share of a batch.
+
+        :param session: The HTTP session to the ISIC Archive API.
+        """
+        pending = self.pending_images()
+        if len(pending) == 0:
+            logger.info(f"No images left to download for {len(self.downloaders)} ISIC datasets.")
+            return
+
+        batches = list(make_batches(pending, n=IsicImageDownloader.MAX_BATCH_SIZE))
+        names = ", ".join(downloader.dataset_name for downloader in self.downloaders)
+        logger.info(f"Downloading {len(pending)} images of {names} in {len(batches)} shared batches.")
+
+        title = f"[SLA] - INFO - - - Downloading {len(self.downloaders)} ISIC datasets."
+        with progress_bar(len(pending), title=title, enrich_print=False, unit="images") as bar, \
+                ThreadPoolExecutor(max_workers=self.lead.max_workers) as executor:
+            futures = {executor.submit(self._fetch_batch, session, [isic_id for isic_id, _ in batch]): batch for batch in batches}
+
+            for future in as_completed(futures):
+                batch = futures[future]
+                try:
+                    writer = future.result()
+                except Exception as e:
+                    logger.warning(f"{e.__str__()}")
+                    continue
+
+                shares = defaultdict(list)
+                for isic_id, downloader in batch:
+                    shares[downloader].append(isic_id)
+                for downloader, image_ids in shares.items():
+                    downloader._record_batch(image_ids, writer)
+
+                bar(incr=len(batch))
+
+    def _fetch_batch(self, session: Session, image_ids: List[str]) -> HashingWriter:
+        """
+        Requests a batch and extracts each image into its dataset's download path as the response arrives.
+
+        :param session: The HTTP session.
+        :param image_ids: The ISIC ids of the batch, from any of the datasets.
+        :return: The writer the response was received through.
+        """
+        # Error statuses are raised by the session, so the response holds the batch.
+        res = self.lead._make_request(session, image_ids)
+        throttle = HttpClient.throttle()
+        with HashingWriter(StreamingZipExtractor(None, keep=is_image_member, route=self.route)) as sink:
+            for chunk in res.iter_content(CHUNK_SIZE):
+                throttle.consume(len(chunk))
+                sink.write(chunk)
+
+        return sink
+
+    def route(self, member: str) -> Union[str, None]:
+        """
+        Returns the download path of the dataset an archive member belongs to.
+
+        :param member: The archive member name, i.e. 'ISIC-images/UDA-1/ISIC_0000000.jpg'.
+        """
+        image_name = os.path.splitext(os.path.basename(member))[0]
+        downloader = self.routes.get(image_name)
+
+        return downloader.download_path if downloader is not None else None
@@ -5,24 +5,34 @@ Date:       10 April 2021
 
 import logging
 import os
-from typing import List, Union
+from typing import List, Union, Dict
 import shutil
 from dataclasses import dataclass
-from concurrent.futures import ThreadPoolExecutor, as_completed, Future
-from threading import Lock
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait, FIRST_COMPLETED
+from collections import deque
+import time
+from contextlib import nullcontext
 import urllib.parse
 import json
 import glob
-from zipfile import ZipFile
 
 import pandas as pd
-from requests import Session
-from alive_progress import alive_bar
+from requests import Session, Response
 
 from sla_cli.src.common.path import Path
+from sla_cli.src.common.progress import progress_bar, emit_event
 from sla_cli.src.common.config import inject_config, Config
-from sla_cli.src.download import inject_http_session, Downloader
+from sla_cli.src.download import inject_http_session, Downloader, StreamingZipExtractor, HashingWriter
+from sla_cli.src.download.extraction import ExtractionPool, extract_archives
 from sla_cli.src.download.isic.metadata import IsicMetadataDownloader, requires_isic_metadata
+from sla_cli.src.download.isic.engine import AsyncBatchEngine, CHUNK_SIZE
+from sla_cli.src.download.isic.journal import BatchJournal, BatchRecord
+from sla_cli.src.download.isic.adaptive import AimdController, BatchSample
+from sla_cli.src.download.isic.reconcile import MissingImageReconciler
+from sla_cli.src.download.isic.store import IsicMetadataStore
+from sla_cli.src.download.isic.query import select
+from sla_cli.src.download.isic.sampling import stratified_sample
+from sla_cli.src.download.http import HttpClient, backoff_delay
 
 logger = logging.getLogger(__name__)
 
@@ -39,10 +49,20 @@ def make_batches(data: List[any], n: int):
         yield data[i:i + n]
 
 
+def is_image_member(name: str) -> bool:
+    """
+    Checks if an archive member should be kept, dropping the license '.txt' files sent with each batch.
+
+    :param name: The archive member name.
+    """
+    return not name.endswith(".txt")
+
+
 @dataclass
 class DownloadOptions:
     image_ids: List[str]
     title: str
+    batch_size: Union[int, None] = None
 
 
 @dataclass
@@ -50,6 +70,7 @@ class ResponseOptions:
     index: int
     download_path: str
     unzip: bool
+    stream_extract: bool = False
 
 
 class IsicImageDownloader(Downloader):
@@ -60,23 +81,58 @@ class IsicImageDownloader(Downloader):
         Downloader class for the ISIC Archive API.
         """
         super().__init__(*args, **kwargs)
-        self.metadata: pd.DataFrame = self._get_metadata()
+        self.per_dataset_metadata = self.options.config.isic.per_dataset_metadata
+        # Per dataset metadata is fetched alongside the images, see '_download_pipelined'.
+        self.metadata: Union[pd.DataFrame, None] = None if self.per_dataset_metadata else self._select(self._get_metadata())
         self.download_path = self._create_download_path(force=self.force)
+        self.journal = BatchJournal(self.download_path) if self.download_path is not None else None
         self.batch_size = self.options.config.isic.batch_size
         self.max_workers = self.options.config.isic.max_workers
+        self.engine = self.options.config.isic.engine
+        self.max_in_flight = self.options.config.isic.max_in_flight
+        self.stream_extract = self.options.config.isic.stream_extract
+        self.extract_workers = self.options.config.isic.extract_workers
+        self.extract_queue_size = self.options.config.isic.extract_queue_size
+        self.adaptive = self.options.config.isic.adaptive
+        self.retry_attempts = self.options.config.isic.retry_attempts
+        self.retry_batch_size = self.options.config.isic.retry_batch_size
+        self._extraction_pool: Union[ExtractionPool, None] = None
 
     @requires_isic_metadata
     def _get_metadata(self) -> pd.DataFrame:
         """
         Returns a dataset with the metadata for only the given dataset name.
 
+        Reads only the rows of the dataset from the columnar metadata store.
+
         :return: A filtered dataframe on the dataset name.
         """
-        df = pd.read_csv(Path.isic_metadata())
+        return IsicMetadataStore(Path.isic_metadata()).read(convert(self.dataset_name))
+
+    def _select(self, metadata: pd.DataFrame) -> pd.DataFrame:
+        """
+        Returns the metadata of the images matching the '--where' expression, sampled by class if requested.
 
-        df = df[df["dataset"].str.upper() == convert(self.dataset_name)]
+        :param metadata: The metadata of the dataset.
+        """
+        if metadata is None:
+            return metadata
+
+        selected = select(metadata, self.where)
+        if self.where:
+            logger.info(f"Selected {len(selected)} of {len(metadata)} {self.dataset_name} images matching \"{self.where}\".")
+
+        if self.sampling:
+            sampled = stratified_sample(selected, per_class=self.per_class, max_images=self.max_images, seed=self.seed)
+            logger.info(f"Sampled {len(sampled)} of {len(selected)} {self.dataset_name} images across {sampled['dx'].nunique(dropna=False)} classes (seed {self.seed}).")
+            selected = sampled
+
+        return selected
 
-        return df
+    @property
+    def sampling(self) -> bool:
+        """Checks if a class stratified sample of the dataset is requested."""
+        return bool(self.per_class or self.max_images)
 
     def _create_download_path(self, force: bool = False) -> Union[str, None]:
         """
@@ -89,14 +145,18 @@ class IsicImageDownloader(Downloader):
             logger.debug(f"'-f/--force' flag set, deleting directory: '{path}'")
             shutil.rmtree(path)
             logger.debug(f"Deletion successful.")
+        elif os.path.exists(path) and BatchJournal.exists(path):
+            logger.info(f"Found an unfinished download of {self.dataset_name} at '{path}', resuming...")
+            return path
         elif os.path.exists(path) and not force:
             logger.warning(f"{self.dataset_name} already exists at the destination directory '{path}'")
             logger.warning(f"If you wish to re-download the dataset, try 'sla-cli download -f/--force <DATASET>'")
             logger.warning(f"Skipping...")
             return None
 
-            # Make the download path.
+        # Make the download path.
         os.mkdir(path)
+        BatchJournal(path).create()
         logger.info(f"Created the download directory at: '{path}'")
 
         return path
@@ -113,16 +173,41 @@ class IsicImageDownloader(Downloader):
         if self.download_path is None:
             return None
 
-        self._download()
+        if self.metadata is None and not self.sampling:
+            self._download_pipelined()
+        else:
+            # A sample needs the class counts of the whole dataset before its first batch.
+            self.load_metadata()
+            self._download()
+
+        self.finish()
+
+    def load_metadata(self) -> None:
+        """Fetches the metadata of the dataset, if it was not loaded from the local ISIC metadata."""
+        if self.metadata is None:
+            self.metadata = self._select(self._fetch_dataset_metadata())
+
+    def finish(self) -> None:
+        """
+        Completes a download once its batches are received, re-requesting missing images and saving the dataset.
+        """
         self._verify_download()
         self._move_images()
         self._save_metadata()
+        # The download is complete, so there is nothing left to resume.
+        self.journal.remove()
+
+    @property
+    def pending_image_ids(self) -> List[str]:
+        """Returns the image ids not yet received in a completed batch of an earlier run."""
+        completed = self.journal.completed_ids()
+        return [image_id for image_id in self.image_ids if image_id not in completed]
 
     @property
     def _default_download_options(self):
         """Creates and returns the default download options."""
         return DownloadOptions(
-            image_ids=self.image_ids,
+            image_ids=self.pending_image_ids,
             title=f"[SLA] - INFO - - - Downloading {self.dataset_name}."
         )
 
@@ -135,23 +220,251 @@ class IsicImageDownloader(Downloader):
         """
         options = kwargs.get("options", self._default_download_options)
 
-        batches = list(make_batches(options.image_ids, n=self.batch_size))
+        if len(options.image_ids) == 0:
+            logger.info(f"No images left to download for {self.dataset_name}.")
+            return
+
+        # Number batches on from those journaled in earlier runs, so saved archives are never overwritten.
+        start = len(self.journal.records())
+
+        with progress_bar(len(options.image_ids), title=options.title, enrich_print=False, unit="images") as bar, self._make_extraction_pool() as pool:
+            self._extraction_pool = pool
+            if self.adaptive and options.batch_size is None:
+                self._download_adaptive(session, options.image_ids, start, bar)
+            else:
+                batch_size = options.batch_size or self.batch_size
+                batches = dict(enumerate(make_batches(options.image_ids, n=batch_size), start=start))
+                if self.engine == "asyncio":
+                    self._download_async(batches, bar)
+                else:
+                    self._download_threaded(session, batches, bar)
+        self._extraction_pool = None
+
+    @inject_http_session
+    def _download_pipelined(self, session: Session, **kwargs):
+        """
+        Fetches the metadata of the dataset a page at a time, requesting the images of each page as it arrives.
 
-        with alive_bar(len(batches), title=options.title, enrich_print=False) as bar:
-            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-                # Create a worker with a batch of image ids to request and download.
-                futures_to_request = {executor.submit(self._make_request, session, batch): idx for idx, batch in enumerate(batches)}
+        Image batches are requested on worker threads while the later metadata pages are still being fetched,
+        so the first images arrive after a single metadata request instead of a sync of the whole archive.
 
-                # As the requests complete, process the responses
-                for index, future in enumerate(as_completed(futures_to_request)):
+        :param session: The HTTP session to the ISIC Archive API.
+        """
+        if self.adaptive or self.engine == "asyncio":
+            logger.debug(f"Per dataset metadata schedules fixed size batches on worker threads, ignoring the adaptive and 'asyncio' options.")
+
+        completed = self.journal.completed_ids()
+        pages = IsicMetadataDownloader(self.options).dataset_pages(session, convert(self.dataset_name))
+        frames = []
+        index = len(self.journal.records())
+        title = f"[SLA] - INFO - - - Downloading {self.dataset_name}."
+
+        with progress_bar(None, title=title, enrich_print=False, unit="images") as bar, self._make_extraction_pool() as pool, \
+                ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            self._extraction_pool = pool
+            in_flight = {}
+
+            def complete(futures):
+                for future in futures:
+                    batch_index, batch = in_flight.pop(future)
                     try:
-                        options = ResponseOptions(index, self.download_path, self.unzip)
-                        # Process the downloaded batch.
-                        self._process_response(future, options)
-                        bar()
+                        self._complete_batch(batch_index, batch, future.result(), bar)
                     except Exception as e:
                         logger.warning(f"{e.__str__()}")
 
+            for frame in pages:
+                frame = select(frame, self.where)
+                frames.append(frame)
+                pending = [image_id for image_id in frame["isic_id"] if image_id not in completed]
+                for batch in make_batches(pending, n=self.batch_size):
+                    in_flight[executor.submit(self._fetch_batch, session, batch, self._response_options(index))] = (index, batch)
+                    index += 1
+
+                # Hand on the batches finished while the page was fetched.
+                complete([future for future in in_flight if future.done()])
+
+            complete(list(as_completed(list(in_flight))))
+        self._extraction_pool = None
+
+        self.metadata = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=["isic_id", "image_name"])
+
+    @inject_http_session
+    def _fetch_dataset_metadata(self, session: Session, **kwargs) -> pd.DataFrame:
+        """
+        Fetches the metadata of only this dataset from the ISIC Archive API.
+
+        :param session: The HTTP session to the ISIC Archive API.
+        """
+        frames = list(IsicMetadataDownloader(self.options).dataset_pages(session, convert(self.dataset_name)))
+
+        return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=["isic_id", "image_name", "dx"])
+
+    def _make_extraction_pool(self):
+        """
+        Returns the extraction stage for saved batch archives.
+
+        Only needed when archives are saved before extraction, streamed batches are extracted as they arrive.
+        """
+        if self.unzip and not self.stream_extract:
+            return ExtractionPool(max_workers=self.extract_workers, max_queued=self.extract_queue_size)
+
+        return nullcontext()
+
+    def _download_threaded(self, session: Session, batches: Dict[int, List[str]], bar: callable):
+        """
+        Downloads the batches using a pool of worker threads.
+
+        A batch is only requested once one in flight completes, so while the extraction queue is full
+        and completing a batch blocks, no more archives are downloaded.
+
+        :param session: The HTTP session to the ISIC Archive API.
+        :param batches: The batches of image ids to download, keyed by batch index.
+        :param bar: The progress bar to update as batches complete.
+        """
+        pending = deque(batches.items())
+        in_flight = {}
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while pending or in_flight:
+                # Create a worker with a batch of image ids to request and download, up to one per thread.
+                while pending and len(in_flight) < self.max_workers:
+                    index, batch = pending.popleft()
+                    in_flight[executor.submit(self._fetch_batch, session, batch, self._response_options(index))] = index
+
+                # As the requests complete, hand the batches on for extraction.
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    index = in_flight.pop(future)
+                    try:
+                        self._complete_batch(index, batches[index], future.result(), bar)
+                    except Exception as e:
+                        logger.warning(f"{e.__str__()}")
+
+    def _download_adaptive(self, session: Session, image_ids: List[str], start: int, bar: callable):
+        """
+        Downloads the images on worker threads, sizing each batch and the number in flight as the download runs.
+
+        :param session: The HTTP session to the ISIC Archive API.
+        :param image_ids: The image ids to download.
+        :param start: The index of the first batch.
+        :param bar: The progress bar to update as batches complete.
+        """
+        if self.engine == "asyncio":
+            logger.debug(f"Adaptive mode schedules batches on worker threads, ignoring the 'asyncio' engine.")
+
+        controller = AimdController(workers=self.max_workers, batch_size=self.batch_size, max_batch_size=self.MAX_BATCH_SIZE)
+        pending = deque(image_ids)
+        in_flight = {}
+        index = start
+
+        with ThreadPoolExecutor(max_workers=AimdController.MAX_WORKERS) as executor:
+            while pending or in_flight:
+                # Top up the requests in flight to the controllers current limits.
+                while pending and len(in_flight) < controller.workers:
+                    batch = [pending.popleft() for _ in range(min(controller.batch_size, len(pending)))]
+                    future = executor.submit(self._timed_fetch_batch, session, batch, self._response_options(index))
+                    in_flight[future] = (index, batch, time.perf_counter())
+                    index += 1
+
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    batch_index, batch, started = in_flight.pop(future)
+                    try:
+                        writer, seconds = future.result()
+                        controller.record(BatchSample(images=len(batch), bytes=writer.bytes, seconds=seconds, ok=True))
+                        self._complete_batch(batch_index, batch, writer, bar)
+                    except Exception as e:
+                        controller.record(BatchSample(images=len(batch), bytes=0, seconds=time.perf_counter() - started, ok=False))
+                        logger.warning(f"{e.__str__()}")
+
+    def _timed_fetch_batch(self, session: Session, batch: List[str], options: ResponseOptions):
+        """
+        Fetches a batch, timing the request and response.
+
+        :return: The writer the response was received through and the seconds taken.
+        """
+        started = time.perf_counter()
+        writer = self._fetch_batch(session, batch, options)
+
+        return writer, time.perf_counter() - started
+
+    def _download_async(self, batches: Dict[int, List[str]], bar: callable):
+        """
+        Downloads the batches on an asyncio event loop, streaming each response to disk.
+
+        :param batches: The batches of image ids to download, keyed by batch index.
+        :param bar: The progress bar to update as batches complete.
+        """
+        indexes = list(batches.keys())
+        writers = {}
+
+        def open_sink(position: int):
+            """Opens the sink for a batch to stream the response into."""
+            index = indexes[position]
+            writers[index] = HashingWriter(self._open_sink(self._response_options(index)))
+            return writers[index]
+
+        def on_complete(position: int, written: int):
+            """Unpacks a fully streamed batch archive."""
+            try:
+                index = indexes[position]
+                self._complete_batch(index, batches[index], writers.pop(index), bar)
+            except Exception as e:
+                logger.warning(f"{e.__str__()}")
+
+        engine = AsyncBatchEngine(self.max_in_flight, open_sink=open_sink, on_complete=on_complete, settings=self.config.http,
+                                  throttle=HttpClient.throttle(), max_connections=HttpClient.max_connections())
+        engine.run([self._make_url(image_ids=batches[index]) for index in indexes])
+
+    def _complete_batch(self, index: int, image_ids: List[str], writer: HashingWriter, bar: callable):
+        """
+        Hands a received batch to the extraction stage, journaling it once its images are on disk.
+
+        :param index: The batch index.
+        :param image_ids: The image ids in the batch.
+        :param writer: The writer the batch response was received through.
+        :param bar: The progress bar to update once the batch is complete.
+        """
+
+        def done(*args):
+            self._record_batch(image_ids, writer)
+            bar(incr=len(image_ids))
+
+        if self._extraction_pool is not None:
+            archive_file = self._archive_path(self.download_path, index)
+            self._extraction_pool.submit(extract_batch_archive, archive_file, self.download_path, on_done=done)
+        else:
+            done()
+
+    def _record_batch(self, image_ids: List[str], writer: HashingWriter):
+        """
+        Journals a completed batch so it is not requested again if the download is restarted.
+
+        :param image_ids: The image ids in the batch.
+        :param writer: The writer the batch response was received through.
+        """
+        self.journal.record(BatchRecord(image_ids=list(image_ids), bytes=writer.bytes, sha256=writer.hexdigest()))
+        emit_event("batch", task=self.dataset_name, images=len(image_ids), bytes=writer.bytes)
+
+    def _response_options(self, index: int) -> ResponseOptions:
+        """
+        Creates the options to handle a batch response with.
+
+        :param index: The batch index.
+        """
+        return ResponseOptions(index, self.download_path, self.unzip, self.stream_extract)
+
+    def _fetch_batch(self, session: Session, batch: List[str], options: ResponseOptions) -> HashingWriter:
+        """
+        Requests a batch and receives the response, run on a network worker thread.
+
+        :param session: The HTTP session object.
+        :param batch: The batch of images to download.
+        :param options: The options to handle the response with.
+        :return: The writer the response was received through.
+        """
+        return self._process_response(self._make_request(session, batch), options)
+
     def _make_request(self, session: Session, batch: List[str]):
         """
         Request 300 images from the ISIC API.
@@ -162,7 +475,7 @@ class IsicImageDownloader(Downloader):
         """
         url = self._make_url(image_ids=batch)
 
-        return session.get(url)
+        return session.get(url, stream=True)
 
     def _make_url(self, image_ids: List[str]) -> str:
         """
@@ -195,45 +508,61 @@ class IsicImageDownloader(Downloader):
         return image_ids
 
     @staticmethod
-    def _process_response(future: Future, options: ResponseOptions):
+    def _archive_path(download_path: str, index: int) -> str:
         """
-        Saves the downloaded ISIC images to as ZIP archives and then unpacks them.
+        Returns the path of the ZIP archive a batch response is saved to.
 
-        :param future: The future to ask for the result off.
+        :param download_path: The dataset download path.
+        :param index: The batch index.
+        """
+        return os.path.join(download_path, f"download_{index}.zip")
+
+    @staticmethod
+    def _process_response(res: Response, options: ResponseOptions) -> HashingWriter:
+        """
+        Saves the downloaded ISIC images to a ZIP archive, or unpacks them as they arrive.
+
+        :param res: The streamed HTTP response.
         :param options: The options to handle the response with.
+        :return: The writer the response was received through, holding its size and checksum.
         """
-        res = future.result()
+        # Error statuses are raised by the session, so the response holds the batch.
+        # Save the downloaded data to a zip file, or extract it as it arrives.
+        throttle = HttpClient.throttle()
+        with HashingWriter(IsicImageDownloader._open_sink(options)) as sink:
+            for chunk in res.iter_content(CHUNK_SIZE):
+                throttle.consume(len(chunk))
+                sink.write(chunk)
 
-        if not res:
-            logger.error(f"Download content is empty.")
-            raise ValueError("Issue downloading images.")
-        else:
-            # Save the downloaded data to a zip file.
-            archive_file = os.path.join(options.download_path, f"download_{options.index}.zip")
-            with open(archive_file, "wb") as stream:
-                for chunk in res:
-                    stream.write(chunk)
-
-            if options.unzip:
-                # Unzip the archive to the save path.
-                # Use threading lock to stop deadlocking on filesystem resources.
-                with Lock():
-                    logger.debug(f"Unzipping {archive_file} to {options.download_path}")
-                    IsicImageDownloader._unzip_archive(archive_file, options.download_path)
-
-                    logger.debug(f"Removing {archive_file}.")
-                    os.remove(archive_file)
+        return sink
+
+    @staticmethod
+    def _open_sink(options: ResponseOptions):
+        """
+        Returns the sink a batch response is written to.
+
+        When streaming extraction is enabled the images are unpacked straight into the download path,
+        otherwise the response is saved as a ZIP archive to be unpacked once complete.
+
+        :param options: The options to handle the response with.
+        """
+        if options.unzip and options.stream_extract:
+            return StreamingZipExtractor(options.download_path, keep=is_image_member)
+
+        return open(IsicImageDownloader._archive_path(options.download_path, options.index), "wb")
 
     @staticmethod
     def _unzip_archive(archive: str, download_path: str) -> None:
         """
         Unzip archive and place contents into output directory.
 
+        Runs in a process of the extraction pool, which already spreads the batch archives across
+        processes, so the members of a single batch are extracted in that process.
+
         :param archive: The archive to read data from.
         :param download_path: The path to unpack the archives to.
         """
-        with ZipFile(archive, 'r') as zip_ref:
-            zip_ref.extractall(download_path)
+        extract_archives([(archive, download_path)], max_workers=1, keep=is_image_member)
 
     @property
     def isic_image_path(self) -> str:
@@ -243,36 +572,63 @@ class IsicImageDownloader(Downloader):
     @property
     def isic_images(self) -> List[str]:
         """Returns all the downloaded images, with non-image files removed."""
+        if not os.path.exists(self.isic_image_path):
+            return []
+
         return [image.split(".")[0] for image in os.listdir(self.isic_image_path) if not image.endswith(".txt")]
 
-    def _verify_download(self):
-        """Verifies all images were correctly downloaded."""
-        # Get the metadata and images file names and compare them
-        # to see if any images were missed.
-        image_names = self.isic_images
-        meta_names = list(self.metadata["image_name"])
+    @property
+    def missing_report_path(self) -> str:
+        """Returns the path of the report listing images that could not be downloaded."""
+        return os.path.join(self.download_path, "missing_images.csv")
+
+    def _verify_download(self) -> bool:
+        """
+        Verifies all images were correctly downloaded, re-requesting only the missing images.
+
+        Each missing image is retried in small batches until it arrives or its retry budget is used up.
+        Any images still missing after that are written to a report in the download path.
+
+        :return: True if every image was downloaded.
+        """
+        reconciler = MissingImageReconciler(images=dict(zip(self.metadata["image_name"], self.metadata["isic_id"])),
+                                            max_attempts=self.retry_attempts)
 
-        missing_images = sorted(list(set(meta_names) ^ set(image_names)))
+        attempt = 0
+        while True:
+            # Get the metadata and images file names and compare them
+            # to see if any images were missed.
+            missing_images = reconciler.missing(self.isic_images)
+            retry_images = reconciler.retryable(missing_images)
+            if len(retry_images) == 0:
+                break
+
+            delay = backoff_delay(attempt, self.config.http.backoff, self.config.http.max_backoff)
+            logger.info(f"{len(missing_images)} '{self.dataset_name}' images are missing, retrying {len(retry_images)} in {delay:.1f}s.")
+            time.sleep(delay)
+
+            self._download_missing_images(reconciler.record_attempt(retry_images))
+            attempt += 1
 
         if len(missing_images) > 0:
-            self._download_missing_images(missing_images)
-            self._verify_download()
-        else:
-            logger.info(f"All '{self.dataset_name}' images were downloaded successfully'")
+            reconciler.report(missing_images).to_csv(self.missing_report_path, index=False)
+            logger.warning(f"{len(missing_images)} '{self.dataset_name}' images could not be downloaded after {self.retry_attempts} attempts.")
+            logger.warning(f"The missing images are listed in '{self.missing_report_path}'.")
+            return False
 
+        logger.info(f"All '{self.dataset_name}' images were downloaded successfully'")
         return True
 
-    def _download_missing_images(self, missing_images: List[str]):
+    def _download_missing_images(self, missing_ids: List[str]):
         """
         Re-download missing images from the initial download.
 
-        :param missing_images: A list of missing image names.
+        :param missing_ids: A list of missing image ids.
         """
-        df = self.metadata
-        missing_ids = sorted(list(df[df["image_name"].isin(missing_images)]["isic_id"]))
         options = DownloadOptions(
-            image_ids=missing_ids,
-            title=f"[SLA] - INFO - - - Re-Downloading {len(missing_ids)} from {self.dataset_name}."
+            image_ids=sorted(missing_ids),
+            title=f"[SLA] - INFO - - - Re-Downloading {len(missing_ids)} from {self.dataset_name}.",
+            batch_size=self.retry_batch_size
         )
         self._download(options=options)
 
@@ -282,12 +638,16 @@ class IsicImageDownloader(Downloader):
 
     def _move_images(self):
         """Gather all images and move them to the root of the download folder."""
+        # No images were received, i.e. a '--where' filter or sample selected none.
+        if not os.path.exists(self.isic_image_path):
+            logger.warning(f"No images were downloaded for {self.dataset_name}.")
+            os.makedirs(self.image_dst_directory, exist_ok=True)
+            return
+
         # Move all images to 'images' folder.
         shutil.move(self.isic_image_path, self.image_dst_directory)
         # Delete old parent folder.
         os.rmdir(os.path.join(self.download_path, "ISIC-images"))
-        # Remove all .txt files.
-        [os.remove(os.path.join(self.image_dst_directory, file)) for file in os.listdir(self.image_dst_directory) if file.endswith(".txt")]
 
     def _save_metadata(self):
         """Saves the datasets metadata to a file."""
@@ -302,6 +662,23 @@ class IsicImageDownloader(Downloader):
             self.metadata.to_csv(os.path.join(self.download_path, "metadata.csv"))
 
 
+def extract_batch_archive(archive: str, download_path: str) -> str:
+    """
+    Unpacks a saved batch archive into the download path and removes it, run in an extraction process.
+
+    :param archive: The batch archive to unpack.
+    :param download_path: The path to unpack the archive to.
+    :return: The unpacked archive path.
+    """
+    logger.debug(f"Unzipping {archive} to {download_path}")
+    IsicImageDownloader._unzip_archive(archive, download_path)
+
+    logger.debug(f"Removing {archive}.")
+    os.remove(archive)
+
+    return archive
+
+
 def convert(dataset: str) -> str:
     """Translates the CLI argument name into the Metadata value for the ISIC archive."""
     return {
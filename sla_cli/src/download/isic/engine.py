@@ -0,0 +1,150 @@
+"""
+Author:     David Walshe
+Date:       17 October 2026
+"""
+
+import logging
+import asyncio
+from typing import List, Callable, BinaryIO
+
+from sla_cli.src.common.config import Http
+from sla_cli.src.download.http import RETRY_STATUSES, Throttle, backoff_delay
+
+logger = logging.getLogger(__name__)
+
+# Size of each chunk read from a streamed response body.
+CHUNK_SIZE = 1024 * 64
+
+
+class AsyncBatchEngine:
+
+    def __init__(self, max_in_flight: int, open_sink: Callable[[int], BinaryIO], on_complete: Callable[[int, int], None],
+                 settings: Http = None, throttle: Throttle = None, max_connections: int = 0):
+        """
+        Asyncio download engine for ISIC image batches.
+
+        Keeps at most 'max_in_flight' batch requests open at any one time and streams each
+        response body into a sink as the bytes arrive, so no full response is held in memory.
+
+        Requests use the timeouts of the HTTP configuration and are retried with jittered backoff,
+        as long as no part of the body has been written to the sink yet.
+
+        :param max_in_flight: The maximum number of concurrent batch requests.
+        :param open_sink: Callable returning a writable binary sink for the batch index.
+        :param on_complete: Callable invoked with the batch index and bytes written once a batch is saved. It runs
+                            off the event loop, so it may block, i.e. waiting for room in the extraction queue.
+        :param settings: The HTTP configuration, defaults are used if not given.
+        :param throttle: The bandwidth limit shared with other downloads, unlimited if not given.
+        :param max_connections: The global limit on open connections, 0 is unlimited.
+        """
+        self.max_in_flight = max_in_flight
+        self.open_sink = open_sink
+        self.on_complete = on_complete
+        self.settings = settings if settings is not None else Http()
+        self.throttle = throttle if throttle is not None else Throttle(0)
+        self.max_connections = max_connections
+
+    def run(self, urls: List[str]) -> None:
+        """
+        Downloads all batch URLs, blocking until every request has completed.
+
+        :param urls: The batch request URLs, one per batch.
+        """
+        asyncio.run(self._run(urls))
+
+    def _make_session(self):
+        """Returns a new aiohttp client session, with a connection pool sized to the requests in flight."""
+        try:
+            import aiohttp
+        except ImportError as err:
+            logger.error(f"The 'asyncio' ISIC download engine requires the 'aiohttp' package.")
+            logger.error(f"Install it with 'pip install aiohttp' or set 'isic.engine' to 'threads'.")
+            raise err
+
+        timeout = aiohttp.ClientTimeout(sock_connect=self.settings.connect_timeout, sock_read=self.settings.read_timeout)
+        limit = min(self.max_in_flight, self.max_connections) if self.max_connections else self.max_in_flight
+        connector = aiohttp.TCPConnector(limit=limit)
+
+        return aiohttp.ClientSession(timeout=timeout, connector=connector)
+
+    async def _run(self, urls: List[str]) -> None:
+        """
+        Schedules a fetch for every batch URL behind a shared semaphore.
+
+        :param urls: The batch request URLs.
+        """
+        semaphore = asyncio.Semaphore(self.max_in_flight)
+
+        async with self._make_session() as session:
+            tasks = [self._fetch(session, semaphore, index, url) for index, url in enumerate(urls)]
+            await asyncio.gather(*tasks)
+
+    async def _fetch(self, session, semaphore: asyncio.Semaphore, index: int, url: str) -> None:
+        """
+        Requests a single batch and streams the response body into its sink.
+
+        Failures are logged and do not cancel the remaining batches, missing images
+        are picked up later by the download verification.
+
+        :param session: The aiohttp client session.
+        :param semaphore: The semaphore bounding the requests in flight.
+        :param index: The batch index.
+        :param url: The batch request URL.
+        """
+        async with semaphore:
+            attempt = 0
+            while True:
+                # Tracks if the sink was opened, once bytes are written the batch can no longer be retried.
+                state = {"opened": False}
+                try:
+                    written = await self._stream(session, index, url, state)
+                    if written == 0:
+                        raise ValueError("Issue downloading images.")
+
+                    # Completing a batch may block, which would stall every other stream on the loop.
+                    await asyncio.get_running_loop().run_in_executor(None, self.on_complete, index, written)
+                    return
+                except Exception as e:
+                    if not state["opened"] and attempt < self.settings.retries and self._is_retryable(e):
+                        delay = backoff_delay(attempt, self.settings.backoff, self.settings.max_backoff)
+                        logger.debug(f"Batch {index} failed with {e.__str__()}, retrying in {delay:.2f}s.")
+                        await asyncio.sleep(delay)
+                        attempt += 1
+                        continue
+
+                    logger.warning(f"Batch {index} failed: {e.__str__()}")
+                    return
+
+    async def _stream(self, session, index: int, url: str, state: dict) -> int:
+        """
+        Makes the request for a batch and streams the body into its sink.
+
+        :return: The number of bytes written.
+        """
+        written = 0
+        async with session.get(url) as res:
+            res.raise_for_status()
+            state["opened"] = True
+            with self.open_sink(index) as sink:
+                async for chunk in res.content.iter_chunked(CHUNK_SIZE):
+                    delay = self.throttle.reserve(len(chunk))
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+                    sink.write(chunk)
+                    written += len(chunk)
+
+        return written
+
+    @staticmethod
+    def _is_retryable(error: Exception) -> bool:
+        """Checks if a failed request is worth retrying."""
+        if getattr(error, "status", None) in RETRY_STATUSES:
+            return True
+        if isinstance(error, (asyncio.TimeoutError, ConnectionError)):
+            return True
+
+        try:
+            import aiohttp
+            return isinstance(error, aiohttp.ClientConnectionError)
+        except ImportError:
+            return False
@@ -0,0 +1,103 @@
+"""
+Author:     David Walshe
+Date:       17 October 2026
+"""
+
+import logging
+import os
+import json
+from dataclasses import dataclass, asdict
+from threading import Lock
+from typing import List, Set
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class BatchRecord:
+    """
+    :param image_ids: The ISIC ids of the images in the batch.
+    :param bytes: The number of bytes received for the batch.
+    :param sha256: The SHA-256 checksum of the received bytes.
+    """
+    image_ids: List[str]
+    bytes: int
+    sha256: str
+
+
+class BatchJournal:
+    """
+    Append-only record of the completed batches of an ISIC download.
+
+    Each completed batch is written as a single JSON line, so a download that is killed part way
+    through can be restarted and only request the images that were never received.
+    """
+    FILE_NAME = ".sla_cli_journal.jsonl"
+
+    def __init__(self, download_path: str):
+        """
+        :param download_path: The dataset download path the journal is kept in.
+        """
+        self.path = self.journal_path(download_path)
+        self._lock = Lock()
+
+    @staticmethod
+    def journal_path(download_path: str) -> str:
+        """Returns the journal file path for a download path."""
+        return os.path.join(download_path, BatchJournal.FILE_NAME)
+
+    @staticmethod
+    def exists(download_path: str) -> bool:
+        """Checks if a download path holds an unfinished download."""
+        return os.path.exists(BatchJournal.journal_path(download_path))
+
+    def create(self) -> None:
+        """Creates an empty journal, marking the download as started."""
+        open(self.path, "a").close()
+
+    def records(self) -> List[BatchRecord]:
+        """
+        Returns the completed batch records.
+
+        A trailing partial line, left if the process was killed mid-write, is ignored.
+        """
+        if not os.path.exists(self.path):
+            return []
+
+        records = []
+        with open(self.path) as fh:
+            for line in fh:
+                try:
+                    records.append(BatchRecord(**json.loads(line)))
+                except (ValueError, TypeError):
+                    logger.debug(f"Ignoring incomplete journal entry in '{self.path}'.")
+
+        return records
+
+    def completed_ids(self) -> Set[str]:
+        """Returns the ids of all images in completed batches."""
+        return {image_id for record in self.records() for image_id in record.image_ids}
+
+    def record(self, record: BatchRecord) -> None:
+        """
+        Appends a completed batch to the journal.
+
+        A partial line left by a killed process is ended first, so the record starts a line of its own.
+
+        :param record: The completed batch.
+        """
+        with self._lock:
+            with open(self.path, "a+b") as fh:
+                line = json.dumps(asdict(record)).encode() + b"\n"
+                if fh.seek(0, os.SEEK_END) > 0:
+                    fh.seek(-1, os.SEEK_END)
+                    if fh.read(1) != b"\n":
+                        line = b"\n" + line
+                fh.write(line)
+                fh.flush()
+                os.fsync(fh.fileno())
+
+    def remove(self) -> None:
+        """Removes the journal once the download has completed."""
+        if os.path.exists(self.path):
+            os.remove(self.path)
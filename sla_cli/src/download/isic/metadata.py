@@ -5,24 +5,31 @@ Date:       10 April 2021
 
 import logging
 import os
-from typing import Tuple, Dict, List
+import shutil
+from typing import Tuple, Dict, List, Iterator, Union
 from dataclasses import dataclass
 from itertools import chain
 from collections import OrderedDict
 import json
-from pprint import pprint
 from functools import wraps
+from threading import Lock
+from concurrent.futures import ThreadPoolExecutor
 
 import pandas as pd
 from requests import Session
-from alive_progress import alive_bar
 
 from sla_cli.src.download import Downloader
 from sla_cli.src.download.utils import inject_http_session
 from sla_cli.src.common.path import Path
+from sla_cli.src.common.progress import progress_bar
+from sla_cli.src.download.isic.pages import PageFetcher
+from sla_cli.src.download.isic.refresh import SyncState, MetadataDiff, merge_metadata, parse_timestamp, newest_timestamp
 
 logger = logging.getLogger(__name__)
 
+# Held while checking for and downloading the metadata, so concurrent ISIC downloads fetch it once.
+_metadata_lock = Lock()
+
 
 def _download_isic_metadata(obj) -> None:
     """
@@ -33,12 +40,13 @@ def _download_isic_metadata(obj) -> None:
     """
     # Download metadata to DB folder before attempting image download.
     meta_downloader = IsicMetadataDownloader(obj.options)
-    if not os.path.exists(Path.isic_metadata()):
-        logger.info(f"Could not find ISIC metadata locally which is required to download ISIC datasets.")
-        logger.info(f"Downloading ISIC metadata first, followed by images.")
-        meta_downloader.download()
-    else:
-        logger.debug(f"Found local ISIC metadata file at: '{Path.isic_metadata()}'.")
+    with _metadata_lock:
+        if not os.path.exists(Path.isic_metadata()):
+            logger.info(f"Could not find ISIC metadata locally which is required to download ISIC datasets.")
+            logger.info(f"Downloading ISIC metadata first, followed by images.")
+            meta_downloader.download()
+        else:
+            logger.debug(f"Found local ISIC metadata file at: '{Path.isic_metadata()}'.")
 
 
 def requires_isic_metadata(func):
@@ -61,6 +69,33 @@ def requires_isic_metadata(func):
     return requires_isic_metadata_wrapper
 
 
+# CSV column names and the API record fields they are read from, in column order.
+METADATA_FIELDS = OrderedDict(
+    isic_id="_id",
+    image_name="name",
+    dataset="dataset.name",
+    description="dataset.description",
+    accepted="notes.reviewed.accepted",
+    created="created",
+    tags="notes.tags",
+    pixels_x="meta.acquisition.pixelsX",
+    pixels_y="meta.acquisition.pixelsY",
+    age="meta.clinical.age_approx",
+    sex="meta.clinical.sex",
+    localization="meta.clinical.anatom_site_general",
+    benign_malignant="meta.clinical.benign_malignant",
+    dx="meta.clinical.diagnosis",
+    dx_type="meta.clinical.diagnosis_confirm_type",
+    melanocytic="meta.clinical.melanocytic",
+)
+
+# Columns of the saved metadata, the flattened fields followed by the competition year flags.
+METADATA_COLUMNS = list(METADATA_FIELDS) + [str(year) for year in range(2016, 2021)]
+
+# API record fields every record must have, the clinical fields are optional.
+REQUIRED_FIELDS = [path for path in METADATA_FIELDS.values() if not path.startswith("meta.clinical.")]
+
+
 @dataclass
 class UrlParams:
     """
@@ -72,53 +107,230 @@ class UrlParams:
 
 
 class IsicMetadataDownloader(Downloader):
+    # Number of records requested per page.
+    PAGE_LIMIT = 5000
 
     @inject_http_session
     def download(self, session: Session, **kwargs) -> None:
         """
         Downloads all the ISIC Archive metadata from the ISIC archive API and saves it as a CSV file.
 
+        Several pages are requested at once, the pages are merged in order once all are retrieved.
+        In streaming mode each page is written out as it arrives instead.
+
         :param session: The HTTP session to make all GET request for data with, auto-supplied via decorator.
         """
-        limit = 5000
-        offset = 0
+        if self.options.config.isic.stream_metadata:
+            self._download_streaming(session)
+            return
 
         responses = []
         records = 0
-        with alive_bar(0, title="Downloading ISIC metadata records", unknown="stars") as bar:
-            while True:
-                # Make the request URL.
-                url = self._make_request_url(UrlParams(limit=limit, offset=offset))
-
-                # Make the request and update the progress bar.
-                data = self._process_request(session, url)
+        with progress_bar(0, title="Downloading ISIC metadata records", unknown="stars", unit="pages") as bar:
+            # Pages arrive in order, ending with the first page shorter than the limit.
+            for data in self._fetch_pages(session):
                 responses.append(data)
                 records += len(data)
 
-                # Update the offset for the next request.
-                offset += limit
-
                 # Update progress bar for user.
                 bar()
                 bar.text(f"{records} records downloaded.")
 
-                # Break once all data is retrieved.
-                if limit != len(data):
-                    break
+        watermark = newest_timestamp(chain.from_iterable(responses), "created")
 
         records = self._merge_records(responses=responses)
         records = self._add_year_tags(records=records)
 
-        self._save_records(records=records)
+        if self._save_records(records=records) and watermark is not None:
+            # Record the newest record so later refreshes only fetch what changed since.
+            SyncState.create(watermark).save(SyncState.path_for(Path.isic_metadata()))
+
+    def _download_streaming(self, session: Session) -> None:
+        """
+        Downloads the ISIC Archive metadata, appending each page to the CSV file as soon as it arrives.
+
+        Only the pages in flight and the page being written are held in memory, so memory use stays
+        fixed however large the archive grows. The CSV is written to a partial file and moved into
+        place once complete, then copied to the DB folder on first download.
+
+        :param session: The HTTP session.
+        """
+        output_path = os.path.join(self.destination_directory, "isic_metadata.csv")
+        partial_path = output_path + ".partial"
+
+        watermark = None
+        records = 0
+        with progress_bar(0, title="Downloading ISIC metadata records", unknown="stars", unit="pages") as bar, open(partial_path, "w", newline="") as fh:
+            for index, page in enumerate(self._fetch_pages(session)):
+                frame = self._add_year_tags(records=self._merge_records(responses=[page]))
+                frame.to_csv(fh, header=index == 0, index=False)
+
+                newest = newest_timestamp(page, "created")
+                if newest is not None and (watermark is None or newest > watermark):
+                    watermark = newest
+                records += len(page)
+
+                # Update progress bar for user.
+                bar()
+                bar.text(f"{records} records downloaded.")
+
+        os.replace(partial_path, output_path)
+
+        if not os.path.exists(Path.isic_metadata()):
+            # Copy the finished file instead of holding the records to write them again.
+            shutil.copyfile(output_path, Path.isic_metadata())
+            if watermark is not None:
+                SyncState.create(watermark).save(SyncState.path_for(Path.isic_metadata()))
+
+    @inject_http_session
+    def refresh(self, session: Session, **kwargs) -> None:
+        """
+        Updates the local ISIC metadata with the records added or changed since the last sync.
 
-    def _make_request_url(self, params: UrlParams) -> str:
+        New records are fetched newest first by their 'created' timestamp, stopping at the sync watermark.
+        A light listing of the archive, without record details, finds the removed images and those
+        updated since the watermark, whose details are then fetched. A summary of the images added,
+        removed and relabelled is saved beside the metadata.
+
+        :param session: The HTTP session to make all GET request for data with, auto-supplied via decorator.
+        """
+        state = SyncState.load(SyncState.path_for(Path.isic_metadata()))
+        local = pd.read_csv(Path.isic_metadata()) if os.path.exists(Path.isic_metadata()) else None
+
+        watermark = None
+        if local is not None:
+            watermark = parse_timestamp(state.watermark if state is not None else local["created"].max())
+
+        if watermark is None:
+            logger.info(f"No synced ISIC metadata found locally, downloading all records.")
+            self.download()
+            return
+
+        logger.info(f"Refreshing ISIC metadata changed since {watermark.isoformat()}.")
+        with progress_bar(0, title="Refreshing ISIC metadata records", unknown="stars", unit="pages") as bar:
+            new_records = list(self._fetch_created_since(session, watermark, bar))
+            listing = list(chain.from_iterable(self._fetch_pages(session, detail=False, bar=bar)))
+
+            def updated_since_sync(record: Dict[str, any]) -> bool:
+                updated = parse_timestamp(record.get("updated"))
+                return updated is not None and updated > watermark
+
+            # Images updated since the last sync that were not already fetched as new.
+            fetched = {record["_id"] for record in new_records}
+            local_ids = set(local["isic_id"])
+            updated_ids = [
+                record["_id"] for record in listing
+                if record["_id"] in local_ids and record["_id"] not in fetched and updated_since_sync(record)
+            ]
+            changed_records = self._fetch_images(session, updated_ids)
+
+        removed = local_ids - {record["_id"] for record in listing}
+
+        updates = local.iloc[:0]
+        if new_records or changed_records:
+            updates = self._add_year_tags(records=self._merge_records(responses=[new_records, changed_records]))
+        records = merge_metadata(local, updates, removed)
+
+        diff = MetadataDiff.compute(local, records)
+        self._save_records(records=records, replace=True)
+
+        newest = [timestamp for timestamp in [watermark, newest_timestamp(new_records, "created"), newest_timestamp(listing, "updated")] if timestamp is not None]
+        SyncState.create(max(newest)).save(SyncState.path_for(Path.isic_metadata()))
+
+        report_path = os.path.join(self.destination_directory, "isic_metadata_changes.csv")
+        diff.report(local, records).to_csv(report_path, index=False)
+        logger.info(f"ISIC metadata refreshed, {diff.summary()}")
+        logger.info(f"Changes saved to '{report_path}'.")
+
+    def _fetch_pages(self, session: Session, bar: callable = None, **url_options) -> Iterator[List[Dict[str, any]]]:
+        """
+        Yields the pages of image records in order, several pages are requested at once.
+
+        :param session: The HTTP session.
+        :param bar: The progress bar to update for every page.
+        :param url_options: The sort order and detail options of the request URL.
+        """
+
+        def fetch_page(offset: int, limit: int) -> List[Dict[str, any]]:
+            return self._process_request(session, self._make_request_url(UrlParams(limit=limit, offset=offset), **url_options))
+
+        fetcher = PageFetcher(fetch_page, limit=self.PAGE_LIMIT, max_in_flight=self.options.config.isic.metadata_workers)
+
+        for page in fetcher.pages():
+            if bar is not None:
+                bar()
+            yield page
+
+    def dataset_pages(self, session: Session, dataset: str) -> Iterator[pd.DataFrame]:
+        """
+        Yields the metadata of a single dataset a page at a time, filtered by the API.
+
+        :param session: The HTTP session.
+        :param dataset: The ISIC name of the dataset.
+        :return: The flattened and year tagged records of each page, in order.
+        """
+        dataset_id = self._find_dataset_id(session, dataset)
+        if dataset_id is None:
+            raise ValueError(f"'{dataset}' was not found in the ISIC Archive.")
+
+        for page in self._fetch_pages(session, dataset_id=dataset_id):
+            yield self._add_year_tags(records=self._merge_records(responses=[page]))
+
+    def _find_dataset_id(self, session: Session, dataset: str) -> Union[str, None]:
+        """
+        Returns the ISIC Archive id of a dataset, matching its name case insensitively.
+
+        :param session: The HTTP session.
+        :param dataset: The ISIC name of the dataset.
+        """
+        datasets = self._process_request(session, f"{self.url}/dataset?limit=0&detail=false")
+
+        for record in datasets:
+            if record["name"].upper() == dataset.upper():
+                return record["_id"]
+
+        return None
+
+    def _fetch_created_since(self, session: Session, watermark, bar: callable = None) -> Iterator[Dict[str, any]]:
+        """
+        Yields the detailed records created after the watermark, newest first.
+
+        :param session: The HTTP session.
+        :param watermark: The UTC timestamp of the last sync.
+        :param bar: The progress bar to update for every page.
+        """
+        for page in self._fetch_pages(session, bar=bar, sort="created", sortdir=-1):
+            for record in page:
+                created = parse_timestamp(record.get("created"))
+                if created is not None and created <= watermark:
+                    # Pages are sorted newest first, everything after is older than the last sync.
+                    return
+                yield record
+
+    def _fetch_images(self, session: Session, image_ids: List[str]) -> List[Dict[str, any]]:
+        """
+        Fetches the detailed records of single images.
+
+        :param session: The HTTP session.
+        :param image_ids: The ISIC ids of the images.
+        """
+        with ThreadPoolExecutor(max_workers=self.options.config.isic.metadata_workers) as executor:
+            return list(executor.map(lambda image_id: self._process_request(session, f"{self.url}/image/{image_id}"), image_ids))
+
+    def _make_request_url(self, params: UrlParams, sort: str = "name", sortdir: int = 1, detail: bool = True, dataset_id: str = None) -> str:
         """
         Returns a URL to make a request from the ISIC archive off.
 
         :param params: The URL parameters to create the URL with.
+        :param sort: The field to sort the records by.
+        :param sortdir: The sort direction, 1 for ascending and -1 for descending.
+        :param detail: If the full record details are returned.
+        :param dataset_id: The ISIC Archive id of a dataset to filter the images by.
         :return: A URL to make a request off.
         """
-        return f"{self.url}/image?limit={params.limit}&offset={params.offset}&sort=name&sortdir=1&detail=true"
+        url = f"{self.url}/image?limit={params.limit}&offset={params.offset}&sort={sort}&sortdir={sortdir}&detail={str(detail).lower()}"
+
+        return url if dataset_id is None else f"{url}&datasetId={dataset_id}"
 
     @staticmethod
     def _process_request(session: Session, url: str) -> List[Dict[str, any]]:
@@ -142,67 +354,73 @@ class IsicMetadataDownloader(Downloader):
         :param responses: The responses holding the data of the ISIC archive metadata.
         :return: The merged responses as a pandas dataframe.
         """
-        # Merge all responses into a single list from a list of lists.
-        metadata = chain.from_iterable(responses)
-        metadata = map(self._process_metadata, metadata)
+        pages = [self._normalize_page(page) for page in responses if len(page) > 0]
 
-        return pd.DataFrame(metadata)
+        if len(pages) == 0:
+            return pd.DataFrame(columns=list(METADATA_FIELDS))
+
+        return pd.concat(pages, ignore_index=True)
 
     @staticmethod
-    def _process_metadata(data: dict) -> OrderedDict:
-        """
-        Processes the raw metadata of the API response into a CSV friendly format.
-
-        :return: A dictionary with all relative information on the image.
-        """
-        try:
-            return OrderedDict(
-                isic_id=data["_id"],
-                image_name=data["name"],
-                dataset=data["dataset"]["name"],
-                description=data["dataset"]["description"],
-                accepted=data["notes"]["reviewed"]["accepted"],
-                created=data["created"].split("T")[0],
-                tags=data["notes"]["tags"],
-                pixels_x=data["meta"]["acquisition"]["pixelsX"],
-                pixels_y=data["meta"]["acquisition"]["pixelsY"],
-                age=data["meta"]["clinical"].get("age_approx", None),
-                sex=data["meta"]["clinical"].get("sex", None),
-                localization=data["meta"]["clinical"].get("anatom_site_general", None),
-                benign_malignant=data["meta"]["clinical"].get("benign_malignant", None),
-                dx=data["meta"]["clinical"].get("diagnosis", None),
-                dx_type=data["meta"]["clinical"].get("diagnosis_confirm_type", None),
-                melanocytic=data["meta"]["clinical"].get("melanocytic", None),
-            )
-        except Exception as e:
-            pprint(data)
-            raise e
+    def _normalize_page(page: List[Dict[str, any]]) -> pd.DataFrame:
+        """
+        Flattens a page of raw API records into the CSV friendly columns in bulk.
+
+        :param page: The raw records of a response.
+        :return: A dataframe with all relative information on the images.
+        """
+        flat = pd.json_normalize(page)
+
+        missing = [path for path in REQUIRED_FIELDS if path not in flat.columns]
+        if missing:
+            raise KeyError(f"ISIC metadata records are missing the fields: {', '.join(missing)}")
+
+        # Optional fields missing from every record of the page are added as empty columns.
+        records = flat.reindex(columns=list(METADATA_FIELDS.values()))
+        records.columns = list(METADATA_FIELDS)
+        records["created"] = records["created"].str.split("T").str[0]
+
+        return records
 
     @staticmethod
     def _add_year_tags(records: pd.DataFrame) -> pd.DataFrame:
         """
         Expands records competition tags to their own columns.
 
+        All competition years are found in a single scan of the tags.
+
         :param records: The dataframe of records to add columns to
         :return: The dataset with additional year tags.
         """
+        years = [str(year) for year in range(2016, 2021)]
+
+        # Tags are lists when downloaded and their text when read back from CSV.
+        found = records["tags"].astype(str).str.extractall(f"({'|'.join(years)})")[0]
+        flags = pd.get_dummies(found).groupby(level=0).max() if len(found) > 0 else pd.DataFrame()
+        flags = flags.reindex(index=records.index, columns=years, fill_value=False).fillna(False).astype(bool)
+
         # Add columns to tag if a dataset was used in any ISIC competitions.
-        for i in range(2016, 2021):
-            records[f"{i}"] = records["tags"].str.contains(f"{i}")
+        for year in years:
+            records[year] = flags[year]
 
         return records
 
-    def _save_records(self, records: pd.DataFrame) -> None:
+    def _save_records(self, records: pd.DataFrame, replace: bool = False) -> bool:
         """
         Saves the downloaded ISIC records to CSV format.
 
         :param records: The records to expand.
+        :param replace: If the metadata in the DB folder is replaced when it already exists.
+        :return: True if the metadata in the DB folder was written.
         """
         # Save dataset to user defined location.
         output_path = os.path.join(self.destination_directory, "isic_metadata.csv")
         records.to_csv(output_path, index=False)
 
-        if not os.path.exists(Path.isic_metadata()):
+        if replace or not os.path.exists(Path.isic_metadata()):
             # Save the isic_metadata to the DB folder on first download to
             # prevent re-downloading for every Dataset request.
             records.to_csv(Path.isic_metadata(), index=False)
+            return True
+
+        return False
@@ -0,0 +1,56 @@
+"""
+Author:     David Walshe
+Date:       17 October 2026
+"""
+
+import logging
+from concurrent.futures import ThreadPoolExecutor, Future
+from typing import Callable, Dict, Iterator, List
+
+logger = logging.getLogger(__name__)
+
+
+class PageFetcher:
+
+    def __init__(self, fetch_page: Callable[[int, int], List[dict]], limit: int, max_in_flight: int):
+        """
+        Fetches a paginated API resource with several offset windows in flight at once.
+
+        Pages are requested ahead of the page being consumed and handed out in offset order.
+        A page shorter than the limit marks the end of the resource, pages requested beyond
+        it are cancelled or discarded.
+
+        :param fetch_page: Callable returning the records at an offset, called with (offset, limit).
+        :param limit: The number of records per page.
+        :param max_in_flight: The maximum number of page requests open at once.
+        """
+        self.fetch_page = fetch_page
+        self.limit = limit
+        self.max_in_flight = max(1, max_in_flight)
+
+    def pages(self) -> Iterator[List[dict]]:
+        """
+        Yields the pages of the resource in offset order, up to and including the first short page.
+        """
+        with ThreadPoolExecutor(max_workers=self.max_in_flight) as executor:
+            pending: Dict[int, Future] = {}
+            next_offset = 0
+            offset = 0
+            try:
+                while True:
+                    # Keep the window of page requests full.
+                    while len(pending) < self.max_in_flight:
+                        pending[next_offset] = executor.submit(self.fetch_page, next_offset, self.limit)
+                        next_offset += self.limit
+
+                    page = pending.pop(offset).result()
+                    yield page
+
+                    if len(page) < self.limit:
+                        logger.debug(f"Short page at offset {offset}, {len(pending)} requests beyond the end discarded.")
+                        return
+
+                    offset += self.limit
+            finally:
+                for future in pending.values():
+                    future.cancel()
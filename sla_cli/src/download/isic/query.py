@@ -0,0 +1,55 @@
+"""
+Author:     David Walshe
+Date:       17 October 2026
+"""
+
+import logging
+from typing import Union
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# ISIC API clinical field names accepted in expressions, and the metadata columns they are stored as.
+FIELD_ALIASES = {
+    "age_approx": "age",
+    "anatom_site_general": "localization",
+    "diagnosis": "dx",
+    "diagnosis_confirm_type": "dx_type",
+}
+
+
+class QueryError(ValueError):
+    """Raised when a '--where' expression cannot be evaluated against the metadata."""
+
+
+def select(metadata: pd.DataFrame, where: Union[str, None]) -> pd.DataFrame:
+    """
+    Returns the metadata rows matching an expression.
+
+    Expressions use the pandas query syntax over the metadata columns, i.e.
+    "dx in ['melanoma', 'basal cell carcinoma'] and age >= 40". The ISIC API names of the
+    clinical fields, such as 'age_approx' and 'diagnosis', may be used in place of the column names.
+
+    :param metadata: The metadata of a dataset.
+    :param where: The expression to match, all rows are returned if not given.
+    :return: The matching rows.
+    """
+    if not where:
+        return metadata
+
+    resolvers = [{alias: metadata[column] for alias, column in FIELD_ALIASES.items() if column in metadata.columns and alias not in metadata.columns}]
+    try:
+        return metadata.query(where, resolvers=resolvers)
+    except Exception as e:
+        raise QueryError(f"Could not evaluate the expression \"{where}\": {e.__str__()}") from e
+
+
+def validate(where: Union[str, None], columns) -> None:
+    """
+    Checks an expression can be evaluated against metadata with the given columns, before any download starts.
+
+    :param where: The expression to check.
+    :param columns: The metadata columns.
+    """
+    select(pd.DataFrame(columns=list(columns)), where)
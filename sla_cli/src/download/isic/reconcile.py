@@ -0,0 +1,90 @@
+"""
+Author:     David Walshe
+Date:       17 October 2026
+"""
+
+import logging
+import time
+from datetime import datetime
+from dataclasses import dataclass
+from typing import Dict, List, Iterable, Union
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ImageAttempts:
+    """
+    :param attempts: The number of times the image has been re-requested.
+    :param last_failure: The time the image was last found missing, as a UNIX timestamp.
+    """
+    attempts: int = 0
+    last_failure: Union[float, None] = None
+
+
+class MissingImageReconciler:
+
+    def __init__(self, images: Dict[str, str], max_attempts: int):
+        """
+        Tracks the images missing after a download and decides which are still worth re-requesting.
+
+        Each image is re-requested at most 'max_attempts' times, so an image that is permanently
+        unavailable from the archive ends the verification instead of retrying forever.
+
+        :param images: The expected images, mapping image name to ISIC id.
+        :param max_attempts: The retry budget for each image.
+        """
+        self.images = images
+        self.max_attempts = max_attempts
+        self.tracked: Dict[str, ImageAttempts] = {}
+
+    def missing(self, downloaded: Iterable[str]) -> List[str]:
+        """
+        Returns the names of the expected images not yet downloaded, recording them as failed.
+
+        :param downloaded: The names of the images found on disk.
+        """
+        missing = sorted(set(self.images) - set(downloaded))
+
+        now = time.time()
+        for name in missing:
+            self.tracked.setdefault(name, ImageAttempts()).last_failure = now
+
+        return missing
+
+    def retryable(self, missing: List[str]) -> List[str]:
+        """
+        Returns the missing images that still have retries left, least attempted first.
+
+        :param missing: The names of the missing images.
+        """
+        retryable = [name for name in missing if self.tracked[name].attempts < self.max_attempts]
+
+        return sorted(retryable, key=lambda name: self.tracked[name].attempts)
+
+    def record_attempt(self, names: List[str]) -> List[str]:
+        """
+        Records a retry of the given images.
+
+        :param names: The image names being re-requested.
+        :return: The ISIC ids of the images.
+        """
+        for name in names:
+            self.tracked[name].attempts += 1
+
+        return [self.images[name] for name in names]
+
+    def report(self, missing: List[str]) -> pd.DataFrame:
+        """
+        Returns a report of the images that could not be downloaded.
+
+        :param missing: The names of the images still missing.
+        """
+        return pd.DataFrame({
+            "image_name": missing,
+            "isic_id": [self.images[name] for name in missing],
+            "attempts": [self.tracked[name].attempts for name in missing],
+            "last_failure": [datetime.fromtimestamp(self.tracked[name].last_failure).isoformat() for name in missing],
+        })
@@ -0,0 +1,160 @@
+"""
+Author:     David Walshe
+Date:       17 October 2026
+"""
+
+import logging
+import os
+import json
+from datetime import datetime, timezone
+from dataclasses import dataclass, asdict
+from typing import Iterable, List, Union
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Columns holding the diagnosis labels of an image, a change in any is reported as a relabel.
+LABEL_COLUMNS = ["benign_malignant", "dx", "dx_type", "melanocytic"]
+
+
+def parse_timestamp(value: Union[str, None]) -> Union[pd.Timestamp, None]:
+    """
+    Parses an ISIC timestamp or date into a UTC timestamp.
+
+    :param value: The timestamp to parse.
+    :return: The UTC timestamp, or None if it cannot be parsed.
+    """
+    try:
+        timestamp = pd.Timestamp(value)
+    except (TypeError, ValueError):
+        return None
+    if pd.isna(timestamp):
+        return None
+
+    return timestamp.tz_localize("UTC") if timestamp.tzinfo is None else timestamp.tz_convert("UTC")
+
+
+def newest_timestamp(records: Iterable[dict], field: str) -> Union[pd.Timestamp, None]:
+    """
+    Returns the newest timestamp of a field across raw API records.
+
+    :param records: The raw ISIC API records.
+    :param field: The timestamp field, i.e. 'created' or 'updated'.
+    """
+    timestamps = [parse_timestamp(record.get(field)) for record in records]
+    timestamps = [timestamp for timestamp in timestamps if timestamp is not None]
+
+    return max(timestamps) if timestamps else None
+
+
+@dataclass
+class SyncState:
+    """
+    :param watermark: The newest record timestamp seen by the last sync, as ISO 8601.
+    :param synced_at: The time of the last sync, as ISO 8601.
+    """
+    watermark: str
+    synced_at: str
+
+    @staticmethod
+    def path_for(metadata_path: str) -> str:
+        """Returns the path of the sync state kept beside the metadata CSV."""
+        return os.path.splitext(metadata_path)[0] + ".sync.json"
+
+    @staticmethod
+    def load(path: str) -> Union["SyncState", None]:
+        """Loads the sync state, None if the metadata has not been synced with a watermark."""
+        if not os.path.exists(path):
+            return None
+
+        with open(path, "r") as fh:
+            return SyncState(**json.load(fh))
+
+    @staticmethod
+    def create(watermark: pd.Timestamp) -> "SyncState":
+        """Creates the sync state for a sync finishing now."""
+        return SyncState(watermark=watermark.isoformat(), synced_at=datetime.now(timezone.utc).isoformat())
+
+    def save(self, path: str) -> None:
+        """Saves the sync state."""
+        with open(path, "w") as fh:
+            json.dump(asdict(self), fh, indent=4)
+
+
+def merge_metadata(local: pd.DataFrame, updates: pd.DataFrame, removed: Iterable[str]) -> pd.DataFrame:
+    """
+    Merges new and changed records into the local metadata.
+
+    :param local: The local metadata.
+    :param updates: The new and changed records, replacing local records with the same ISIC id.
+    :param removed: The ISIC ids no longer in the archive.
+    :return: The merged metadata, in the column order of the local metadata.
+    """
+    drop = set(removed) | set(updates["isic_id"] if "isic_id" in updates else [])
+    kept = local[~local["isic_id"].isin(drop)]
+
+    merged = pd.concat([kept, updates], ignore_index=True)
+    columns = list(local.columns) + [column for column in merged.columns if column not in local.columns]
+
+    return merged[columns]
+
+
+@dataclass
+class MetadataDiff:
+    """
+    :param added: The ISIC ids of the new images.
+    :param removed: The ISIC ids of the images no longer in the archive.
+    :param relabelled: The ISIC ids of the images with changed diagnosis labels.
+    """
+    added: List[str]
+    removed: List[str]
+    relabelled: List[str]
+
+    @staticmethod
+    def compute(old: pd.DataFrame, new: pd.DataFrame) -> "MetadataDiff":
+        """
+        Compares two versions of the metadata.
+
+        :param old: The metadata before the refresh.
+        :param new: The metadata after the refresh.
+        """
+        old_ids, new_ids = set(old["isic_id"]), set(new["isic_id"])
+
+        # Compare the labels of the images in both, as text so missing values and types read from CSV match.
+        columns = [column for column in LABEL_COLUMNS if column in old.columns and column in new.columns]
+        both = sorted(old_ids & new_ids)
+        old_labels = MetadataDiff._labels(old, both, columns)
+        new_labels = MetadataDiff._labels(new, both, columns)
+        changed = (old_labels != new_labels).any(axis=1)
+
+        return MetadataDiff(
+            added=sorted(new_ids - old_ids),
+            removed=sorted(old_ids - new_ids),
+            relabelled=list(changed[changed].index),
+        )
+
+    @staticmethod
+    def _labels(records: pd.DataFrame, ids: List[str], columns: List[str]) -> pd.DataFrame:
+        """Returns the labels of the given images as text, indexed by ISIC id."""
+        labels = records.drop_duplicates("isic_id", keep="last").set_index("isic_id").loc[ids, columns]
+
+        return labels.fillna("").astype(str)
+
+    def report(self, old: pd.DataFrame, new: pd.DataFrame) -> pd.DataFrame:
+        """
+        Returns a report of the changed images.
+
+        :param old: The metadata before the refresh, describing removed images.
+        :param new: The metadata after the refresh, describing added and relabelled images.
+        """
+        rows = []
+        for change, ids, records in [("added", self.added, new), ("removed", self.removed, old), ("relabelled", self.relabelled, new)]:
+            found = records[records["isic_id"].isin(ids)]
+            rows.append(found[["isic_id", "image_name", "dataset"]].assign(change=change))
+
+        return pd.concat(rows, ignore_index=True)
+
+    def summary(self) -> str:
+        """Returns a one line summary of the changes."""
+        return f"{len(self.added)} images added, {len(self.removed)} removed and {len(self.relabelled)} relabelled."
@@ -0,0 +1,71 @@
+"""
+Author:     David Walshe
+Date:       17 October 2026
+"""
+
+import logging
+from typing import Union
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Label used for images without a diagnosis, so they form a class of their own.
+UNLABELLED = "<unlabelled>"
+
+
+def stratified_sample(metadata: pd.DataFrame, per_class: Union[int, None] = None, max_images: Union[int, None] = None,
+                      seed: int = 0, column: str = "dx") -> pd.DataFrame:
+    """
+    Draws a deterministic, seeded sample of the metadata, stratified on a label column.
+
+    'per_class' caps the images of each class. 'max_images' then caps the total, keeping the
+    class proportions by allocating the images to classes with the largest remainder method.
+    The same metadata, options and seed always select the same images.
+
+    :param metadata: The metadata of a dataset.
+    :param per_class: The maximum number of images of each class, no cap if not given.
+    :param max_images: The maximum number of images in total, no cap if not given.
+    :param seed: The seed of the random sample.
+    :param column: The label column to stratify on.
+    :return: The sampled rows, in their original order.
+    """
+    if not per_class and not max_images:
+        return metadata
+
+    labels = metadata[column].astype(object).where(metadata[column].notna(), UNLABELLED).astype(str)
+    counts = labels.value_counts().sort_index()
+
+    quotas = counts.clip(upper=per_class) if per_class else counts
+    if max_images and quotas.sum() > max_images:
+        quotas = _allocate(quotas, max_images)
+
+    selected = []
+    for label, quota in quotas.items():
+        if quota > 0:
+            members = metadata[labels == label]
+            selected.append(members.sample(n=int(quota), random_state=seed))
+
+    sample = pd.concat(selected) if selected else metadata.iloc[:0]
+
+    return metadata[metadata.index.isin(sample.index)]
+
+
+def _allocate(counts: pd.Series, total: int) -> pd.Series:
+    """
+    Splits a total across classes in proportion to their counts, using the largest remainder method.
+
+    :param counts: The number of images of each class, sorted by class.
+    :param total: The number of images to allocate, at most the sum of the counts.
+    :return: The number of images allocated to each class.
+    """
+    shares = counts / counts.sum() * total
+    allocated = np.floor(shares).astype(int)
+
+    # Hand the images left over to the classes with the largest remainders, ties going to the first class.
+    remainders = (shares - allocated).sort_values(ascending=False, kind="stable")
+    for label in remainders.index[:total - allocated.sum()]:
+        allocated[label] += 1
+
+    return allocated
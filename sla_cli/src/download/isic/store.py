@@ -0,0 +1,182 @@
+"""
+Author:     David Walshe
+Date:       17 October 2026
+"""
+
+import logging
+import os
+import json
+import tempfile
+from typing import Dict, List, Union
+
+import pandas as pd
+
+from sla_cli.src.common.path import Path
+
+logger = logging.getLogger(__name__)
+
+# Low cardinality columns stored as categoricals.
+CATEGORICAL_COLUMNS = ["dataset", "dx", "sex", "localization"]
+
+# Parquet key holding the row groups of each dataset.
+INDEX_KEY = b"sla_cli.dataset_index"
+
+# Upper limit on the rows in a single row group.
+ROW_GROUP_SIZE = 50000
+
+
+def has_pyarrow() -> bool:
+    """Checks if the optional 'pyarrow' package is available for the columnar store."""
+    try:
+        import pyarrow
+        return True
+    except ImportError:
+        return False
+
+
+def dataset_key(name: str) -> str:
+    """Returns the key a dataset is indexed under, matching names case insensitively."""
+    return str(name).upper()
+
+
+class IsicMetadataStore:
+
+    def __init__(self, csv_path: str = None, store_path: str = None):
+        """
+        Typed, columnar copy of the ISIC metadata CSV, indexed by dataset.
+
+        The metadata is stored as Parquet, sorted by dataset with each dataset in its own row groups,
+        and an index of the row groups per dataset kept in the file metadata. Loading a dataset only
+        reads its row groups instead of parsing the metadata of the whole archive.
+
+        The store is rebuilt from the CSV whenever the CSV is newer. Without the optional 'pyarrow'
+        package the CSV is read directly.
+
+        :param csv_path: The path to the ISIC metadata CSV, defaults to the db path.
+        :param store_path: The path to the Parquet store, defaults to the CSV path with a '.parquet' extension.
+        """
+        self.csv_path = csv_path if csv_path is not None else Path.isic_metadata()
+        self.store_path = store_path if store_path is not None else os.path.splitext(self.csv_path)[0] + ".parquet"
+
+    @property
+    def is_stale(self) -> bool:
+        """Checks if the store is missing or older than the metadata CSV."""
+        if not os.path.exists(self.store_path):
+            return True
+        if not os.path.exists(self.csv_path):
+            return False
+
+        return os.path.getmtime(self.store_path) < os.path.getmtime(self.csv_path)
+
+    def read(self, dataset: str = None) -> pd.DataFrame:
+        """
+        Returns the metadata of a single dataset, or of the whole archive.
+
+        :param dataset: The name of the dataset to read, all datasets are read if not given.
+        """
+        if has_pyarrow():
+            try:
+                if self.is_stale:
+                    self.write(pd.read_csv(self.csv_path))
+
+                return self._read_store(dataset)
+            except Exception as e:
+                logger.warning(f"Could not use the ISIC metadata store, reading the CSV instead: {e.__str__()}")
+        else:
+            logger.debug(f"'pyarrow' is not installed, reading the ISIC metadata CSV.")
+
+        return self._read_csv(dataset)
+
+    def write(self, records: pd.DataFrame) -> None:
+        """
+        Writes the metadata to the store, one or more row groups per dataset.
+
+        :param records: The ISIC metadata records.
+        """
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        logger.debug(f"Writing the ISIC metadata store to '{self.store_path}'.")
+        records = self._to_categorical(records)
+
+        # Sort by dataset, keeping the original row order and index within each dataset.
+        keys = records["dataset"].astype(str).str.upper()
+        order = keys.reset_index(drop=True).sort_values(kind="stable").index
+        records, keys = records.iloc[order], keys.iloc[order]
+
+        table = pa.Table.from_pandas(records, preserve_index=True)
+        index, slices = self._plan_row_groups(keys)
+        schema = table.schema.with_metadata({**(table.schema.metadata or {}), INDEX_KEY: json.dumps(index).encode("utf8")})
+
+        # Write to a temporary file of its own first, so readers never see a partial store
+        # and concurrent rebuilds never write to the same file.
+        fd, partial_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(self.store_path)),
+                                            prefix=os.path.basename(self.store_path) + ".", suffix=".partial")
+        os.close(fd)
+        try:
+            with pq.ParquetWriter(partial_path, schema) as writer:
+                for offset, length in slices:
+                    writer.write_table(table.slice(offset, length).replace_schema_metadata(schema.metadata), row_group_size=length)
+            os.replace(partial_path, self.store_path)
+        except BaseException:
+            os.remove(partial_path)
+            raise
+
+    def index(self) -> Dict[str, List[int]]:
+        """Returns the row groups of each dataset in the store."""
+        import pyarrow.parquet as pq
+
+        metadata = pq.ParquetFile(self.store_path).schema_arrow.metadata or {}
+
+        return json.loads(metadata.get(INDEX_KEY, b"{}"))
+
+    def _read_store(self, dataset: Union[str, None]) -> pd.DataFrame:
+        """Reads the row groups of a dataset, or all row groups, from the store."""
+        import pyarrow.parquet as pq
+
+        parquet_file = pq.ParquetFile(self.store_path)
+        if dataset is None:
+            return parquet_file.read().to_pandas()
+
+        index = json.loads((parquet_file.schema_arrow.metadata or {}).get(INDEX_KEY, b"{}"))
+        row_groups = index.get(dataset_key(dataset), [])
+
+        return parquet_file.read_row_groups(row_groups).to_pandas()
+
+    def _read_csv(self, dataset: Union[str, None]) -> pd.DataFrame:
+        """Reads the metadata CSV, filtered to a dataset."""
+        df = pd.read_csv(self.csv_path)
+        if dataset is None:
+            return df
+
+        return df[df["dataset"].str.upper() == dataset_key(dataset)]
+
+    @staticmethod
+    def _to_categorical(records: pd.DataFrame) -> pd.DataFrame:
+        """Converts the low cardinality columns to categoricals of strings."""
+        records = records.copy()
+        for column in CATEGORICAL_COLUMNS:
+            if column in records.columns:
+                values = records[column].where(records[column].isna(), records[column].astype(str))
+                records[column] = values.astype("category")
+
+        return records
+
+    @staticmethod
+    def _plan_row_groups(keys: pd.Series):
+        """
+        Plans the row groups of the sorted metadata.
+
+        :param keys: The dataset key of each row, in sorted order.
+        :return: The row groups of each dataset, and the (offset, length) of each row group.
+        """
+        index: Dict[str, List[int]] = {}
+        slices = []
+        offset = 0
+        for key, count in keys.value_counts(sort=False).sort_index().items():
+            for start in range(0, count, ROW_GROUP_SIZE):
+                index.setdefault(key, []).append(len(slices))
+                slices.append((offset + start, min(ROW_GROUP_SIZE, count - start)))
+            offset += count
+
+        return index, slices
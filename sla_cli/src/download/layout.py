@@ -0,0 +1,233 @@
+"""
+Author:     David Walshe
+Date:       17 October 2026
+"""
+
+import logging
+import os
+import shutil
+from dataclasses import dataclass, field
+from fnmatch import fnmatch
+from typing import Callable, Dict, List, Set, Union
+from zipfile import ZIP_STORED
+
+from sla_cli.src.download.extraction import extract_archives
+from sla_cli.src.download.http import HttpClient
+from sla_cli.src.download.remote_zip import RemoteZip
+
+logger = logging.getLogger(__name__)
+
+# Kinds of archive member a layout rule can match.
+IMAGE = "image"
+METADATA = "metadata"
+ARCHIVE = "archive"
+
+# Folder nested archives are unpacked to while their members are placed, removed afterwards.
+NESTED_FOLDER = ".nested"
+
+
+@dataclass(frozen=True)
+class Rule:
+    """
+    :param pattern: Glob matched against the full member path, '*' also matching '/'.
+    :param kind: What the member is, an image, the metadata file or a nested archive laid out with the same rules.
+    :param label: The diagnosis of the images matched, for datasets labelled by their folder structure.
+    """
+    pattern: str
+    kind: str = IMAGE
+    label: str = None
+
+
+@dataclass
+class Placed:
+    """
+    :param images: The path of each placed image, mapped to the rule that placed it.
+    :param metadata: The path of the placed metadata file, None if the layout has none.
+    :param matched: The path of every image the layout matched, including those left out of a partial pull.
+    """
+    images: Dict[str, Rule] = field(default_factory=dict)
+    metadata: Union[str, None] = None
+    matched: Dict[str, Rule] = field(default_factory=dict)
+
+    def add(self, rule: Rule, target: str) -> None:
+        """Records a member as placed at the target path."""
+        if rule.kind == METADATA:
+            self.metadata = target
+        elif rule.kind == IMAGE:
+            self.images[target] = rule
+
+
+@dataclass
+class Layout:
+    """
+    Declares which members of a dataset archive are images, which is the metadata file and where each lands.
+
+    Images are written straight to the images folder under their file name, the metadata file to the
+    metadata path and every other member is skipped, so the dataset is laid out in a single pass.
+
+    :param rules: The rules, the first rule matching a member decides where it lands.
+    :param images_folder: The folder images are written to, relative to the extracted dataset path.
+    """
+    rules: List[Rule]
+    images_folder: str = "images"
+
+    def match(self, name: str) -> Union[Rule, None]:
+        """
+        Returns the first rule matching a member, None for folders and members the layout skips.
+
+        :param name: The member path, with '/' separators.
+        """
+        if name.endswith("/"):
+            return None
+
+        return next((rule for rule in self.rules if fnmatch(name, rule.pattern)), None)
+
+    @property
+    def labels(self) -> Set[str]:
+        """Returns the labels the layout gives images."""
+        return {rule.label for rule in self.rules if rule.label is not None}
+
+    def materialize(self, archive: str, root: str, metadata_path: str, max_workers: int = 0, keep: Callable[[Rule, str], bool] = None) -> Placed:
+        """
+        Extracts a ZIP archive straight into the dataset layout, including the members of nested archives.
+
+        :param archive: The path of the dataset archive.
+        :param root: The extracted dataset path.
+        :param metadata_path: The path the metadata file is written to.
+        :param max_workers: The number of extraction processes, one per CPU if 0.
+        :param keep: Given a matched member's rule and target path, returns False to leave it out.
+        :return: The placed images and metadata file.
+        """
+        placed = Placed()
+        nested_root = os.path.join(root, NESTED_FOLDER)
+        route = self._router(placed, root, metadata_path, keep)
+
+        extract_archives([(archive, root)], max_workers=max_workers, route=route)
+
+        if os.path.exists(nested_root):
+            nested = [os.path.join(nested_root, name) for name in sorted(os.listdir(nested_root))]
+            logger.debug(f"Laying out {len(nested)} nested archives.")
+            extract_archives([(path, root) for path in nested], max_workers=max_workers, route=route)
+            shutil.rmtree(nested_root)
+
+        return placed
+
+    def fetch(self, url: str, root: str, metadata_path: str, keep: Callable[[Rule, str], bool] = None) -> Placed:
+        """
+        Fetches only the members of a remote ZIP archive the layout keeps, over Range requests.
+
+        The central directory is read from the end of the archive, then the kept members are fetched,
+        neighbouring members sharing a request. Archives stored uncompressed inside the archive are
+        listed in place, others are fetched whole and extracted.
+
+        :param url: The URL of the dataset archive.
+        :param root: The extracted dataset path.
+        :param metadata_path: The path the metadata file is written to.
+        :param keep: Given a matched member's rule and target path, returns False to leave it out.
+        :return: The placed images and metadata file.
+        """
+        placed = Placed()
+        nested_root = os.path.join(root, NESTED_FOLDER)
+        self._fetch(RemoteZip.open(HttpClient.session(), url), root, self._router(placed, root, metadata_path, keep))
+
+        if os.path.exists(nested_root):
+            shutil.rmtree(nested_root)
+
+        return placed
+
+    def _fetch(self, remote: RemoteZip, root: str, route: Callable[[str, str], Union[str, None]]) -> None:
+        """
+        Fetches the routed members of a remote archive, descending into nested archives.
+
+        :param remote: The remote archive.
+        :param root: The extracted dataset path.
+        :param route: Returns the path a member is written to, or None to skip it.
+        """
+        members, nested = [], []
+        for info in remote.infolist():
+            target = route(root, info.filename)
+            if target is None:
+                continue
+            (nested if self.match(info.filename).kind == ARCHIVE else members).append((info, target))
+
+        remote.extract(members)
+
+        for info, target in nested:
+            if info.compress_type == ZIP_STORED:
+                self._fetch(remote.nested(info), root, route)
+            else:
+                remote.extract([(info, target)])
+                extract_archives([(target, root)], max_workers=1, route=route)
+                os.remove(target)
+
+    def place(self, source: str, root: str, metadata_path: str) -> Placed:
+        """
+        Moves the files of an already unpacked archive into the dataset layout, for archives that cannot be read member by member.
+
+        :param source: The folder the archive was unpacked to, removed once its files are placed.
+        :param root: The extracted dataset path.
+        :param metadata_path: The path the metadata file is moved to.
+        :return: The placed images and metadata file.
+        """
+        placed = Placed()
+        for folder, _, files in os.walk(source):
+            for file in files:
+                path = os.path.join(folder, file)
+                name = os.path.relpath(path, source).replace(os.sep, "/")
+                rule = self.match(name)
+                if rule is None or rule.kind == ARCHIVE:
+                    continue
+                target = self._target(rule, name, root, metadata_path)
+                placed.add(rule, target)
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                shutil.move(path, target)
+
+        shutil.rmtree(source)
+
+        return placed
+
+    def _router(self, placed: Placed, root: str, metadata_path: str, keep: Callable[[Rule, str], bool] = None) -> Callable[[str, str], Union[str, None]]:
+        """
+        Returns the route of members into the layout, recording the members routed as placed.
+
+        :param placed: The members placed so far.
+        :param root: The extracted dataset path.
+        :param metadata_path: The path the metadata file is written to.
+        :param keep: Given a matched member's rule and target path, returns False to leave it out.
+        :return: Returns the path a member is written to, given its destination and name, or None to skip it.
+        """
+        nested_root = os.path.join(root, NESTED_FOLDER)
+
+        def route(destination: str, name: str) -> Union[str, None]:
+            rule = self.match(name)
+            if rule is None:
+                return None
+
+            if rule.kind == ARCHIVE:
+                target = os.path.join(nested_root, name.replace("/", "_"))
+            else:
+                target = self._target(rule, name, root, metadata_path)
+            if rule.kind == IMAGE:
+                placed.matched[target] = rule
+
+            if keep is not None and not keep(rule, target):
+                return None
+            placed.add(rule, target)
+
+            return target
+
+        return route
+
+    def _target(self, rule: Rule, name: str, root: str, metadata_path: str) -> str:
+        """
+        Returns the path a matched member lands at, the nested folder for archives.
+
+        :param rule: The rule matching the member.
+        :param name: The member path.
+        :param root: The extracted dataset path.
+        :param metadata_path: The path the metadata file is written to.
+        """
+        if rule.kind == METADATA:
+            return metadata_path
+
+        return os.path.join(root, self.images_folder, os.path.basename(name))
@@ -5,16 +5,11 @@ Date:       11 April 2021
 
 import logging
 import os
-import shutil
-import glob
-from typing import List
 
-import pandas as pd
 import patoolib
-from requests import Session
-from alive_progress import alive_bar
 
-from sla_cli.src.download import FileDownloader, download_file, move_images
+from sla_cli.src.download import FileDownloader, download_file
+from sla_cli.src.download.layout import Layout, Rule, METADATA
 
 logger = logging.getLogger(__name__)
 
@@ -23,15 +18,28 @@ class Ph2Downloader(FileDownloader):
     __title__ = "PH2"
     __archive_name__ = "ph2.rar"
     __extracted_name__ = "PH2"
+    __layout__ = Layout([
+        Rule("*_Dermoscopic_Image/*.bmp"),
+        Rule("*/PH2_dataset.xlsx", METADATA),
+    ])
 
     def _download(self):
         """Downloads the PH2 dataset as a RAR archive."""
-        download_file(self.url, self.archive_path, self.size)
+        download_file(self.url, self.archive_path, self.size, checksum=self.checksum)
+
+    @property
+    def unpacked_path(self) -> str:
+        """Returns the folder the RAR archive is unpacked to before its files are placed."""
+        return os.path.join(self.extracted_path, ".unpacked")
 
     def _extract(self):
-        """Extracts the downloaded archive."""
+        """
+        Extracts the downloaded archive.
+
+        RAR archives cannot be read member by member, so the archive is unpacked whole and its files moved into the layout.
+        """
         try:
-            patoolib.extract_archive(self.archive_path, outdir=self.extracted_path, verbosity=-1)
+            patoolib.extract_archive(self.archive_path, outdir=self.unpacked_path, verbosity=-1)
         except Exception as err:
             logger.error(f"You may have to install a 3rd-party application to unpack '.rar' files.")
             logger.error(f"The development team used '7-zip' on Windows 10 OS, which worked as expected.")
@@ -40,39 +48,4 @@ class Ph2Downloader(FileDownloader):
             logger.error(f"Patoolib Documentation: http://wummel.github.io/patool/")
             raise err
 
-    def _format_metadata(self):
-        pass
-
-    def _save_metadata(self):
-        """
-        Moves the metadata as is to the extracted directory.
-        """
-        src_metadata_file = os.path.join(self.extracted_path, "PH2Dataset", "PH2_dataset.xlsx")
-
-        shutil.move(src_metadata_file, self.metadata_path(".xlsx"))
-
-    def _collect_images(self) -> List[str]:
-        """
-        Collects all the absolute image paths from the PH2 extracted archive.
-        """
-        # Get the root path for images.
-        root_path = os.path.join(self.extracted_path, "PH2Dataset", "PH2 Dataset images")
-
-        # Get the absolute path for all images in the PH2 dataset.
-        image_paths = glob.glob(f"{root_path}/**/*_Dermoscopic_Image/*.bmp", recursive=True)
-
-        return image_paths
-
-    def _convert_images(self):
-        pass
-
-    def _move_images(self):
-        """Moves the images from the extracted archive layout to the 'images' folder."""
-        # Create the destination.
-        os.makedirs(self.images_path)
-        # Move images to destination folder.
-        move_images(self._collect_images(), self.images_path)
-
-    def _clean_up(self):
-        """Clean up any stray files."""
-        shutil.rmtree(os.path.join(self.extracted_path, "PH2Dataset"))
+        self.placed = self.__layout__.place(self.unpacked_path, self.extracted_path, self.layout_metadata_path)
@@ -0,0 +1,206 @@
+"""
+Author:     David Walshe
+Date:       17 October 2026
+"""
+
+import io
+import logging
+import os
+import shutil
+import struct
+from typing import List, Tuple
+from zipfile import ZipFile, ZipInfo, BadZipFile, ZIP_STORED
+
+from requests import Session
+
+from sla_cli.src.download.extraction import COPY_BUFFER_SIZE
+from sla_cli.src.download.segmented import probe_range_support
+from sla_cli.src.download.transfer import copy_response
+
+logger = logging.getLogger(__name__)
+
+# Bytes read from the end of an archive, covering its end of central directory record, the largest
+# comment and the ZIP64 locator, so small archives are listed in a single request.
+TAIL_SIZE = 64 * 1024 + 128
+
+# Bytes read ahead when a read falls outside the fetched span, so large members stream in few requests.
+READ_AHEAD = 8 * 1024 ** 2
+
+# Largest span of neighbouring members fetched in a single request.
+MAX_SPAN = 32 * 1024 ** 2
+
+# Largest run of unneeded bytes fetched to join two needed members into one request.
+MAX_GAP = 256 * 1024
+
+# Local file header: signature, versions, flags, method, time, date, CRC, sizes, name and extra lengths.
+LOCAL_HEADER = struct.Struct("<4s2B4HL2L2H")
+
+
+class RemoteZipError(IOError):
+    """Raised when an archive cannot be read remotely, i.e. its server does not serve byte ranges."""
+
+
+class RangeReader:
+
+    def __init__(self, session: Session, url: str, length: int, offset: int = 0):
+        """
+        Seekable, read only file over a remote resource, each read outside the fetched span a Range request.
+
+        :param session: The HTTP session.
+        :param url: The URL of the resource.
+        :param length: The length of the file in bytes.
+        :param offset: The byte of the resource the file starts at, for archives stored in another archive.
+        """
+        self.session = session
+        self.url = url
+        self.length = length
+        self.offset = offset
+        self.position = 0
+        self.requests = 0
+        self.received = 0
+        self._start = 0
+        self._span = bytearray()
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self.position
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        base = {io.SEEK_SET: 0, io.SEEK_CUR: self.position, io.SEEK_END: self.length}[whence]
+        self.position = max(0, base + offset)
+
+        return self.position
+
+    def read(self, size: int = -1) -> bytes:
+        end = self.length if size is None or size < 0 else min(self.length, self.position + size)
+        if self.position >= end:
+            return b""
+
+        if self.position < self._start or end > self._start + len(self._span):
+            self.fetch(self.position, max(end, min(self.length, self.position + READ_AHEAD)))
+
+        data = bytes(self._span[self.position - self._start:end - self._start])
+        self.position = end
+
+        return data
+
+    def fetch(self, start: int, end: int) -> None:
+        """
+        Fetches a span of the file in one Range request, reads within it are served from memory.
+
+        :param start: The first byte of the span.
+        :param end: The byte after the last byte of the span.
+        """
+        res = self.session.get(self.url, headers={"Range": f"bytes={self.offset + start}-{self.offset + end - 1}"}, stream=True)
+        try:
+            if res.status_code != 206:
+                raise RemoteZipError(f"'{self.url}' ignored a Range request, answering with status {res.status_code}.")
+            span = bytearray()
+            copy_response(res, span.extend)
+        finally:
+            res.close()
+
+        if len(span) != end - start:
+            raise RemoteZipError(f"Expected {end - start} bytes of '{self.url}' but received {len(span)}.")
+
+        self._start, self._span = start, span
+        self.requests += 1
+        self.received += len(span)
+
+
+class RemoteZip:
+
+    def __init__(self, reader: RangeReader):
+        """
+        A ZIP archive read over Range requests, its central directory listed without fetching any member.
+
+        :param reader: The file over the remote archive.
+        """
+        self.reader = reader
+        reader.fetch(max(0, reader.length - TAIL_SIZE), reader.length)
+        try:
+            self.zip = ZipFile(reader)
+        except BadZipFile as e:
+            raise RemoteZipError(f"'{reader.url}' is not a ZIP archive: {e.__str__()}")
+
+    @staticmethod
+    def open(session: Session, url: str) -> "RemoteZip":
+        """
+        Lists a remote ZIP archive.
+
+        :param session: The HTTP session.
+        :param url: The URL of the archive.
+        """
+        remote = probe_range_support(session, url)
+        if remote is None:
+            raise RemoteZipError(f"'{url}' does not serve byte ranges.")
+
+        return RemoteZip(RangeReader(session, url, remote.length))
+
+    def infolist(self) -> List[ZipInfo]:
+        """Returns the members of the archive."""
+        return self.zip.infolist()
+
+    def spans(self, infos: List[ZipInfo]) -> List[Tuple[int, int, List[ZipInfo]]]:
+        """
+        Groups members into spans of the archive fetched by one request each.
+
+        A member runs from its local header to the next member's header, taking in any data descriptor.
+        Neighbouring members are joined while the unneeded bytes between them stay under MAX_GAP and the
+        span under MAX_SPAN.
+
+        :param infos: The members to fetch.
+        :return: The start and end byte of each span, with the members it holds.
+        """
+        offsets = sorted({info.header_offset for info in self.infolist()} | {self.zip.start_dir})
+
+        spans = []
+        for info in sorted(infos, key=lambda info: info.header_offset):
+            start = info.header_offset
+            end = next(offset for offset in offsets if offset > start)
+            if spans and start - spans[-1][1] <= MAX_GAP and end - spans[-1][0] <= MAX_SPAN:
+                spans[-1] = (spans[-1][0], end, spans[-1][2] + [info])
+            else:
+                spans.append((start, end, [info]))
+
+        return spans
+
+    def extract(self, members: List[Tuple[ZipInfo, str]]) -> int:
+        """
+        Fetches members and writes each to its path, their CRC checked as they are read.
+
+        :param members: The member and the path it is written to, for each member.
+        :return: The number of bytes written.
+        """
+        targets = {info.filename: target for info, target in members}
+        written = 0
+        for start, end, infos in self.spans([info for info, _ in members]):
+            if end - start <= MAX_SPAN:
+                self.reader.fetch(start, end)
+            for info in infos:
+                target = targets[info.filename]
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                with self.zip.open(info) as src, open(target, "wb") as dst:
+                    shutil.copyfileobj(src, dst, COPY_BUFFER_SIZE)
+                written += info.file_size
+
+        logger.debug(f"Fetched {len(members)} members of '{self.reader.url}' over {self.reader.requests} requests, {self.reader.received} bytes.")
+
+        return written
+
+    def nested(self, info: ZipInfo) -> "RemoteZip":
+        """
+        Lists an archive stored uncompressed in this archive, in place.
+
+        :param info: The stored archive member.
+        """
+        if info.compress_type != ZIP_STORED:
+            raise RemoteZipError(f"'{info.filename}' is compressed, it cannot be read in place.")
+
+        self.reader.seek(info.header_offset)
+        header = LOCAL_HEADER.unpack(self.reader.read(LOCAL_HEADER.size))
+        start = info.header_offset + LOCAL_HEADER.size + header[-2] + header[-1]
+
+        return RemoteZip(RangeReader(self.reader.session, self.reader.url, info.compress_size, offset=self.reader.offset + start))
@@ -0,0 +1,113 @@
+"""
+Author:     David Walshe
+Date:       17 October 2026
+"""
+
+import logging
+import os
+import json
+from dataclasses import dataclass, asdict, field
+from typing import List, Union
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PartialDownload:
+    """
+    Sidecar describing a partial archive download, kept beside the partial file so the next run can continue it.
+
+    :param url: The URL the archive is downloaded from.
+    :param length: The expected length of the archive in bytes.
+    :param etag: The ETag of the archive when the download started, None if the server sent none.
+    :param ranges: The inclusive (start, end) byte ranges the archive is downloaded over.
+    :param received: The number of bytes received for each range.
+    """
+    url: str
+    length: int
+    etag: Union[str, None]
+    ranges: List[List[int]]
+    received: List[int] = field(default_factory=list)
+
+    def __post_init__(self):
+        self.ranges = [list(byte_range) for byte_range in self.ranges]
+        if not self.received:
+            self.received = [0] * len(self.ranges)
+
+    @staticmethod
+    def part_path(destination_path: str) -> str:
+        """Returns the path the archive is downloaded to until it is complete."""
+        return f"{destination_path}.part"
+
+    @staticmethod
+    def path_for(destination_path: str) -> str:
+        """Returns the path of the sidecar of a partial download."""
+        return f"{destination_path}.part.json"
+
+    @staticmethod
+    def load(destination_path: str) -> Union["PartialDownload", None]:
+        """
+        Loads the sidecar of a partial download.
+
+        :param destination_path: The destination path of the archive.
+        :return: The partial download, None if there is none or its sidecar is unreadable.
+        """
+        path = PartialDownload.path_for(destination_path)
+        if not os.path.exists(path) or not os.path.exists(PartialDownload.part_path(destination_path)):
+            return None
+
+        try:
+            with open(path, "r") as fh:
+                return PartialDownload(**json.load(fh))
+        except (ValueError, TypeError) as e:
+            logger.warning(f"Ignoring unreadable partial download record '{path}': {e.__str__()}")
+            return None
+
+    def save(self, destination_path: str) -> None:
+        """
+        Saves the sidecar, replacing the previous one in a single step so it is never left half written.
+
+        :param destination_path: The destination path of the archive.
+        """
+        path = self.path_for(destination_path)
+        with open(f"{path}.tmp", "w") as fh:
+            json.dump(asdict(self), fh)
+        os.replace(f"{path}.tmp", path)
+
+    def matches(self, url: str, length: int, etag: Union[str, None]) -> bool:
+        """
+        Checks the partial download is of the archive currently served, so it can be continued.
+
+        :param url: The URL of the archive.
+        :param length: The length of the archive currently served.
+        :param etag: The ETag of the archive currently served.
+        """
+        return self.url == url and self.length == length and self.etag == etag
+
+    @property
+    def bytes_received(self) -> int:
+        """Returns the number of bytes received across every range."""
+        return sum(self.received)
+
+    @staticmethod
+    def complete(destination_path: str) -> None:
+        """
+        Moves a finished partial download to its destination and removes its sidecar.
+
+        :param destination_path: The destination path of the archive.
+        """
+        os.replace(PartialDownload.part_path(destination_path), destination_path)
+        PartialDownload.discard(destination_path, keep_part=True)
+
+    @staticmethod
+    def discard(destination_path: str, keep_part: bool = False) -> None:
+        """
+        Removes the sidecar, and the partial file unless kept.
+
+        :param destination_path: The destination path of the archive.
+        :param keep_part: Keep the partial file.
+        """
+        paths = [PartialDownload.path_for(destination_path)] + ([] if keep_part else [PartialDownload.part_path(destination_path)])
+        for path in paths:
+            if os.path.exists(path):
+                os.remove(path)
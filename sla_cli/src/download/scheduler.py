@@ -0,0 +1,100 @@
+"""
+Author:     David Walshe
+Date:       17 October 2026
+"""
+
+import logging
+import time
+from contextlib import nullcontext
+from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, List
+
+from sla_cli.src.common.progress import CombinedProgress, Progress, emit_event
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class DownloadJob:
+    """
+    :param name: The dataset name.
+    :param size: The size of the dataset in MB.
+    :param run: Callable creating the dataset downloader and downloading the dataset.
+    """
+    name: str
+    size: float
+    run: Callable[[], None]
+
+
+class DownloadScheduler:
+
+    def __init__(self, max_datasets: int):
+        """
+        Runs the downloads of several datasets at the same time.
+
+        Datasets are started smallest first, so small datasets finish early instead of waiting behind
+        the largest ones. While more than one dataset runs, their progress is shown in a single combined view,
+        unless progress is reported as events, which are tagged with their dataset instead.
+        The connection and bandwidth limits are shared through the process wide HTTP client.
+
+        :param max_datasets: The maximum number of datasets downloaded at the same time.
+        """
+        self.max_datasets = max_datasets
+
+    def run(self, jobs: List[DownloadJob]) -> List[str]:
+        """
+        Downloads every dataset, a failed dataset is logged without stopping the others.
+
+        :param jobs: The dataset downloads to run.
+        :return: The names of the datasets that failed.
+        """
+        jobs = sorted(jobs, key=lambda job: job.size)
+        workers = min(self.max_datasets, len(jobs))
+
+        if workers <= 1:
+            return [job.name for job in jobs if not self._run_job(job)]
+
+        logger.info(f"Downloading {len(jobs)} datasets, {workers} at a time.")
+        failed = []
+        combined = Progress.events is None
+        view = CombinedProgress([job.name for job in jobs], title=f"[SLA] - INFO - - - Downloading {len(jobs)} datasets") if combined else nullcontext()
+        with view as progress:
+            Progress.reporter = progress
+            try:
+                with ThreadPoolExecutor(max_workers=workers) as executor:
+                    futures = {executor.submit(self._run_job, job, job.name): job for job in jobs}
+                    for future in as_completed(futures):
+                        job = futures[future]
+                        if not future.result():
+                            failed.append(job.name)
+                        if combined:
+                            progress.finished(job.name)
+            finally:
+                Progress.reporter = None
+
+        return failed
+
+    @staticmethod
+    def _run_job(job: DownloadJob, task_name: str = None) -> bool:
+        """
+        Runs a single dataset download.
+
+        :param job: The dataset download.
+        :param task_name: The name to report progress under in the combined view.
+        :return: True if the download completed.
+        """
+        Progress.set_task_name(task_name)
+        emit_event("job", task=job.name, state="start", size=job.size)
+        started = time.monotonic()
+        try:
+            job.run()
+            emit_event("job", task=job.name, state="end", seconds=round(time.monotonic() - started, 3))
+            return True
+        except Exception as e:
+            logger.error(f"Download of '{job.name}' failed: {e.__str__()}")
+            logger.debug(f"Download of '{job.name}' failed.", exc_info=True)
+            emit_event("job", task=job.name, state="error", seconds=round(time.monotonic() - started, 3), error=e.__str__())
+            return False
+        finally:
+            Progress.set_task_name(None)
@@ -0,0 +1,248 @@
+"""
+Author:     David Walshe
+Date:       17 October 2026
+"""
+
+import logging
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from threading import Condition, Lock, Thread
+from typing import Callable, List, Tuple, Union
+
+from requests import Session
+
+from sla_cli.src.common.progress import ProgressTicker
+from sla_cli.src.download.transfer import copy_response
+
+logger = logging.getLogger(__name__)
+
+# Matches the total length of a 'Content-Range' header, i.e. 'bytes 0-0/52428800'.
+CONTENT_RANGE = re.compile(r"bytes\s+\d+-\d+/(\d+)")
+
+# Size of the reads used to hash bytes back from the file.
+CHUNK_SIZE = 1024 ** 2
+
+# Number of bytes received between saves of the download progress.
+CHECKPOINT_SIZE = 4 * 1024 ** 2
+
+
+@dataclass
+class RemoteFile:
+    """
+    :param length: The length of the resource in bytes.
+    :param etag: The ETag of the resource, None if the server sent none.
+    """
+    length: int
+    etag: Union[str, None]
+
+
+def probe_range_support(session: Session, url: str) -> Union[RemoteFile, None]:
+    """
+    Checks whether a server serves byte ranges of a resource, by requesting its first byte.
+
+    A HEAD request is not relied on, as file hosts often omit 'Accept-Ranges' from it or redirect it elsewhere.
+
+    :param session: The HTTP session.
+    :param url: The URL of the resource.
+    :return: The length and ETag of the resource if ranges are supported, otherwise None.
+    """
+    res = session.get(url, headers={"Range": "bytes=0-0"}, stream=True)
+    try:
+        if res.status_code != 206:
+            return None
+
+        match = CONTENT_RANGE.match(res.headers.get("Content-Range", ""))
+        return RemoteFile(int(match.group(1)), res.headers.get("ETag")) if match else None
+    finally:
+        res.close()
+
+
+def split_ranges(length: int, segments: int, min_segment_size: int) -> List[Tuple[int, int]]:
+    """
+    Splits a resource into contiguous, inclusive byte ranges of near equal size.
+
+    :param length: The length of the resource in bytes.
+    :param segments: The maximum number of ranges.
+    :param min_segment_size: The minimum size of a range in bytes, fewer ranges are used for small resources.
+    :return: The (start, end) byte of each range.
+    """
+    segments = max(1, min(segments, length // max(1, min_segment_size)))
+    size, remainder = divmod(length, segments)
+
+    ranges = []
+    start = 0
+    for i in range(segments):
+        end = start + size + (1 if i < remainder else 0)
+        ranges.append((start, end - 1))
+        start = end
+
+    return ranges
+
+
+class SegmentedDownload:
+
+    def __init__(self, session: Session, url: str, destination_path: str, length: int, ranges: List[Tuple[int, int]],
+                 offsets: List[int] = None, on_checkpoint: Callable[[List[int]], None] = lambda offsets: None, hasher=None):
+        """
+        Downloads a resource as several byte ranges in parallel, each written in place into a preallocated file.
+
+        A download can be continued from the bytes already received of each range, which are reported
+        to 'on_checkpoint' as they arrive and when the download stops, successfully or not.
+
+        :param session: The HTTP session, pooling a connection for each range.
+        :param url: The URL of the resource.
+        :param destination_path: The file to download to.
+        :param length: The length of the resource in bytes.
+        :param ranges: The (start, end) byte ranges to fetch.
+        :param offsets: The bytes already in the file for each range, to continue a previous download.
+        :param on_checkpoint: Called with the bytes received for each range, as the download progresses.
+        :param hasher: A hashlib object to hash the resource with as it arrives, in byte order, on a thread of its own.
+        """
+        self.session = session
+        self.url = url
+        self.destination_path = destination_path
+        self.length = length
+        self.ranges = ranges
+        self.offsets = list(offsets) if offsets else [0] * len(ranges)
+        self.received = sum(self.offsets)
+        self.on_checkpoint = on_checkpoint
+        self._checkpointed = self.received
+        self.hasher = hasher
+        self.hashed = 0
+        self._lock = Lock()
+        # Signals the hashing thread as bytes arrive, so range writers never wait on the hash.
+        self._arrived = Condition(self._lock)
+        self._stopped = False
+
+    def run(self, on_progress: Callable[[float], None] = lambda fraction: None) -> str:
+        """
+        Fetches every range and verifies the length of the downloaded file.
+
+        :param on_progress: Called with the fraction of the resource received, at a fixed rate.
+        :return: The destination path.
+        """
+        if self.received == 0 or not os.path.exists(self.destination_path):
+            self.offsets = [0] * len(self.ranges)
+            self.received = 0
+            with open(self.destination_path, "wb") as fh:
+                fh.truncate(self.length)
+        else:
+            logger.info(f"Continuing the download of {self.url} from {self.received} of {self.length} bytes.")
+
+        hashing = Thread(target=self._hash_arrived, daemon=True) if self.hasher is not None else None
+        if hashing is not None:
+            self._stopped = False
+            hashing.start()
+
+        remaining = [index for index, (start, end) in enumerate(self.ranges) if self.offsets[index] < end - start + 1]
+        try:
+            with ProgressTicker(lambda: on_progress(self.received / self.length)), \
+                    ThreadPoolExecutor(max_workers=max(1, len(remaining))) as executor:
+                futures = [executor.submit(self._fetch_range, index) for index in remaining]
+                for future in futures:
+                    future.result()
+        finally:
+            with self._lock:
+                self.on_checkpoint(list(self.offsets))
+                self._stopped = True
+                self._arrived.notify()
+            if hashing is not None:
+                hashing.join()
+
+        self._verify()
+
+        return self.destination_path
+
+    def _fetch_range(self, index: int) -> None:
+        """
+        Fetches the rest of a byte range into its place in the destination file, run on a worker thread.
+
+        :param index: The index of the range.
+        """
+        start, end = self.ranges[index]
+        first = start + self.offsets[index]
+        # Closed on every path, so a failed range returns its connection to the pool.
+        with self.session.get(self.url, headers={"Range": f"bytes={first}-{end}"}, stream=True) as res:
+            if res.status_code != 206:
+                raise IOError(f"Expected a partial response for bytes {first}-{end} of {self.url}, got status {res.status_code}.")
+
+            expected = end - first + 1
+            written = 0
+            # Unbuffered, so the bytes counted as received are in the file should the process stop.
+            with open(self.destination_path, "r+b", buffering=0) as fh:
+                fh.seek(first)
+
+                def write(block: memoryview):
+                    nonlocal written
+                    block = block[:expected - written]
+                    fh.write(block)
+                    written += len(block)
+                    with self._lock:
+                        self.offsets[index] += len(block)
+                        self.received += len(block)
+                        self._arrived.notify()
+                        if self.received - self._checkpointed >= CHECKPOINT_SIZE:
+                            self._checkpointed = self.received
+                            self.on_checkpoint(list(self.offsets))
+
+                copy_response(res, write)
+
+        if written != expected:
+            raise IOError(f"Received {written} of {expected} bytes for bytes {first}-{end} of {self.url}.")
+
+    def _hash_arrived(self) -> None:
+        """
+        Hashes the bytes in the file as every byte before them arrives, run on a thread of its own until the
+        download stops. The bytes are read back outside the lock, while still in the page cache.
+        """
+        while True:
+            with self._arrived:
+                self._arrived.wait_for(lambda: self._stopped or self._contiguous_end() > self.hashed)
+                end = self._contiguous_end()
+                stopped = self._stopped
+            self._catch_up_hash(end)
+            if stopped:
+                return
+
+    def _contiguous_end(self) -> int:
+        """Returns the end of the bytes received without a gap from the start of the resource."""
+        for (start, end), offset in zip(self.ranges, self.offsets):
+            if offset < end - start + 1:
+                return start + offset
+
+        return self.length
+
+    def _catch_up_hash(self, end: int) -> None:
+        """
+        Hashes the bytes written to the file past the hashed bytes, only ever called by one thread at a time.
+
+        :param end: The end of the bytes to hash, no further than the first gap.
+        """
+        if end <= self.hashed:
+            return
+
+        with open(self.destination_path, "rb") as fh:
+            fh.seek(self.hashed)
+            while self.hashed < end:
+                block = fh.read(min(CHUNK_SIZE, end - self.hashed))
+                if not block:
+                    break
+                self.hasher.update(block)
+                self.hashed += len(block)
+
+    def hexdigest(self) -> str:
+        """Returns the digest of the resource, once every byte has been received."""
+        self._catch_up_hash(self._contiguous_end())
+        if self.hashed != self.length:
+            raise IOError(f"Hashed {self.hashed} of {self.length} bytes of {self.url}.")
+
+        return self.hasher.hexdigest()
+
+    def _verify(self) -> None:
+        """Checks every byte of the resource was received."""
+        if self.received != self.length:
+            raise IOError(f"Received {self.received} of {self.length} bytes of {self.url}.")
+
+        logger.debug(f"Received all {self.length} bytes of {self.url} over {len(self.ranges)} ranges.")
@@ -0,0 +1,317 @@
+"""
+Author:     David Walshe
+Date:       17 October 2026
+"""
+
+import logging
+import os
+import struct
+import zlib
+from typing import Callable, List, Union, BinaryIO
+from zipfile import BadZipFile
+
+logger = logging.getLogger(__name__)
+
+LOCAL_HEADER_SIGNATURE = b"PK\x03\x04"
+DESCRIPTOR_SIGNATURE = b"PK\x07\x08"
+# Any of these signatures mark the end of the member data in the archive.
+TRAILER_SIGNATURES = (b"PK\x01\x02", b"PK\x05\x06", b"PK\x06\x06", b"PK\x06\x07")
+
+LOCAL_HEADER = struct.Struct("<4sHHHHHIIIHH")
+ZIP64_EXTRA_ID = 0x0001
+
+STORED = 0
+DEFLATED = 8
+
+# Parser states.
+_HEADER = "header"
+_DATA = "data"
+_DESCRIPTOR = "descriptor"
+_DONE = "done"
+
+
+def safe_member_path(destination: str, name: str) -> Union[str, None]:
+    """
+    Returns the extraction path for an archive member, or None if it would escape the destination.
+
+    :param destination: The directory to extract to.
+    :param name: The member name as stored in the archive.
+    """
+    parts = [part for part in name.replace("\\", "/").split("/") if part not in ("", ".")]
+    if not parts or ".." in parts:
+        return None
+
+    return os.path.join(destination, *parts)
+
+
+class _Member:
+    """Tracks the state of the archive member currently being streamed."""
+
+    def __init__(self, name: str, flags: int, method: int, crc: int, compressed_size: int, zip64: bool):
+        self.name = name
+        self.method = method
+        self.crc = crc
+        self.compressed_size = compressed_size
+        self.zip64 = zip64
+        self.has_descriptor = bool(flags & 0x08)
+        # With a data descriptor the sizes in the local header are zero and the end of the data must be detected.
+        self.size_known = not self.has_descriptor or compressed_size != 0
+        self.remaining = compressed_size
+        self.consumed = 0
+        self.running_crc = 0
+        self.decompressor = zlib.decompressobj(-15) if method == DEFLATED else None
+        self.fh: Union[BinaryIO, None] = None
+
+        if method not in (STORED, DEFLATED):
+            raise BadZipFile(f"Unsupported compression method {method} for '{name}'.")
+
+
+class StreamingZipExtractor:
+
+    def __init__(self, destination: Union[str, None], keep: Callable[[str], bool] = None,
+                 route: Callable[[str], Union[str, None]] = None):
+        """
+        Extracts a ZIP archive as its bytes are written, without saving the archive first.
+
+        Members are read from their local headers in archive order, so the central directory at the
+        end of the file is never needed. Members rejected by 'keep' are decoded but not written.
+
+        :param destination: The directory to extract members to.
+        :param keep: Predicate on the member name deciding if a member is written to disk.
+        :param route: Callable returning the directory to extract a member to, in place of 'destination'.
+                      Members routed to None are decoded but not written.
+        """
+        self.destination = destination
+        self.keep = keep if keep is not None else (lambda name: True)
+        self.route = route if route is not None else (lambda name: self.destination)
+        self.extracted: List[str] = []
+        self.bytes_written = 0
+        self._buffer = bytearray()
+        self._state = _HEADER
+        self._member: Union[_Member, None] = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self._discard()
+
+        return False
+
+    def write(self, data: bytes) -> int:
+        """
+        Feeds the next chunk of the archive to the extractor.
+
+        :param data: The archive bytes.
+        :return: The number of bytes consumed.
+        """
+        self.bytes_written += len(data)
+        if self._state != _DONE:
+            self._buffer += data
+            self._process()
+
+        return len(data)
+
+    def close(self) -> List[str]:
+        """
+        Finishes the extraction, raising if the archive was truncated.
+
+        :return: The paths of the extracted members.
+        """
+        if self._state not in (_HEADER, _DONE) or (self._state == _HEADER and self._buffer):
+            self._discard()
+            raise BadZipFile(f"Archive stream ended unexpectedly after {self.bytes_written} bytes.")
+
+        return self.extracted
+
+    def _discard(self):
+        """Closes and removes any partially written member."""
+        member = self._member
+        if member is not None and member.fh is not None:
+            member.fh.close()
+            os.remove(member.fh.name)
+        self._member = None
+
+    def _process(self):
+        """Advances the parser as far as the buffered bytes allow."""
+        while True:
+            if self._state == _HEADER:
+                progressed = self._read_header()
+            elif self._state == _DATA:
+                progressed = self._read_data()
+            elif self._state == _DESCRIPTOR:
+                progressed = self._read_descriptor()
+            else:
+                self._buffer.clear()
+                return
+
+            if not progressed:
+                return
+
+    def _read_header(self) -> bool:
+        """Parses the next local file header."""
+        buffer = self._buffer
+        if len(buffer) < 4:
+            return False
+
+        signature = bytes(buffer[:4])
+        if signature in TRAILER_SIGNATURES:
+            self._state = _DONE
+            return True
+        if signature != LOCAL_HEADER_SIGNATURE:
+            raise BadZipFile(f"Bad local file header signature {signature!r}.")
+
+        if len(buffer) < LOCAL_HEADER.size:
+            return False
+
+        _, _, flags, method, _, _, crc, compressed_size, _, name_length, extra_length = LOCAL_HEADER.unpack_from(buffer)
+        end = LOCAL_HEADER.size + name_length + extra_length
+        if len(buffer) < end:
+            return False
+
+        raw_name = bytes(buffer[LOCAL_HEADER.size:LOCAL_HEADER.size + name_length])
+        name = raw_name.decode("utf-8" if flags & 0x800 else "cp437")
+        extra = bytes(buffer[LOCAL_HEADER.size + name_length:end])
+
+        compressed_size, zip64 = self._zip64_size(extra, compressed_size)
+        del buffer[:end]
+
+        member = _Member(name, flags, method, crc, compressed_size, zip64)
+        destination = self.route(name)
+        path = safe_member_path(destination, name) if destination is not None else None
+        if destination is None:
+            logger.debug(f"Skipping unrouted archive member '{name}'.")
+        elif path is None:
+            logger.warning(f"Skipping unsafe archive member '{name}'.")
+        elif name.endswith("/"):
+            os.makedirs(path, exist_ok=True)
+        elif self.keep(name):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            member.fh = open(path, "wb")
+
+        self._member = member
+        self._state = _DATA
+        return True
+
+    @staticmethod
+    def _zip64_size(extra: bytes, compressed_size: int):
+        """Returns the compressed size, reading the ZIP64 extra field where present."""
+        offset = 0
+        while offset + 4 <= len(extra):
+            header_id, size = struct.unpack_from("<HH", extra, offset)
+            if header_id == ZIP64_EXTRA_ID:
+                # The field holds the uncompressed size followed by the compressed size.
+                if size >= 16:
+                    compressed_size = struct.unpack_from("<Q", extra, offset + 12)[0]
+                return compressed_size, True
+            offset += 4 + size
+
+        return compressed_size, False
+
+    def _read_data(self) -> bool:
+        """Decodes as much of the current member's data as is buffered."""
+        member, buffer = self._member, self._buffer
+        if member.size_known:
+            take = min(member.remaining, len(buffer))
+            self._decode(bytes(buffer[:take]))
+            del buffer[:take]
+            member.remaining -= take
+            if member.remaining == 0:
+                self._end_data()
+                return True
+            return False
+
+        if not buffer:
+            return False
+
+        if member.method == DEFLATED:
+            self._decode(bytes(buffer))
+            buffer.clear()
+            if member.decompressor.eof:
+                buffer += member.decompressor.unused_data
+                self._end_data()
+                return True
+            return False
+
+        return self._scan_stored()
+
+    def _scan_stored(self) -> bool:
+        """Finds the end of a stored member of unknown size by locating a matching data descriptor."""
+        member, buffer = self._member, self._buffer
+        size_length = 8 if member.zip64 else 4
+        descriptor_length = 8 + 2 * size_length
+
+        start = 0
+        while True:
+            index = buffer.find(DESCRIPTOR_SIGNATURE, start)
+            if index == -1:
+                # Hold back a possible partial signature at the end of the buffer.
+                flush = max(0, len(buffer) - 3)
+                break
+            if len(buffer) - index < descriptor_length:
+                flush = index
+                break
+
+            crc = struct.unpack_from("<I", buffer, index + 4)[0]
+            size = struct.unpack_from("<Q" if member.zip64 else "<I", buffer, index + 8)[0]
+            if size == member.consumed + index and crc == zlib.crc32(bytes(buffer[:index]), member.running_crc):
+                self._decode(bytes(buffer[:index]))
+                del buffer[:index]
+                self._end_data()
+                return True
+            start = index + 1
+
+        if flush:
+            self._decode(bytes(buffer[:flush]))
+            del buffer[:flush]
+        return False
+
+    def _decode(self, data: bytes):
+        """Decompresses and writes a chunk of member data."""
+        member = self._member
+        member.consumed += len(data)
+        if member.decompressor is not None:
+            data = member.decompressor.decompress(data)
+        member.running_crc = zlib.crc32(data, member.running_crc)
+        if member.fh is not None:
+            member.fh.write(data)
+
+    def _end_data(self):
+        """Moves on from the member data, to its data descriptor if it has one."""
+        if self._member.has_descriptor:
+            self._state = _DESCRIPTOR
+        else:
+            self._finish_member(self._member.crc)
+
+    def _read_descriptor(self) -> bool:
+        """Parses the data descriptor following a member's data."""
+        buffer = self._buffer
+        size_length = 8 if self._member.zip64 else 4
+        if len(buffer) < 4:
+            return False
+
+        offset = 4 if bytes(buffer[:4]) == DESCRIPTOR_SIGNATURE else 0
+        end = offset + 4 + 2 * size_length
+        if len(buffer) < end:
+            return False
+
+        crc = struct.unpack_from("<I", buffer, offset)[0]
+        del buffer[:end]
+        self._finish_member(crc)
+        return True
+
+    def _finish_member(self, crc: int):
+        """Closes the current member, verifying its checksum."""
+        member = self._member
+        if member.fh is not None:
+            member.fh.close()
+            if member.running_crc != crc:
+                os.remove(member.fh.name)
+                raise BadZipFile(f"Bad CRC-32 for archive member '{member.name}'.")
+            self.extracted.append(member.fh.name)
+
+        self._member = None
+        self._state = _HEADER
@@ -0,0 +1,66 @@
+"""
+Author:     David Walshe
+Date:       17 October 2026
+"""
+
+import logging
+from typing import Callable
+
+from requests import Response
+from requests.exceptions import ChunkedEncodingError, ConnectionError, SSLError
+from urllib3.exceptions import ProtocolError, ReadTimeoutError, SSLError as Urllib3SSLError
+
+from sla_cli.src.download.http import HttpClient
+
+logger = logging.getLogger(__name__)
+
+
+def buffer_size() -> int:
+    """Returns the configured size of the download buffer in bytes."""
+    return int(HttpClient.settings().buffer_size * 1024 ** 2)
+
+
+def copy_response(res: Response, write: Callable[[memoryview], None], size: int = None) -> int:
+    """
+    Copies a streamed response body through a single reusable buffer, within the global bandwidth limit.
+
+    Each read fills the whole buffer, so the Python work per byte stays small on fast links. Bodies with a
+    'Content-Encoding' are decoded block by block instead, as decoded data does not fit a fixed buffer. Progress is
+    left to the caller, i.e. a ProgressTicker reading a counter updated by 'write'.
+
+    :param res: The streamed HTTP response.
+    :param write: Called with a view of each block read, only valid until it returns.
+    :param size: The size of the buffer in bytes, the configured buffer size if not given.
+    :return: The number of bytes copied.
+    """
+    buffer = bytearray(size or buffer_size())
+    view = memoryview(buffer)
+    throttle = HttpClient.throttle()
+    copied = 0
+
+    # A decoded block can outgrow the buffer, so encoded bodies are decoded by iter_content instead.
+    if res.headers.get("Content-Encoding", "identity").lower() != "identity":
+        for block in res.iter_content(chunk_size=len(buffer)):
+            throttle.consume(len(block))
+            write(memoryview(block))
+            copied += len(block)
+        return copied
+
+    res.raw.decode_content = False
+    while True:
+        # Raised as requests' errors, as iter_content would, so callers catching RequestException see them.
+        try:
+            read = res.raw.readinto(view)
+        except ProtocolError as e:
+            raise ChunkedEncodingError(e)
+        except ReadTimeoutError as e:
+            raise ConnectionError(e)
+        except Urllib3SSLError as e:
+            raise SSLError(e)
+        if not read:
+            break
+        throttle.consume(read)
+        write(view[:read])
+        copied += read
+
+    return copied
@@ -7,51 +7,99 @@ import logging
 import os
 from functools import wraps
 import math
-from zipfile import ZipFile
 import shutil
-from typing import List
+import hashlib
+from typing import List, BinaryIO, Union
 
-from alive_progress import alive_bar
-import requests
-from requests import Session
+from requests import RequestException, Response
+
+from sla_cli.src.common.progress import progress_bar, ProgressTicker, emit_event
+from sla_cli.src.download.http import HttpClient
+from sla_cli.src.download.checksum import Checksum, ChecksumError
+from sla_cli.src.download.extraction import extract_archives
+from sla_cli.src.download.resume import PartialDownload
+from sla_cli.src.download.transfer import copy_response
+from sla_cli.src.download.segmented import SegmentedDownload, probe_range_support, split_ranges
 
 logger = logging.getLogger(__name__)
 
 
 def inject_http_session(func):
-    """Injects a persistent HTTP session into the wrapped function."""
+    """Injects the shared, pooled HTTP session into the wrapped function."""
 
     @wraps(func)
     def inject_http_session_wrapper(*args, **kwargs):
-        with Session() as session:
-            return func(*args, session=session, **kwargs)
+        return func(*args, session=HttpClient.session(), **kwargs)
 
     return inject_http_session_wrapper
 
 
-def download_file(url, destination_path: str, size: float):
+class HashingWriter:
+
+    def __init__(self, sink: BinaryIO, algorithm: str = "sha256"):
+        """
+        Wraps a writable sink, hashing and counting the bytes as they are written.
+
+        :param sink: The sink to forward the bytes to.
+        :param algorithm: The hashlib algorithm to checksum the bytes with.
+        """
+        self.sink = sink
+        self.hash = hashlib.new(algorithm)
+        self.bytes = 0
+
+    def __enter__(self):
+        self.sink.__enter__()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        return self.sink.__exit__(exc_type, exc_val, exc_tb)
+
+    def write(self, data: bytes) -> int:
+        """Hashes and forwards a chunk of bytes."""
+        self.hash.update(data)
+        self.bytes += len(data)
+        return self.sink.write(data)
+
+    def hexdigest(self) -> str:
+        """Returns the checksum of the bytes written so far."""
+        return self.hash.hexdigest()
+
+
+def download_file(url, destination_path: str, size: float, checksum: str = None):
     """
     Downloads a given dataset archive found at a URL endpoint.
 
+    The archive is fetched as several byte ranges in parallel when the server supports Range requests,
+    otherwise over a single streamed request. It is written beside the destination until complete, with
+    a sidecar recording the bytes received, so an interrupted download continues from where it stopped.
+    Given a checksum, the archive is hashed as it arrives and a corrupt archive is removed and raised as a
+    ChecksumError before it is moved to the destination.
+
     :param url: The URL to download the resource from.
     :param destination_path: The destination path for the download archive.
     :param size: The size of the download.
+    :param checksum: The expected checksum of the archive, as '<algorithm>:<hex digest>'.
     """
-    with alive_bar(total=math.ceil(size), title=f"[SLA] - INFO - - - Downloading {size} MB", manual=True) as bar:
-        # Download the file.
-        res = requests.get(url, stream=True)
-
-        # Throw an error for bad status codes
-        res.raise_for_status()
-
-        # Create save file and write out dataset content as data arrives.
-        with open(destination_path, "wb") as fh:
-            for KB, block in enumerate(res.iter_content(1024), start=1):
-                fh.write(block)
-                # Update progress for every MB downloaded.
-                MB, remainder = divmod(KB, 1024)
-                if remainder == 0:
-                    bar(MB / size)
+    expected = Checksum.parse(checksum) if checksum else None
+    with progress_bar(total=math.ceil(size), title=f"[SLA] - INFO - - - Downloading {size} MB", manual=True, unit="MB") as bar:
+        partial = _plan_download(url, destination_path)
+        if partial is not None:
+            return _download_ranges(partial, destination_path, bar, expected)
+
+        # Download the file, bad status codes are raised by the session once its retries are used up.
+        res = HttpClient.session().get(url, stream=True)
+
+        # Create save file and write out dataset content as data arrives, the progress is published by a ticker.
+        length = int(res.headers.get("Content-Length", 0)) or size * 1024 ** 2
+        algorithm = expected.algorithm if expected else "sha256"
+        with HashingWriter(open(PartialDownload.part_path(destination_path), "wb"), algorithm) as fh, \
+                ProgressTicker(lambda: bar(min(1.0, fh.bytes / length))):
+            copy_response(res, fh.write)
+
+        _check_length(url, res, fh.bytes, destination_path)
+        _verify_checksum(expected, fh.hexdigest(), destination_path)
+        PartialDownload.complete(destination_path)
+        emit_event("archive", url=url, bytes=fh.bytes)
 
         # Show progress bar as completed.
         bar(1.0)
@@ -59,15 +107,128 @@ def download_file(url, destination_path: str, size: float):
         return destination_path
 
 
-def unzip_file(archive_path: str, extracted_path: str):
+def _plan_download(url: str, destination_path: str) -> Union[PartialDownload, None]:
+    """
+    Plans the byte ranges to download a resource over, continuing a partial download of it if one is left.
+
+    :param url: The URL of the resource.
+    :param destination_path: The destination path for the download archive.
+    :return: The partial download to run, or None if the server does not support Range requests.
+    """
+    try:
+        remote = probe_range_support(HttpClient.session(), url)
+    except RequestException as e:
+        logger.debug(f"Could not probe {url} for Range support: {e.__str__()}")
+        return None
+
+    if remote is None:
+        logger.debug(f"{url} does not support Range requests.")
+        return None
+
+    partial = PartialDownload.load(destination_path)
+    if partial is not None:
+        part_size = os.path.getsize(PartialDownload.part_path(destination_path))
+        if partial.matches(url, remote.length, remote.etag) and part_size == remote.length:
+            return partial
+
+        logger.info(f"The archive at {url} changed since its partial download, restarting the download.")
+        PartialDownload.discard(destination_path)
+
+    settings = HttpClient.settings()
+    ranges = split_ranges(remote.length, settings.segments, int(settings.min_segment_size * 1024 ** 2))
+    logger.debug(f"Downloading {remote.length} bytes of {url} over {len(ranges)} ranges.")
+
+    return PartialDownload(url=url, length=remote.length, etag=remote.etag, ranges=ranges)
+
+
+def _download_ranges(partial: PartialDownload, destination_path: str, bar, expected: Union[Checksum, None] = None) -> str:
+    """
+    Downloads the remaining byte ranges of a resource, saving the bytes received to the sidecar as they arrive.
+
+    :param partial: The partial download to run.
+    :param destination_path: The destination path for the download archive.
+    :param bar: The progress bar of the download.
+    :param expected: The expected checksum of the archive.
+    :return: The destination path.
+    """
+
+    def checkpoint(offsets: List[int]):
+        partial.received = offsets
+        partial.save(destination_path)
+
+    partial.save(destination_path)
+    download = SegmentedDownload(HttpClient.session(), partial.url, PartialDownload.part_path(destination_path), partial.length,
+                                 partial.ranges, offsets=partial.received, on_checkpoint=checkpoint,
+                                 hasher=expected.hasher() if expected else None)
+    try:
+        download.run(on_progress=bar)
+    except (RequestException, IOError):
+        logger.warning(f"Download of {partial.url} stopped at {download.received} of {partial.length} bytes, "
+                       f"it will continue from there on the next run.")
+        raise
+
+    if expected is not None:
+        _verify_checksum(expected, download.hexdigest(), destination_path)
+    PartialDownload.complete(destination_path)
+    emit_event("archive", url=partial.url, bytes=partial.length, ranges=len(partial.ranges))
+
+    return destination_path
+
+
+def _check_length(url: str, res: Response, received: int, destination_path: str) -> None:
+    """
+    Checks a single stream download received the whole archive, as a server closing the connection early looks like a finished download.
+
+    A short archive is kept with a sidecar, so the next run continues it if the server then serves byte ranges.
+
+    :param url: The URL of the archive.
+    :param res: The response the archive was streamed from.
+    :param received: The number of bytes written.
+    :param destination_path: The destination path for the download archive.
+    """
+    # The length of an encoded body is not the length of the archive.
+    if "Content-Length" not in res.headers or res.headers.get("Content-Encoding", "identity") != "identity":
+        return
+
+    length = int(res.headers["Content-Length"])
+    if received == length:
+        return
+
+    # Sized as a ranged download would leave it, so it can be continued as one.
+    with open(PartialDownload.part_path(destination_path), "r+b") as fh:
+        fh.truncate(length)
+    PartialDownload(url=url, length=length, etag=res.headers.get("ETag"), ranges=[(0, length - 1)], received=[received]).save(destination_path)
+
+    raise IOError(f"Download of {url} stopped at {received} of {length} bytes, it will continue from there on the next run.")
+
+
+def _verify_checksum(expected: Union[Checksum, None], hexdigest: str, destination_path: str) -> None:
+    """
+    Checks a downloaded archive against its expected checksum, removing the download if it is corrupt.
+
+    :param expected: The expected checksum, nothing is checked if None.
+    :param hexdigest: The digest of the downloaded archive.
+    :param destination_path: The destination path for the download archive.
+    """
+    if expected is None:
+        return
+
+    try:
+        expected.verify(hexdigest, os.path.basename(destination_path))
+    except ChecksumError:
+        PartialDownload.discard(destination_path)
+        raise
+
+
+def unzip_file(archive_path: str, extracted_path: str, max_workers: int = 0):
     """
-    Unzips a ZIP file to a extract destination.
+    Unzips a ZIP file to a extract destination, splitting its members across a process pool.
 
     :param archive_path: The archive path.
     :param extracted_path: The path to extract to.
+    :param max_workers: The number of extraction processes, one per CPU if 0.
     """
-    with ZipFile(archive_path, "r") as fh:
-        fh.extractall(extracted_path)
+    extract_archives([(archive_path, extracted_path)], max_workers=max_workers)
 
 
 def move_images(image_paths: List[str], dst_path: str):
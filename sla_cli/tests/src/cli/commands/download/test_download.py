@@ -4,3 +4,31 @@ Date:       11 April 2021
 """
 
 import pytest
+from unittest.mock import patch
+
+import sla_cli.src.cli.commands.download as sut
+
+
+class FailingDownloader:
+    """Downloader that always fails."""
+
+    def __init__(self, options):
+        self.options = options
+
+    def download(self):
+        raise IOError(f"Could not download {self.options.dataset}.")
+
+
+@pytest.mark.parametrize("datasets", [["ph2"], ["ph2", "mednode"]])
+def test_download_failed_exit_code(datasets, cli, cli_runner, tmpdir):
+    """
+    :GIVEN: Datasets whose downloads fail.
+    :WHEN:  Running the download command.
+    :THEN:  Verify every dataset is attempted and the command exits with a non-zero code.
+    """
+    with patch.object(sut, "downloader_factory", lambda dataset: FailingDownloader), \
+            patch.object(FailingDownloader, "download", autospec=True, side_effect=FailingDownloader.download) as download:
+        res = cli_runner.invoke(cli, ["--progress", "jsonl", "download", "-d", str(tmpdir), *datasets])
+
+    assert download.call_count == len(datasets)
+    assert res.exit_code == 1
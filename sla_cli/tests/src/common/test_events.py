@@ -0,0 +1,95 @@
+"""
+Author:     David Walshe
+Date:       17 October 2026
+"""
+
+import io
+import json
+import logging
+
+import pytest
+
+import sla_cli.src.common.events as sut
+
+
+class Stream(io.StringIO):
+    """Text stream reporting whether it is a terminal."""
+
+    def __init__(self, tty: bool):
+        super().__init__()
+        self.tty = tty
+
+    def isatty(self):
+        return self.tty
+
+
+def read_events(stream: io.StringIO) -> list:
+    """Returns the events written to a stream."""
+    return [json.loads(line) for line in stream.getvalue().splitlines()]
+
+
+@pytest.mark.parametrize("mode, tty, expected",
+                         [
+                             ("auto", True, "bar"),
+                             ("auto", False, "jsonl"),
+                             ("bar", False, "bar"),
+                             ("jsonl", True, "jsonl"),
+                         ])
+def test_resolve_mode(mode, tty, expected):
+    """
+    :GIVEN: A progress mode and an output stream that is or is not a terminal.
+    :WHEN:  Resolving the progress mode.
+    :THEN:  Verify 'auto' only draws bars on a terminal and explicit modes are kept.
+    """
+    assert sut.resolve_mode(mode, Stream(tty)) == expected
+
+
+def test_emit():
+    """
+    :GIVEN: An event stream.
+    :WHEN:  Writing an event with some empty fields.
+    :THEN:  Verify a single JSON line is written with the event type, time and set fields.
+    """
+    stream = io.StringIO()
+    sut.EventStream(stream).emit("batch", task="msk_1", images=300, bytes=1024, error=None)
+
+    events = read_events(stream)
+    assert len(events) == 1
+    assert {key: value for key, value in events[0].items() if key != "time"} == {"event": "batch", "task": "msk_1", "images": 300, "bytes": 1024}
+
+
+def test_progress_rate_limit():
+    """
+    :GIVEN: An event stream with an interval between progress events.
+    :WHEN:  Reporting progress of two tasks many times.
+    :THEN:  Verify one event is written for each task until the interval passes, unless forced.
+    """
+    stream = io.StringIO()
+    events = sut.EventStream(stream, interval=60)
+
+    for count in range(10):
+        events.progress("ph2", count=count)
+        events.progress("mednode", count=count)
+    events.progress("ph2", force=True, count=10)
+
+    assert [(event["task"], event["count"]) for event in read_events(stream)] == [("ph2", 0), ("mednode", 0), ("ph2", 10)]
+
+
+def test_log_handler():
+    """
+    :GIVEN: An event log handler on a logger.
+    :WHEN:  Logging messages of several levels.
+    :THEN:  Verify only warnings and errors are written as events.
+    """
+    stream = io.StringIO()
+    handler = sut.EventLogHandler(sut.EventStream(stream))
+    log = logging.getLogger("sla_cli.tests.events")
+    log.addHandler(handler)
+    try:
+        log.info("Starting.")
+        log.warning("Slow server.")
+        log.error("Download failed.")
+    finally:
+        log.removeHandler(handler)
+
+    assert [(event["event"], event["message"]) for event in read_events(stream)] == [("warning", "Slow server."), ("error", "Download failed.")]
@@ -0,0 +1,94 @@
+"""
+Author:     David Walshe
+Date:       17 October 2026
+"""
+
+import io
+import json
+import time
+
+import pytest
+
+from sla_cli.src.common.events import EventStream
+from sla_cli.src.common.progress import TaskProgress, CombinedProgress, ProgressTicker, Progress, progress_bar
+
+
+@pytest.mark.parametrize("total, manual, updates, expected",
+                         [
+                             (10, False, [((), {"incr": 3}), ((), {})], "40%"),
+                             (None, False, [((), {})], "Extracting"),
+                             (None, True, [((0.25,), {})], "25%"),
+                         ])
+def test_task_progress_summary(total, manual, updates, expected):
+    """
+    :GIVEN: A task in a combined progress view.
+    :WHEN:  Updating it like an alive_bar handle.
+    :THEN:  Verify the summary shows the completed percentage, or the phase when the total is unknown.
+    """
+    task = TaskProgress("[SLA] - INFO - - - Extracting", total, manual)
+
+    for args, kwargs in updates:
+        task(*args, **kwargs)
+
+    assert task.summary() == expected
+
+
+def test_combined_progress_status():
+    """
+    :GIVEN: A combined progress view with two running tasks.
+    :WHEN:  A task moves to a new phase and the other finishes.
+    :THEN:  Verify the status only shows the latest phase of the running task.
+    """
+    with CombinedProgress(["ph2", "mednode"], title="Downloading") as progress:
+        with progress.task("ph2", "Downloading", 4) as bar:
+            bar(incr=2)
+        with progress.task("mednode", "Downloading", 2) as bar:
+            bar()
+        with progress.task("ph2", "[SLA] - INFO - - - Extracting", None):
+            pass
+        progress.finished("mednode")
+
+        assert progress.status() == "ph2: Extracting"
+
+
+def test_progress_ticker():
+    """
+    :GIVEN: Work updating a counter.
+    :WHEN:  Publishing its progress with a ticker.
+    :THEN:  Verify progress is published while the work runs and once more with the final count.
+    """
+    counter = {"bytes": 0}
+    published = []
+
+    with ProgressTicker(lambda: published.append(counter["bytes"]), interval=0.01):
+        for _ in range(5):
+            counter["bytes"] += 1
+            time.sleep(0.02)
+        counter["bytes"] = 10
+
+    assert len(published) > 1
+    assert published[-1] == 10
+    assert published == sorted(published)
+
+
+def test_progress_bar_events(monkeypatch):
+    """
+    :GIVEN: Progress reported as events, for a task of a dataset.
+    :WHEN:  Running a unit of work through a progress bar.
+    :THEN:  Verify its start, progress and end are written as events tagged with the dataset.
+    """
+    stream = io.StringIO()
+    monkeypatch.setattr(Progress, "events", EventStream(stream, interval=60))
+    Progress.set_task_name("ph2")
+    try:
+        with progress_bar(4, title="[SLA] - INFO - - - Downloading images", unit="images") as bar:
+            for _ in range(4):
+                bar()
+    finally:
+        Progress.set_task_name(None)
+
+    events = [json.loads(line) for line in stream.getvalue().splitlines()]
+
+    assert [(event["event"], event.get("state")) for event in events] == [("phase", "start"), ("progress", None), ("progress", None), ("phase", "end")]
+    assert all(event["task"] == "ph2" and event["phase"] == "Downloading images" for event in events)
+    assert events[-2]["count"] == 4 and events[-2]["total"] == 4 and events[-2]["unit"] == "images"
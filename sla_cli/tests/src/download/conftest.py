@@ -10,7 +10,7 @@ from contextlib import contextmanager
 from requests import Session
 
 from sla_cli.src.download import DownloaderOptions
-from sla_cli.src.common.config import Config, Isic
+from sla_cli.src.common.config import Config, Isic, Http, Scheduler
 
 
 @pytest.fixture
@@ -27,6 +27,21 @@ def downloader_options_factory(tmpdir):
     config.isic = MagicMock(spec=Isic)
     config.isic.batch_size = 10
     config.isic.max_workers = 5
+    config.isic.engine = "threads"
+    config.isic.max_in_flight = 5
+    config.isic.stream_extract = True
+    config.isic.extract_workers = 2
+    config.isic.extract_queue_size = 4
+    config.isic.adaptive = False
+    config.isic.retry_attempts = 3
+    config.isic.retry_batch_size = 10
+    config.isic.metadata_workers = 4
+    config.isic.stream_metadata = False
+    config.isic.per_dataset_metadata = False
+    config.isic.consolidate = False
+    config.extract_workers = 2
+    config.http = Http(retries=0)
+    config.scheduler = Scheduler()
 
     def make(**kwargs):
         with tmpdir.as_cwd():
@@ -0,0 +1,94 @@
+"""
+Author:     David Walshe
+Date:       17 October 2026
+"""
+
+import pytest
+
+import sla_cli.src.download.isic.adaptive as sut
+
+
+def run_round(controller: sut.AimdController, seconds: float = 1.0, ok: bool = True, bytes_per_image: int = 1000):
+    """Records one full round of identical samples."""
+    for _ in range(controller.workers):
+        controller.record(sut.BatchSample(images=controller.batch_size, bytes=controller.batch_size * bytes_per_image,
+                                          seconds=seconds * controller.batch_size / 100, ok=ok))
+
+
+@pytest.mark.parametrize("workers, batch_size, expected_workers, expected_batch_size",
+                         [
+                             (5, 25, 5, 25),
+                             (0, 0, 1, 1),
+                             (100, 1000, sut.AimdController.MAX_WORKERS, 300),
+                         ])
+def test_init_limits(workers, batch_size, expected_workers, expected_batch_size):
+    """
+    :GIVEN: Starting values for the workers and batch size.
+    :WHEN:  Creating the controller.
+    :THEN:  Verify the values are clamped to the allowed range.
+    """
+    controller = sut.AimdController(workers=workers, batch_size=batch_size, max_batch_size=300)
+
+    assert controller.workers == expected_workers
+    assert controller.batch_size == expected_batch_size
+
+
+def test_additive_increase():
+    """
+    :GIVEN: A controller receiving healthy rounds at a steady per image latency.
+    :WHEN:  Recording several rounds.
+    :THEN:  Verify the limits grow by one step per round, never passing the API cap.
+    """
+    controller = sut.AimdController(workers=2, batch_size=25, max_batch_size=300)
+
+    run_round(controller)
+    assert (controller.workers, controller.batch_size) == (3, 50)
+
+    for _ in range(20):
+        run_round(controller)
+
+    assert controller.batch_size == 300
+    assert controller.workers <= sut.AimdController.MAX_WORKERS
+
+
+def test_multiplicative_decrease_on_errors():
+    """
+    :GIVEN: A controller receiving a round of failed batches.
+    :WHEN:  Recording the round.
+    :THEN:  Verify both limits are halved.
+    """
+    controller = sut.AimdController(workers=8, batch_size=200, max_batch_size=300)
+
+    run_round(controller, ok=False)
+
+    assert (controller.workers, controller.batch_size) == (4, 100)
+
+
+def test_multiplicative_decrease_on_latency():
+    """
+    :GIVEN: A controller that has seen a healthy round.
+    :WHEN:  The per image latency more than doubles.
+    :THEN:  Verify both limits are halved.
+    """
+    controller = sut.AimdController(workers=4, batch_size=100, max_batch_size=300)
+
+    run_round(controller, seconds=1.0)
+    workers, batch_size = controller.workers, controller.batch_size
+    run_round(controller, seconds=5.0)
+
+    assert (controller.workers, controller.batch_size) == (workers // 2, batch_size // 2)
+
+
+def test_hold_on_throughput_drop():
+    """
+    :GIVEN: A controller that has seen a healthy round.
+    :WHEN:  The throughput falls without a latency spike.
+    :THEN:  Verify the limits are held.
+    """
+    controller = sut.AimdController(workers=4, batch_size=100, max_batch_size=300)
+
+    run_round(controller, bytes_per_image=1000)
+    workers, batch_size = controller.workers, controller.batch_size
+    run_round(controller, bytes_per_image=100)
+
+    assert (controller.workers, controller.batch_size) == (workers, batch_size)
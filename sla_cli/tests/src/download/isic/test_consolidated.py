@@ -0,0 +1,85 @@
+"""
+Author:     David Walshe
+Date:       17 October 2026
+"""
+
+import io
+import os
+from zipfile import ZipFile
+
+import pandas as pd
+from unittest.mock import patch, MagicMock
+
+import sla_cli.src.download.isic.consolidated as sut
+from sla_cli.src.download.isic.download import IsicImageDownloader
+from sla_cli.src.download.isic.journal import BatchRecord
+
+METADATA = {
+    "uda_1": pd.DataFrame({"isic_id": ["id_0", "id_1"], "image_name": ["ISIC_0000000", "ISIC_0000001"]}),
+    "msk_5": pd.DataFrame({"isic_id": ["id_2"], "image_name": ["ISIC_0000002"]}),
+}
+
+FOLDERS = {"ISIC_0000000": "UDA-1", "ISIC_0000001": "UDA-1", "ISIC_0000002": "MSK-5"}
+
+
+def make_response(image_names):
+    """Returns a mock streamed batch response holding the images, as the ISIC API lays them out."""
+    stream = io.BytesIO()
+    with ZipFile(stream, "w") as zf:
+        for name in image_names:
+            zf.writestr(f"ISIC-images/{FOLDERS[name]}/{name}.jpg", name.encode())
+            zf.writestr(f"ISIC-images/{FOLDERS[name]}/{name}.txt", b"license")
+    body = stream.getvalue()
+
+    res = MagicMock()
+    res.iter_content.side_effect = lambda n: (body[i:i + n] for i in range(0, len(body), n))
+
+    return res
+
+
+def test_download_shared_batches(downloader_options_factory, tmpdir):
+    """
+    :GIVEN: Two ISIC datasets, one with an image already journaled.
+    :WHEN:  Downloading them together.
+    :THEN:  Verify the pending images share one batch, land in their own dataset folders and are journaled per dataset.
+    """
+    requested = []
+
+    def make_request(session, batch):
+        requested.append(list(batch))
+        ids = pd.concat(METADATA.values()).set_index("isic_id")["image_name"]
+        return make_response([ids[isic_id] for isic_id in batch])
+
+    with tmpdir.as_cwd(), patch.object(IsicImageDownloader, "_get_metadata", lambda x: METADATA[x.dataset_name]):
+        downloaders = []
+        for dataset in METADATA:
+            options = downloader_options_factory(dataset=dataset)
+            options.config.unzip = True
+            downloaders.append(IsicImageDownloader(options))
+
+        downloaders[0].journal.record(BatchRecord(image_ids=["id_0"], bytes=0, sha256=""))
+        downloaders[0]._make_request = make_request
+
+        consolidated = sut.ConsolidatedIsicDownloader(downloaders)
+        consolidated._download()
+
+    assert requested == [["id_1", "id_2"]]
+    assert os.listdir(downloaders[0].isic_image_path) == ["ISIC_0000001.jpg"]
+    assert os.listdir(downloaders[1].isic_image_path) == ["ISIC_0000002.jpg"]
+    assert downloaders[0].journal.completed_ids() == {"id_0", "id_1"}
+    assert downloaders[1].journal.completed_ids() == {"id_2"}
+
+
+def test_route_unknown_member(downloader_options_factory, tmpdir):
+    """
+    :GIVEN: A consolidated download.
+    :WHEN:  Routing an archive member of an image not in any dataset.
+    :THEN:  Verify the member is not routed.
+    """
+    with tmpdir.as_cwd(), patch.object(IsicImageDownloader, "_get_metadata", lambda x: METADATA[x.dataset_name]):
+        downloader = IsicImageDownloader(downloader_options_factory(dataset="uda_1"))
+        consolidated = sut.ConsolidatedIsicDownloader([downloader])
+        consolidated.pending_images()
+
+    assert consolidated.route("ISIC-images/UDA-1/ISIC_0000000.jpg") == downloader.download_path
+    assert consolidated.route("ISIC-images/UDA-1/ISIC_9999999.jpg") is None
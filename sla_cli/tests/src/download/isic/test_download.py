@@ -3,10 +3,15 @@ Author:     David Walshe
 Date:       11 April 2021
 """
 import os
+import io
+import threading
+import time
+import shutil
+from zipfile import ZipFile
 
 import pandas as pd
 import pytest
-from unittest.mock import patch
+from unittest.mock import patch, MagicMock
 
 import httpretty
 from httpretty import register_uri
@@ -61,7 +66,7 @@ def test_make_batches(data, batch_size, expected):
                              ('BCN_20000', 5),
                              ('Brisbane ISIC Challenge 2020', 1),
                          ])
-def test_get_metadata(dataset, size, metadata_file, downloader_options_factory, monkeypatch):
+def test_get_metadata(dataset, size, metadata_file, downloader_options_factory, monkeypatch, tmpdir):
     """
     :GIVEN: A dataset name.
     :WHEN:  Gathering the metadata for a given dataset.
@@ -69,10 +74,14 @@ def test_get_metadata(dataset, size, metadata_file, downloader_options_factory,
     """
     downloader_options = downloader_options_factory(dataset=dataset)
 
+    # Copy the database file, the metadata store is built beside it.
+    db_file = str(tmpdir.join("isic_metadata.csv"))
+    shutil.copy(metadata_file, db_file)
+
     # Mock decorator.
     with patch("sla_cli.src.download.isic.metadata._download_isic_metadata", autospec=True) as mock:
         # Mock location to database file.
-        monkeypatch.setattr(sut.Path, "isic_metadata", lambda: metadata_file)
+        monkeypatch.setattr(sut.Path, "isic_metadata", lambda: db_file)
 
         downloader = sut.IsicImageDownloader(downloader_options)
 
@@ -174,6 +183,31 @@ def test_create_download_path_already_exists_force(dataset, downloader_options_f
         assert caplog.messages[-1] == f"Created the download directory at: '{expected_path}'"
 
 
+@pytest.mark.parametrize("dataset",
+                         [
+                             "ham10000",
+                             "bcn_20000",
+                         ])
+def test_create_download_path_resumes(dataset, downloader_options_factory, tmpdir, caplog, metadata):
+    """
+    :GIVEN: A destination directory holding an unfinished download journal.
+    :WHEN:  Creating the downloader without the force switch.
+    :THEN:  Verify the download is resumed and only the images without a completed batch are pending.
+    """
+    with tmpdir.as_cwd():
+        expected_path = os.path.join(os.getcwd(), dataset)
+        os.mkdir(expected_path)
+        journal = sut.BatchJournal(expected_path)
+        journal.record(sut.BatchRecord(image_ids=list(metadata["isic_id"])[:15], bytes=100, sha256="00"))
+
+        with patch.object(sut.IsicImageDownloader, "_get_metadata", lambda x: metadata):
+            downloader = sut.IsicImageDownloader(downloader_options_factory(dataset=dataset))
+
+        assert downloader.download_path == expected_path
+        assert caplog.messages[-1] == f"Found an unfinished download of {dataset} at '{expected_path}', resuming..."
+        assert downloader.pending_image_ids == list(metadata["isic_id"])[15:]
+
+
 def test_image_ids(metadata, downloader_options_factory, mock_get_metadata):
     """
     :GIVEN: A metadata file.
@@ -189,4 +223,215 @@ def test_image_ids(metadata, downloader_options_factory, mock_get_metadata):
     assert len(downloader.image_ids) == 20
     assert downloader.image_ids == list(metadata["isic_id"])
 
+
+@pytest.fixture
+def batch_response():
+    """Returns a mock streamed batch response holding a ZIP archive of an image and its license file."""
+    stream = io.BytesIO()
+    with ZipFile(stream, "w") as zf:
+        zf.writestr("ISIC-images/UDA-1/ISIC_0000000.jpg", b"image")
+        zf.writestr("ISIC-images/UDA-1/ISIC_0000000.txt", b"license")
+    body = stream.getvalue()
+
+    res = MagicMock()
+    res.iter_content.side_effect = lambda n: (body[i:i + n] for i in range(0, len(body), n))
+
+    return res
+
+
+def test_process_response_stream_extract(batch_response, tmpdir):
+    """
+    :GIVEN: A batch response holding a ZIP archive of images and license files.
+    :WHEN:  Processing the response with streaming extraction.
+    :THEN:  Verify the images are extracted, the license files dropped and no archive is saved.
+    """
+    options = sut.ResponseOptions(0, str(tmpdir), unzip=True, stream_extract=True)
+    writer = sut.IsicImageDownloader._process_response(batch_response, options)
+
+    assert writer.bytes > 0
+    assert os.listdir(str(tmpdir)) == ["ISIC-images"]
+    assert os.listdir(os.path.join(str(tmpdir), "ISIC-images", "UDA-1")) == ["ISIC_0000000.jpg"]
+
+
+def test_process_response_archive(batch_response, tmpdir):
+    """
+    :GIVEN: A batch response holding a ZIP archive of images and license files.
+    :WHEN:  Processing the response without streaming extraction and extracting the saved archive.
+    :THEN:  Verify the archive is saved, then unpacked without the license files and removed.
+    """
+    options = sut.ResponseOptions(3, str(tmpdir), unzip=True, stream_extract=False)
+    sut.IsicImageDownloader._process_response(batch_response, options)
+
+    assert os.listdir(str(tmpdir)) == ["download_3.zip"]
+
+    sut.extract_batch_archive(os.path.join(str(tmpdir), "download_3.zip"), str(tmpdir))
+
+    assert os.listdir(str(tmpdir)) == ["ISIC-images"]
+    assert os.listdir(os.path.join(str(tmpdir), "ISIC-images", "UDA-1")) == ["ISIC_0000000.jpg"]
+
+
+@pytest.mark.parametrize("unavailable, expected",
+                         [
+                             ([], True),
+                             (["ISIC_0000003"], False),
+                         ])
+def test_verify_download(unavailable, expected, downloader_options_factory, tmpdir, monkeypatch):
+    """
+    :GIVEN: A download missing some images, some of which are permanently unavailable.
+    :WHEN:  Verifying the download.
+    :THEN:  Verify only missing images are re-requested, retries stop at the budget and a report lists the rest.
+    """
+    metadata = pd.DataFrame({"isic_id": [f"id_{i}" for i in range(5)], "image_name": [f"ISIC_000000{i}" for i in range(5)]})
+    monkeypatch.setattr(sut.time, "sleep", lambda seconds: None)
+
+    with tmpdir.as_cwd(), patch.object(sut.IsicImageDownloader, "_get_metadata", lambda x: metadata):
+        downloader = sut.IsicImageDownloader(downloader_options_factory(dataset="uda_1"))
+        os.makedirs(downloader.isic_image_path)
+        for name in ["ISIC_0000000", "ISIC_0000001"]:
+            open(os.path.join(downloader.isic_image_path, f"{name}.jpg"), "w").close()
+
+        requested = []
+
+        def download_missing(missing_ids):
+            requested.append(sorted(missing_ids))
+            for isic_id in missing_ids:
+                name = metadata[metadata["isic_id"] == isic_id]["image_name"].iloc[0]
+                if name not in unavailable:
+                    open(os.path.join(downloader.isic_image_path, f"{name}.jpg"), "w").close()
+
+        monkeypatch.setattr(downloader, "_download_missing_images", download_missing)
+
+        assert downloader._verify_download() == expected
+
+        assert requested[0] == ["id_2", "id_3", "id_4"]
+        assert all(ids == ["id_3"] for ids in requested[1:])
+        assert len(requested) == (1 if expected else 3)
+        assert os.path.exists(downloader.missing_report_path) == (not expected)
+
+
+def test_download_pipelined(downloader_options_factory, tmpdir):
+    """
+    :GIVEN: Per dataset metadata arriving over two pages.
+    :WHEN:  Downloading the dataset.
+    :THEN:  Verify the images of the first page are requested before the second page arrives.
+    """
+    options = downloader_options_factory(dataset="msk_5")
+    options.config.isic.per_dataset_metadata = True
+    options.config.unzip = True
+    first_requested = threading.Event()
+    requested = []
+
+    def dataset_pages(self, session, dataset):
+        assert dataset == "MSK-5"
+        yield pd.DataFrame({"isic_id": ["id_0", "id_1"], "image_name": ["ISIC_0", "ISIC_1"]})
+        assert first_requested.wait(timeout=5)
+        yield pd.DataFrame({"isic_id": ["id_2"], "image_name": ["ISIC_2"]})
+
+    def fetch_batch(session, batch, response_options):
+        requested.append(batch)
+        first_requested.set()
+        writer = sut.HashingWriter(io.BytesIO())
+        writer.write(b"images")
+        return writer
+
+    with tmpdir.as_cwd(), patch.object(sut.IsicMetadataDownloader, "dataset_pages", dataset_pages):
+        downloader = sut.IsicImageDownloader(options)
+        assert downloader.metadata is None
+
+        downloader._fetch_batch = fetch_batch
+        downloader._download_pipelined()
+
+    assert sorted(image_id for batch in requested for image_id in batch) == ["id_0", "id_1", "id_2"]
+    assert list(downloader.metadata["isic_id"]) == ["id_0", "id_1", "id_2"]
+    assert downloader.journal.completed_ids() == {"id_0", "id_1", "id_2"}
+
+
+def test_download_threaded_holds_back(downloader_options_factory, tmpdir):
+    """
+    :GIVEN: A threaded download whose extraction queue is full, so completing a batch blocks.
+    :WHEN:  Downloading the batches.
+    :THEN:  Verify no more batches are requested than there are threads until the queue has room.
+    """
+    options = downloader_options_factory(dataset="uda_1")
+    options.config.unzip = True
+    batches = {index: [f"id_{index}"] for index in range(10)}
+    fetched, held = [], []
+
+    def fetch_batch(session, batch, response_options):
+        fetched.append(batch)
+        return sut.HashingWriter(io.BytesIO())
+
+    def complete_batch(index, image_ids, writer, bar):
+        if not held:
+            # Give the threads time to run ahead, as they would while the queue is full.
+            time.sleep(0.1)
+            held.append(len(fetched))
+
+    with tmpdir.as_cwd(), patch.object(sut.IsicImageDownloader, "_get_metadata", lambda x: None):
+        downloader = sut.IsicImageDownloader(options)
+        downloader._fetch_batch = fetch_batch
+        downloader._complete_batch = complete_batch
+        downloader._download_threaded(None, batches, bar=lambda **kwargs: None)
+
+    assert held == [downloader.max_workers]
+    assert len(fetched) == len(batches)
+
+def test_where_selects_images(downloader_options_factory, metadata, tmpdir):
+    """
+    :GIVEN: A '--where' expression for a dataset.
+    :WHEN:  Creating the downloader.
+    :THEN:  Verify only the ids of the matching images are downloaded.
+    """
+    options = downloader_options_factory(dataset="bcn_20000")
+    options.where = "dx == 'nevus'"
+    dataset = metadata[metadata["dataset"] == "BCN_20000"]
+
+    with tmpdir.as_cwd(), patch.object(sut.IsicImageDownloader, "_get_metadata", lambda x: dataset):
+        downloader = sut.IsicImageDownloader(options)
+
+    assert downloader.image_ids == list(dataset[dataset["dx"] == "nevus"]["isic_id"])
+
+
+@pytest.mark.parametrize("where", ["dx == 'unknown'"])
+def test_finish_no_images(where, downloader_options_factory, metadata, tmpdir):
+    """
+    :GIVEN: A '--where' expression matching no images of a dataset.
+    :WHEN:  Downloading and finishing the dataset.
+    :THEN:  Verify an empty images folder and the metadata are saved and the journal is removed.
+    """
+    options = downloader_options_factory(dataset="bcn_20000")
+    options.where = where
+    dataset = metadata[metadata["dataset"] == "BCN_20000"]
+
+    with tmpdir.as_cwd(), patch.object(sut.IsicImageDownloader, "_get_metadata", lambda x: dataset):
+        downloader = sut.IsicImageDownloader(options)
+        downloader.journal.create()
+        downloader._download()
+        downloader.finish()
+
+    assert downloader.image_ids == []
+    assert os.listdir(downloader.image_dst_directory) == []
+    assert os.path.exists(os.path.join(downloader.download_path, "metadata.csv"))
+    assert not os.path.exists(downloader.journal.path)
+
+
+@pytest.mark.parametrize("error", [KeyboardInterrupt, IOError])
+def test_finish_interrupted(error, downloader_options_factory, metadata, tmpdir):
+    """
+    :GIVEN: A download whose verification is interrupted.
+    :WHEN:  Finishing the download.
+    :THEN:  Verify the journal is kept, so the next run resumes the download.
+    """
+    dataset = metadata[metadata["dataset"] == "BCN_20000"]
+
+    with tmpdir.as_cwd(), patch.object(sut.IsicImageDownloader, "_get_metadata", lambda x: dataset):
+        downloader = sut.IsicImageDownloader(downloader_options_factory(dataset="bcn_20000"))
+        downloader.journal.create()
+
+        with patch.object(downloader, "_verify_download", side_effect=error), pytest.raises(error):
+            downloader.finish()
+
+    assert os.path.exists(downloader.journal.path)
+
+
 # todo Complete ISIC downloader tests.
@@ -0,0 +1,197 @@
+"""
+Author:     David Walshe
+Date:       17 October 2026
+"""
+
+import io
+import threading
+
+import pytest
+
+import sla_cli.src.download.isic.engine as sut
+from sla_cli.src.common.config import Http
+
+
+class FakeContent:
+    """Mocks the streamed content of an aiohttp response."""
+
+    def __init__(self, body: bytes):
+        self.body = body
+
+    async def iter_chunked(self, n: int):
+        for i in range(0, len(self.body), n):
+            yield self.body[i:i + n]
+
+
+class FakeResponse:
+    """Mocks an aiohttp response."""
+
+    def __init__(self, body: bytes, status: int = 200):
+        self.content = FakeContent(body)
+        self.status = status
+
+    def raise_for_status(self):
+        if self.status >= 400:
+            error = IOError(f"HTTP {self.status}")
+            error.status = self.status
+            raise error
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        return False
+
+
+class FakeSession:
+    """Mocks an aiohttp client session, tracking the peak number of open requests."""
+
+    def __init__(self, responses: dict):
+        self.responses = responses
+        self.in_flight = 0
+        self.peak = 0
+        self.requests = 0
+
+    def get(self, url: str):
+        session = self
+
+        class Request:
+            async def __aenter__(self):
+                session.requests += 1
+                session.in_flight += 1
+                session.peak = max(session.peak, session.in_flight)
+                # Yield to the event loop so other requests can start.
+                await sut.asyncio.sleep(0)
+                response = session.responses[url]
+                # A list of responses is served in turn, to mock failures followed by success.
+                return response.pop(0) if isinstance(response, list) else response
+
+            async def __aexit__(self, *args):
+                session.in_flight -= 1
+                return False
+
+        return Request()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        return False
+
+
+class Sink(io.BytesIO):
+    """BytesIO that keeps its contents after being closed."""
+
+    def close(self):
+        self.saved = self.getvalue()
+        super().close()
+
+
+@pytest.mark.parametrize("max_in_flight, n_batches",
+                         [
+                             (1, 5),
+                             (3, 10),
+                             (5, 2),
+                         ])
+def test_run_bounds_in_flight_requests(max_in_flight, n_batches, monkeypatch):
+    """
+    :GIVEN: A number of batch URLs and a limit on requests in flight.
+    :WHEN:  Running the asyncio engine over the batches.
+    :THEN:  Verify every batch is streamed to its sink and the in flight limit is respected.
+    """
+    urls = [f"http://www.fake_url.test/{i}" for i in range(n_batches)]
+    session = FakeSession({url: FakeResponse(f"batch-{i}".encode() * 1000) for i, url in enumerate(urls)})
+    monkeypatch.setattr(sut.AsyncBatchEngine, "_make_session", staticmethod(lambda: session))
+
+    sinks, completed = {}, {}
+
+    def open_sink(index):
+        sinks[index] = Sink()
+        return sinks[index]
+
+    engine = sut.AsyncBatchEngine(max_in_flight, open_sink=open_sink, on_complete=lambda index, n: completed.update({index: n}))
+    engine.run(urls)
+
+    assert session.peak <= max_in_flight
+    assert sorted(completed) == list(range(n_batches))
+    for i in range(n_batches):
+        assert sinks[i].saved == f"batch-{i}".encode() * 1000
+        assert completed[i] == len(sinks[i].saved)
+
+
+def test_run_blocking_on_complete(monkeypatch):
+    """
+    :GIVEN: A batch whose completion blocks, as it does while the extraction queue is full.
+    :WHEN:  Running the asyncio engine over the batches.
+    :THEN:  Verify the other batches keep streaming and completing while it blocks.
+    """
+    urls = [f"http://www.fake_url.test/{i}" for i in range(3)]
+    session = FakeSession({url: FakeResponse(f"batch-{i}".encode()) for i, url in enumerate(urls)})
+    monkeypatch.setattr(sut.AsyncBatchEngine, "_make_session", staticmethod(lambda: session))
+
+    others_done = threading.Event()
+    completed = []
+
+    def on_complete(index, n):
+        if index == 0:
+            # Wait for room in the queue, which only the other batches free up.
+            assert others_done.wait(timeout=5)
+        completed.append(index)
+        if sorted(completed) == [1, 2]:
+            others_done.set()
+
+    engine = sut.AsyncBatchEngine(3, open_sink=lambda index: Sink(), on_complete=on_complete)
+    engine.run(urls)
+
+    assert completed[-1] == 0
+    assert sorted(completed) == [0, 1, 2]
+
+
+@pytest.mark.parametrize("body, status",
+                         [
+                             (b"", 200),
+                             (b"error", 500),
+                         ])
+def test_run_skips_failed_batches(body, status, monkeypatch, caplog):
+    """
+    :GIVEN: A batch request that returns an empty body or an error status.
+    :WHEN:  Running the asyncio engine.
+    :THEN:  Verify the batch is not reported as complete and a warning is logged.
+    """
+    url = "http://www.fake_url.test/0"
+    session = FakeSession({url: FakeResponse(body, status)})
+    monkeypatch.setattr(sut.AsyncBatchEngine, "_make_session", staticmethod(lambda: session))
+
+    completed = []
+    engine = sut.AsyncBatchEngine(1, open_sink=lambda index: Sink(), on_complete=lambda index, n: completed.append(index),
+                                  settings=Http(retries=0))
+    engine.run([url])
+
+    assert completed == []
+    assert caplog.messages[-1].startswith("Batch 0 failed")
+
+
+@pytest.mark.parametrize("status, retries, expected_requests, succeeds",
+                         [
+                             (503, 2, 3, True),
+                             (503, 1, 2, False),
+                             (404, 5, 1, False),
+                         ])
+def test_run_retries_transient_failures(status, retries, expected_requests, succeeds, monkeypatch):
+    """
+    :GIVEN: A batch request that fails twice before succeeding.
+    :WHEN:  Running the asyncio engine with a retry limit.
+    :THEN:  Verify only transient statuses are retried, up to the limit.
+    """
+    url = "http://www.fake_url.test/0"
+    responses = [FakeResponse(b"", status), FakeResponse(b"", status), FakeResponse(b"batch")]
+    session = FakeSession({url: responses})
+    monkeypatch.setattr(sut.AsyncBatchEngine, "_make_session", staticmethod(lambda: session))
+
+    completed = []
+    engine = sut.AsyncBatchEngine(1, open_sink=lambda index: Sink(), on_complete=lambda index, n: completed.append(index),
+                                  settings=Http(retries=retries, backoff=0))
+    engine.run([url])
+
+    assert session.requests == expected_requests
+    assert completed == ([0] if succeeds else [])
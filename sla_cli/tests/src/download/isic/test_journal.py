@@ -0,0 +1,74 @@
+"""
+Author:     David Walshe
+Date:       17 October 2026
+"""
+
+import os
+
+import sla_cli.src.download.isic.journal as sut
+
+
+def test_record(tmpdir):
+    """
+    :GIVEN: A journal in a download path.
+    :WHEN:  Recording completed batches.
+    :THEN:  Verify the records and completed ids are read back.
+    """
+    journal = sut.BatchJournal(str(tmpdir))
+    journal.create()
+
+    assert sut.BatchJournal.exists(str(tmpdir)) == True
+    assert journal.records() == []
+
+    journal.record(sut.BatchRecord(image_ids=["a", "b"], bytes=10, sha256="00"))
+    journal.record(sut.BatchRecord(image_ids=["c"], bytes=5, sha256="11"))
+
+    assert len(journal.records()) == 2
+    assert journal.records()[1] == sut.BatchRecord(image_ids=["c"], bytes=5, sha256="11")
+    assert journal.completed_ids() == {"a", "b", "c"}
+
+
+def test_records_ignores_partial_line(tmpdir):
+    """
+    :GIVEN: A journal whose last entry was cut off mid-write.
+    :WHEN:  Reading the journal.
+    :THEN:  Verify only the complete entries are returned.
+    """
+    journal = sut.BatchJournal(str(tmpdir))
+    journal.record(sut.BatchRecord(image_ids=["a"], bytes=1, sha256="00"))
+
+    with open(journal.path, "a") as fh:
+        fh.write('{"image_ids": ["b"], "by')
+
+    assert journal.completed_ids() == {"a"}
+
+
+def test_record_after_partial_line(tmpdir):
+    """
+    :GIVEN: A journal whose last entry was cut off mid-write.
+    :WHEN:  Recording another batch on restart.
+    :THEN:  Verify the new entry is read back, not joined onto the partial line.
+    """
+    journal = sut.BatchJournal(str(tmpdir))
+    journal.record(sut.BatchRecord(image_ids=["a"], bytes=1, sha256="00"))
+    with open(journal.path, "a") as fh:
+        fh.write('{"image_ids": ["b"], "by')
+
+    journal.record(sut.BatchRecord(image_ids=["c"], bytes=5, sha256="11"))
+    journal.record(sut.BatchRecord(image_ids=["d"], bytes=7, sha256="22"))
+
+    assert journal.completed_ids() == {"a", "c", "d"}
+
+
+def test_remove(tmpdir):
+    """
+    :GIVEN: An existing journal.
+    :WHEN:  Removing the journal.
+    :THEN:  Verify the download path no longer reports an unfinished download.
+    """
+    journal = sut.BatchJournal(str(tmpdir))
+    journal.create()
+    journal.remove()
+
+    assert sut.BatchJournal.exists(str(tmpdir)) == False
+    assert os.listdir(str(tmpdir)) == []
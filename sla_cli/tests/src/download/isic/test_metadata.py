@@ -5,6 +5,7 @@ Date:       10 April 2021
 
 import os
 import json
+import re
 
 import pandas as pd
 import pytest
@@ -76,6 +77,58 @@ def test_merge_record(sample_isic_records, expected_column_names):
     assert list(actual.columns) == expected_column_names
 
 
+def test_merge_record_values(sample_isic_records):
+    """
+    :GIVEN: Pages of ISIC archive metadata records, one missing optional clinical fields.
+    :WHEN:  Flattening and merging the records.
+    :THEN:  Verify the values are read from the nested fields and missing fields are left empty.
+    """
+    first, second = sample_isic_records
+    second = {**second, "meta": {**second["meta"], "clinical": {"diagnosis": "melanoma"}}}
+
+    actual = sut.IsicMetadataDownloader(None)._merge_records([[first], [], [second]])
+
+    assert list(actual["isic_id"]) == [first["_id"], second["_id"]]
+    assert list(actual["dataset"]) == ["UDA-1", "UDA-1"]
+    assert list(actual["created"]) == ["2014-10-09", "2014-10-09"]
+    assert list(actual["dx"]) == ["nevus", "melanoma"]
+    assert actual["sex"].iloc[0] == "female" and pd.isna(actual["sex"].iloc[1])
+    assert actual["tags"].iloc[0] == first["notes"]["tags"]
+
+
+def test_merge_record_missing_field(sample_isic_records):
+    """
+    :GIVEN: An ISIC archive metadata record without a required field.
+    :WHEN:  Flattening the records.
+    :THEN:  Verify an error naming the field is raised.
+    """
+    record = {key: value for key, value in sample_isic_records[0].items() if key != "name"}
+
+    with pytest.raises(KeyError, match="name"):
+        sut.IsicMetadataDownloader(None)._merge_records([[record]])
+
+
+@pytest.mark.parametrize("tags, expected",
+                         [
+                             (["Challenge 2016: Training", "Challenge 2019: Training"], [True, False, False, True, False]),
+                             ("['Challenge 2017: Test', 'Challenge 2020: Training']", [False, True, False, False, True]),
+                             ([], [False] * 5),
+                             (None, [False] * 5),
+                         ])
+def test_add_year_tag_values(tags, expected):
+    """
+    :GIVEN: Records with competition tags, as downloaded lists or text read from CSV.
+    :WHEN:  Adding the year columns.
+    :THEN:  Verify each year is flagged when a tag mentions it.
+    """
+    records = pd.DataFrame({"tags": [tags, ["Challenge 2018: Task 3"]]})
+
+    records = sut.IsicMetadataDownloader._add_year_tags(records)
+
+    assert list(records.loc[0, [str(year) for year in range(2016, 2021)]]) == expected
+    assert list(records.loc[1, [str(year) for year in range(2016, 2021)]]) == [False, False, True, False, False]
+
+
 def test_add_year_tags():
     """
     :GIVEN: A dataframe containing a 'tags' column.
@@ -114,3 +167,148 @@ def test_save_records(already_downloaded, downloader_options_factory, tmpdir, mo
 
         assert os.path.exists(os.path.join(str(tmpdir), "isic_metadata.csv")) == True
         assert os.path.exists(os.path.join(str(mock_db_dir), "isic_metadata.csv")) == True
+
+
+@pytest.mark.parametrize("copies, limit",
+                         [
+                             (1, 2),
+                             (3, 2),
+                             (5, 4),
+                         ])
+def test_download_pages_in_order(copies, limit, sample_isic_records, downloader_options_factory, monkeypatch):
+    """
+    :GIVEN: ISIC archive metadata spread over several pages.
+    :WHEN:  Downloading the metadata with several pages in flight.
+    :THEN:  Verify every record is saved once, in order.
+    """
+    records = []
+    for index in range(copies):
+        for record in sample_isic_records:
+            records.append({**record, "_id": f"{record['_id']}_{index}"})
+
+    def process_request(session, url):
+        offset = int(re.search(r"offset=(\d+)", url).group(1))
+        return records[offset:offset + limit]
+
+    saved = []
+    monkeypatch.setattr(sut.IsicMetadataDownloader, "PAGE_LIMIT", limit)
+    monkeypatch.setattr(sut.IsicMetadataDownloader, "_process_request", staticmethod(process_request))
+    monkeypatch.setattr(sut.IsicMetadataDownloader, "_save_records", lambda self, records: saved.append(records))
+
+    sut.IsicMetadataDownloader(downloader_options_factory()).download()
+
+    assert list(saved[0]["isic_id"]) == [record["_id"] for record in records]
+
+
+@pytest.mark.parametrize("copies, limit",
+                         [
+                             (1, 2),
+                             (3, 2),
+                             (5, 4),
+                         ])
+def test_download_streaming(copies, limit, sample_isic_records, downloader_options_factory, monkeypatch, tmpdir):
+    """
+    :GIVEN: ISIC archive metadata spread over several pages and streaming mode enabled.
+    :WHEN:  Downloading the metadata.
+    :THEN:  Verify every page is written to the same CSV as a buffered download, without holding the records.
+    """
+    records = []
+    for index in range(copies):
+        for record in sample_isic_records:
+            records.append({**record, "_id": f"{record['_id']}_{index}"})
+
+    def process_request(session, url):
+        offset = int(re.search(r"offset=(\d+)", url).group(1))
+        return records[offset:offset + limit]
+
+    db_dir = tmpdir.mkdir("db")
+    monkeypatch.setattr(sut.Path, "db_dir", lambda: str(db_dir))
+    monkeypatch.setattr(sut.IsicMetadataDownloader, "PAGE_LIMIT", limit)
+    monkeypatch.setattr(sut.IsicMetadataDownloader, "_process_request", staticmethod(process_request))
+    monkeypatch.setattr(sut.IsicMetadataDownloader, "_save_records", lambda self, records: pytest.fail("Records were buffered."))
+    options = downloader_options_factory()
+    options.config.isic.stream_metadata = True
+
+    sut.IsicMetadataDownloader(options).download()
+
+    actual = pd.read_csv(os.path.join(str(tmpdir), "isic_metadata.csv"))
+    expected = sut.IsicMetadataDownloader._add_year_tags(sut.IsicMetadataDownloader(None)._merge_records([records]))
+
+    assert list(actual.columns) == list(expected.columns)
+    assert list(actual["isic_id"]) == list(expected["isic_id"])
+    assert list(actual["2016"]) == list(expected["2016"])
+    assert os.path.exists(sut.Path.isic_metadata())
+    assert sut.SyncState.load(sut.SyncState.path_for(sut.Path.isic_metadata())) is not None
+
+
+def test_refresh(sample_isic_records, downloader_options_factory, monkeypatch, tmpdir):
+    """
+    :GIVEN: Local metadata synced before a new image was added, an image relabelled and an image removed.
+    :WHEN:  Refreshing the metadata.
+    :THEN:  Verify only the new and updated images are fetched and the changes are saved.
+    """
+    old, relabelled = sample_isic_records
+    removed = {**old, "_id": "removed_id", "name": "ISIC_9999999"}
+    new = {**old, "_id": "new_id", "name": "ISIC_0000002", "created": "2021-05-01T10:00:00+00:00"}
+    relabelled = {**relabelled, "updated": "2021-05-02T10:00:00+00:00",
+                  "meta": {**relabelled["meta"], "clinical": {**relabelled["meta"]["clinical"], "diagnosis": "melanoma"}}}
+
+    db_dir = tmpdir.mkdir("db")
+    monkeypatch.setattr(sut.Path, "db_dir", lambda: str(db_dir))
+    downloader = sut.IsicMetadataDownloader(downloader_options_factory())
+    local = downloader._add_year_tags(downloader._merge_records([sample_isic_records + [removed]]))
+    local.to_csv(sut.Path.isic_metadata(), index=False)
+    sut.SyncState.create(sut.parse_timestamp("2021-01-01")).save(sut.SyncState.path_for(sut.Path.isic_metadata()))
+
+    requested = []
+
+    def process_request(session, url):
+        requested.append(url)
+        if "sort=created" in url:
+            return [new, old, relabelled] if "offset=0" in url else []
+        if "detail=false" in url:
+            listing = [new, old, relabelled]
+            return [{"_id": r["_id"], "name": r["name"], "updated": r["updated"]} for r in listing] if "offset=0" in url else []
+
+        return relabelled
+
+    monkeypatch.setattr(sut.IsicMetadataDownloader, "_process_request", staticmethod(process_request))
+
+    downloader.refresh()
+
+    records = pd.read_csv(sut.Path.isic_metadata())
+    changes = pd.read_csv(os.path.join(str(tmpdir), "isic_metadata_changes.csv"))
+
+    assert sorted(records["isic_id"]) == sorted([old["_id"], relabelled["_id"], new["_id"]])
+    assert records.set_index("isic_id").loc[relabelled["_id"], "dx"] == "melanoma"
+    assert dict(zip(changes["isic_id"], changes["change"])) == {"new_id": "added", "removed_id": "removed", relabelled["_id"]: "relabelled"}
+    assert any(url.endswith(f"/image/{relabelled['_id']}") for url in requested)
+    assert sut.SyncState.load(sut.SyncState.path_for(sut.Path.isic_metadata())).watermark.startswith("2021-05-02")
+
+
+def test_dataset_pages(sample_isic_records, downloader_options_factory, monkeypatch):
+    """
+    :GIVEN: An ISIC dataset name.
+    :WHEN:  Fetching the metadata of only that dataset.
+    :THEN:  Verify the dataset id is resolved and the image pages are filtered by it.
+    """
+    requested = []
+
+    def process_request(session, url):
+        requested.append(url)
+        if "/dataset?" in url:
+            return [{"_id": "other", "name": "MSK-1"}, {"_id": "uda_id", "name": "UDA-1"}]
+
+        return sample_isic_records
+
+    monkeypatch.setattr(sut.IsicMetadataDownloader, "_process_request", staticmethod(process_request))
+    downloader = sut.IsicMetadataDownloader(downloader_options_factory())
+
+    pages = list(downloader.dataset_pages(None, "uda-1"))
+
+    assert len(pages) == 1
+    assert list(pages[0]["isic_id"]) == [record["_id"] for record in sample_isic_records]
+    assert requested[1].endswith("&datasetId=uda_id")
+
+    with pytest.raises(ValueError):
+        list(downloader.dataset_pages(None, "Not a dataset"))
@@ -0,0 +1,86 @@
+"""
+Author:     David Walshe
+Date:       17 October 2026
+"""
+
+import threading
+import time
+
+import pytest
+
+from sla_cli.src.download.isic.pages import PageFetcher
+
+
+def make_fetch_page(total: int, requested: list, delay: float = 0.0):
+    """Returns a page fetcher over 'total' numbered records, recording the requested offsets."""
+    lock = threading.Lock()
+
+    def fetch_page(offset: int, limit: int):
+        with lock:
+            requested.append(offset)
+        # Later pages return first, to check the pages are still handed out in order.
+        time.sleep(delay / (1 + offset))
+        return list(range(offset, min(offset + limit, total)))
+
+    return fetch_page
+
+
+@pytest.mark.parametrize("total, limit, max_in_flight, expected_pages",
+                         [
+                             (0, 10, 4, 1),
+                             (25, 10, 4, 3),
+                             (30, 10, 2, 4),
+                             (95, 10, 1, 10),
+                             (95, 10, 8, 10),
+                         ])
+def test_pages_in_order(total, limit, max_in_flight, expected_pages):
+    """
+    :GIVEN: A paginated resource and a number of page requests allowed in flight.
+    :WHEN:  Fetching every page.
+    :THEN:  Verify the pages are returned in order up to the first short page.
+    """
+    requested = []
+    fetcher = PageFetcher(make_fetch_page(total, requested, delay=0.01), limit=limit, max_in_flight=max_in_flight)
+
+    pages = list(fetcher.pages())
+
+    assert len(pages) == expected_pages
+    assert [record for page in pages for record in page] == list(range(total))
+    assert len(requested) <= expected_pages + max_in_flight
+
+
+def test_pages_in_flight():
+    """
+    :GIVEN: A page fetcher allowing three requests in flight.
+    :WHEN:  Fetching the pages of a resource.
+    :THEN:  Verify three pages are requested before the first page is returned.
+    """
+    requested = []
+    started = threading.Barrier(3)
+
+    def fetch_page(offset: int, limit: int):
+        requested.append(offset)
+        if offset < 30:
+            started.wait(timeout=5)
+        return [offset] * (limit if offset < 20 else 1)
+
+    pages = list(PageFetcher(fetch_page, limit=10, max_in_flight=3).pages())
+
+    assert [page[0] for page in pages] == [0, 10, 20]
+    assert {0, 10, 20} <= set(requested)
+
+
+def test_pages_raises():
+    """
+    :GIVEN: A resource where a page request fails.
+    :WHEN:  Fetching the pages.
+    :THEN:  Verify the error is raised to the caller.
+    """
+
+    def fetch_page(offset: int, limit: int):
+        if offset == 20:
+            raise ConnectionError("Broken page.")
+        return [offset] * limit
+
+    with pytest.raises(ConnectionError):
+        list(PageFetcher(fetch_page, limit=10, max_in_flight=2).pages())
@@ -0,0 +1,71 @@
+"""
+Author:     David Walshe
+Date:       17 October 2026
+"""
+
+import os
+
+import pandas as pd
+import pytest
+
+import sla_cli.src.download.isic.query as sut
+from sla_cli.src.download.isic.metadata import METADATA_COLUMNS
+
+
+@pytest.fixture
+def metadata():
+    """Returns the mock metadata, with the categorical columns of the metadata store."""
+    df = pd.read_csv(os.path.join(os.path.dirname(__file__), "res", "sample.csv"))
+    df["dx"] = df["dx"].astype("category")
+
+    return df
+
+
+@pytest.mark.parametrize("where",
+                         [
+                             "dx in ['melanoma', 'basal cell carcinoma'] and age >= 40",
+                             "diagnosis in ['melanoma', 'basal cell carcinoma'] and age_approx >= 40",
+                             "dx == 'nevus' or sex == 'male'",
+                             "`2019` == True",
+                             None,
+                         ])
+def test_select(where, metadata):
+    """
+    :GIVEN: Dataset metadata and an expression over its columns or the ISIC API field names.
+    :WHEN:  Selecting the matching images.
+    :THEN:  Verify the same rows are selected as a direct filter of the metadata.
+    """
+    expected = {
+        "dx in ['melanoma', 'basal cell carcinoma'] and age >= 40": metadata["dx"].isin(["melanoma", "basal cell carcinoma"]) & (metadata["age"] >= 40),
+        "diagnosis in ['melanoma', 'basal cell carcinoma'] and age_approx >= 40": metadata["dx"].isin(["melanoma", "basal cell carcinoma"]) & (metadata["age"] >= 40),
+        "dx == 'nevus' or sex == 'male'": (metadata["dx"] == "nevus") | (metadata["sex"] == "male"),
+        "`2019` == True": metadata["2019"] == True,
+        None: pd.Series(True, index=metadata.index),
+    }[where]
+
+    assert list(sut.select(metadata, where).index) == list(metadata[expected].index)
+
+
+@pytest.mark.parametrize("where",
+                         [
+                             "dx in ['melanoma'",
+                             "unknown_column > 3",
+                             "import os",
+                         ])
+def test_validate_invalid(where):
+    """
+    :GIVEN: An expression that is invalid or references unknown columns.
+    :WHEN:  Validating it against the metadata columns.
+    :THEN:  Verify a QueryError is raised.
+    """
+    with pytest.raises(sut.QueryError):
+        sut.validate(where, METADATA_COLUMNS)
+
+
+def test_validate_valid():
+    """
+    :GIVEN: A valid expression.
+    :WHEN:  Validating it against the metadata columns.
+    :THEN:  Verify no error is raised.
+    """
+    sut.validate("dx in ['melanoma'] and age_approx >= 40 and `2020`", METADATA_COLUMNS)
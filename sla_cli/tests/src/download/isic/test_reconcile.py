@@ -0,0 +1,52 @@
+"""
+Author:     David Walshe
+Date:       17 October 2026
+"""
+
+import sla_cli.src.download.isic.reconcile as sut
+
+
+def test_missing():
+    """
+    :GIVEN: The expected images and those found on disk, including an unexpected extra image.
+    :WHEN:  Finding the missing images.
+    :THEN:  Verify only the expected images not on disk are returned and tracked.
+    """
+    reconciler = sut.MissingImageReconciler({"a": "1", "b": "2", "c": "3"}, max_attempts=2)
+
+    assert reconciler.missing(["a", "extra"]) == ["b", "c"]
+    assert set(reconciler.tracked) == {"b", "c"}
+    assert reconciler.tracked["b"].last_failure is not None
+
+
+def test_retry_budget():
+    """
+    :GIVEN: A missing image that never arrives.
+    :WHEN:  Retrying it repeatedly.
+    :THEN:  Verify it stops being retryable once its budget is used up.
+    """
+    reconciler = sut.MissingImageReconciler({"a": "1", "b": "2"}, max_attempts=2)
+
+    for _ in range(2):
+        missing = reconciler.missing([])
+        assert reconciler.record_attempt(reconciler.retryable(missing)) == ["1", "2"]
+
+    missing = reconciler.missing(["b"])
+    assert missing == ["a"]
+    assert reconciler.retryable(missing) == []
+
+
+def test_report():
+    """
+    :GIVEN: Images that remain missing after their retries.
+    :WHEN:  Creating the missing image report.
+    :THEN:  Verify each image is listed with its id and number of attempts.
+    """
+    reconciler = sut.MissingImageReconciler({"a": "1", "b": "2"}, max_attempts=1)
+    reconciler.record_attempt(reconciler.retryable(reconciler.missing([])))
+
+    report = reconciler.report(reconciler.missing([]))
+
+    assert list(report.columns) == ["image_name", "isic_id", "attempts", "last_failure"]
+    assert list(report["isic_id"]) == ["1", "2"]
+    assert list(report["attempts"]) == [1, 1]
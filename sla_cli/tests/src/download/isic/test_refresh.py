@@ -0,0 +1,93 @@
+"""
+Author:     David Walshe
+Date:       17 October 2026
+"""
+
+import pandas as pd
+import pytest
+
+import sla_cli.src.download.isic.refresh as sut
+
+
+@pytest.fixture
+def local_metadata():
+    """Returns a small local metadata table, as read from CSV."""
+    return pd.DataFrame({
+        "isic_id": ["a", "b", "c"],
+        "image_name": ["ISIC_0", "ISIC_1", "ISIC_2"],
+        "dataset": ["UDA-1", "UDA-1", "MSK-1"],
+        "dx": ["nevus", "melanoma", float("nan")],
+        "benign_malignant": ["benign", "malignant", float("nan")],
+        "dx_type": [float("nan"), "histopathology", float("nan")],
+        "melanocytic": [True, True, float("nan")],
+    })
+
+
+@pytest.mark.parametrize("value, expected",
+                         [
+                             ("2014-10-09T19:36:11.989000+00:00", "2014-10-09T19:36:11.989000+00:00"),
+                             ("2014-10-09T21:36:11+02:00", "2014-10-09T19:36:11+00:00"),
+                             ("2014-10-09", "2014-10-09T00:00:00+00:00"),
+                             ("not a date", None),
+                             (None, None),
+                         ])
+def test_parse_timestamp(value, expected):
+    """
+    :GIVEN: An ISIC timestamp or date.
+    :WHEN:  Parsing it.
+    :THEN:  Verify it is converted to UTC, or None if it cannot be parsed.
+    """
+    actual = sut.parse_timestamp(value)
+
+    assert (actual.isoformat() if actual is not None else None) == expected
+
+
+def test_sync_state_round_trip(tmpdir):
+    """
+    :GIVEN: A sync watermark.
+    :WHEN:  Saving and loading the sync state beside the metadata CSV.
+    :THEN:  Verify the watermark is restored.
+    """
+    path = sut.SyncState.path_for(str(tmpdir.join("isic_metadata.csv")))
+    assert sut.SyncState.load(path) is None
+
+    sut.SyncState.create(sut.parse_timestamp("2021-04-01T10:00:00+00:00")).save(path)
+
+    assert path.endswith("isic_metadata.sync.json")
+    assert sut.parse_timestamp(sut.SyncState.load(path).watermark) == sut.parse_timestamp("2021-04-01T10:00:00Z")
+
+
+def test_merge_and_diff(local_metadata):
+    """
+    :GIVEN: Local metadata, a new image, a relabelled image and a removed image.
+    :WHEN:  Merging the updates and comparing the versions.
+    :THEN:  Verify the merged metadata and the reported changes.
+    """
+    updates = pd.DataFrame({
+        "isic_id": ["d", "b"],
+        "image_name": ["ISIC_3", "ISIC_1"],
+        "dataset": ["MSK-1", "UDA-1"],
+        "dx": ["nevus", "nevus"],
+        "benign_malignant": ["benign", "benign"],
+        "dx_type": [None, "histopathology"],
+        "melanocytic": [True, True],
+    })
+
+    merged = sut.merge_metadata(local_metadata, updates, removed=["c"])
+    diff = sut.MetadataDiff.compute(local_metadata, merged)
+
+    assert sorted(merged["isic_id"]) == ["a", "b", "d"]
+    assert list(merged.columns) == list(local_metadata.columns)
+    assert (diff.added, diff.removed, diff.relabelled) == (["d"], ["c"], ["b"])
+    assert list(diff.report(local_metadata, merged)["change"]) == ["added", "removed", "relabelled"]
+
+
+def test_diff_unchanged(local_metadata):
+    """
+    :GIVEN: Local metadata re-read with the same labels.
+    :WHEN:  Comparing the versions.
+    :THEN:  Verify no changes are reported, with missing values treated as equal.
+    """
+    diff = sut.MetadataDiff.compute(local_metadata, local_metadata.copy())
+
+    assert diff.summary() == "0 images added, 0 removed and 0 relabelled."
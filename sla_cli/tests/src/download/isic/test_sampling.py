@@ -0,0 +1,51 @@
+"""
+Author:     David Walshe
+Date:       17 October 2026
+"""
+
+import pandas as pd
+import pytest
+
+import sla_cli.src.download.isic.sampling as sut
+
+
+@pytest.fixture
+def metadata():
+    """Returns metadata of 100 images over three diagnoses, and some unlabelled images."""
+    dx = ["nevus"] * 60 + ["melanoma"] * 25 + ["basal cell carcinoma"] * 10 + [None] * 5
+    return pd.DataFrame({"isic_id": [f"id_{i}" for i in range(len(dx))], "dx": pd.Categorical(dx)})
+
+
+@pytest.mark.parametrize("per_class, max_images, expected",
+                         [
+                             (None, None, {"nevus": 60, "melanoma": 25, "basal cell carcinoma": 10, None: 5}),
+                             (20, None, {"nevus": 20, "melanoma": 20, "basal cell carcinoma": 10, None: 5}),
+                             (None, 10, {"nevus": 6, "melanoma": 2, "basal cell carcinoma": 1, None: 1}),
+                             (8, 20, {"nevus": 5, "melanoma": 6, "basal cell carcinoma": 6, None: 3}),
+                             (None, 1000, {"nevus": 60, "melanoma": 25, "basal cell carcinoma": 10, None: 5}),
+                         ])
+def test_stratified_sample_counts(per_class, max_images, expected, metadata):
+    """
+    :GIVEN: Dataset metadata and per class and total caps.
+    :WHEN:  Sampling the dataset.
+    :THEN:  Verify each class is capped and the total is split in proportion to the classes.
+    """
+    sample = sut.stratified_sample(metadata, per_class=per_class, max_images=max_images)
+
+    counts = sample["dx"].astype(object).where(sample["dx"].notna(), None).value_counts(dropna=False)
+    assert {(None if pd.isna(label) else label): count for label, count in counts.items()} == expected
+
+
+def test_stratified_sample_deterministic(metadata):
+    """
+    :GIVEN: Dataset metadata.
+    :WHEN:  Sampling it twice with the same seed and once with another.
+    :THEN:  Verify the same seed selects the same images in their original order.
+    """
+    first = sut.stratified_sample(metadata, per_class=10, seed=7)
+    second = sut.stratified_sample(metadata, per_class=10, seed=7)
+    other = sut.stratified_sample(metadata, per_class=10, seed=8)
+
+    assert list(first["isic_id"]) == list(second["isic_id"])
+    assert list(first["isic_id"]) != list(other["isic_id"])
+    assert list(first.index) == sorted(first.index)
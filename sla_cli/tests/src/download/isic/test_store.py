@@ -0,0 +1,120 @@
+"""
+Author:     David Walshe
+Date:       17 October 2026
+"""
+
+import os
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+import pytest
+
+import sla_cli.src.download.isic.store as sut
+
+
+@pytest.fixture
+def metadata_file(tmpdir):
+    """Returns a path to a copy of the mock metadata file."""
+    path = str(tmpdir.join("isic_metadata.csv"))
+    shutil.copy(os.path.join(os.path.dirname(__file__), "res", "sample.csv"), path)
+
+    return path
+
+
+@pytest.mark.parametrize("dataset",
+                         [
+                             "SONIC",
+                             "ham10000",
+                             "BCN_20000",
+                             "Not a dataset",
+                         ])
+def test_read_dataset(dataset, metadata_file):
+    """
+    :GIVEN: The ISIC metadata CSV.
+    :WHEN:  Reading a single dataset from the store.
+    :THEN:  Verify the same rows are returned as filtering the CSV.
+    """
+    store = sut.IsicMetadataStore(metadata_file)
+    df = pd.read_csv(metadata_file)
+    expected = df[df["dataset"].str.upper() == dataset.upper()]
+
+    result = store.read(dataset)
+
+    assert os.path.exists(store.store_path)
+    assert list(result.index) == list(expected.index)
+    assert list(result["isic_id"]) == list(expected["isic_id"])
+
+
+def test_write_indexes_datasets(metadata_file, monkeypatch):
+    """
+    :GIVEN: The ISIC metadata and a small row group size.
+    :WHEN:  Writing the metadata store.
+    :THEN:  Verify each dataset has its own row groups and categorical columns.
+    """
+    import pyarrow.parquet as pq
+
+    monkeypatch.setattr(sut, "ROW_GROUP_SIZE", 2)
+    store = sut.IsicMetadataStore(metadata_file)
+    df = pd.read_csv(metadata_file)
+
+    store.write(df)
+    index = store.index()
+
+    assert sorted(index) == sorted(df["dataset"].str.upper().unique())
+    parquet_file = pq.ParquetFile(store.store_path)
+    for key, row_groups in index.items():
+        rows = sum(parquet_file.metadata.row_group(group).num_rows for group in row_groups)
+        assert rows == (df["dataset"].str.upper() == key).sum()
+    assert str(store.read()["dx"].dtype) == "category"
+
+
+def test_read_rebuilds_stale_store(metadata_file):
+    """
+    :GIVEN: A metadata store older than the metadata CSV.
+    :WHEN:  Reading a dataset.
+    :THEN:  Verify the store is rebuilt from the CSV.
+    """
+    store = sut.IsicMetadataStore(metadata_file)
+    store.write(pd.read_csv(metadata_file).iloc[:1])
+    os.utime(store.store_path, (0, 0))
+
+    assert store.is_stale
+    assert len(store.read()) == len(pd.read_csv(metadata_file))
+    assert not store.is_stale
+
+
+
+def test_write_concurrently(metadata_file, monkeypatch):
+    """
+    :GIVEN: A stale metadata store rebuilt by several downloads at once.
+    :WHEN:  Each writes the store.
+    :THEN:  Verify each write goes through a temporary file of its own and no temporary files are left.
+    """
+    replaced = []
+    replace = os.replace
+    monkeypatch.setattr(sut.os, "replace", lambda src, dst: replaced.append(src) or replace(src, dst))
+    df = pd.read_csv(metadata_file)
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        list(executor.map(lambda _: sut.IsicMetadataStore(metadata_file).write(df), range(8)))
+
+    store_path = sut.IsicMetadataStore(metadata_file).store_path
+    assert len(set(replaced)) == 8
+    assert len(sut.IsicMetadataStore(metadata_file).read()) == len(df)
+    assert [name for name in os.listdir(os.path.dirname(store_path)) if name.endswith(".partial")] == []
+
+
+def test_read_without_pyarrow(metadata_file, monkeypatch):
+    """
+    :GIVEN: An environment without the optional 'pyarrow' package.
+    :WHEN:  Reading a dataset.
+    :THEN:  Verify the CSV is read directly and no store is written.
+    """
+    monkeypatch.setattr(sut, "has_pyarrow", lambda: False)
+    store = sut.IsicMetadataStore(metadata_file)
+
+    result = store.read("sonic")
+
+    assert (result["dataset"] == "SONIC").all()
+    assert not os.path.exists(store.store_path)
@@ -0,0 +1,91 @@
+"""
+Author:     David Walshe
+Date:       17 October 2026
+"""
+
+import io
+import os
+from dataclasses import replace
+from zipfile import ZipFile
+
+import pytest
+import httpretty
+import pandas as pd
+from httpretty import register_uri
+from unittest.mock import patch
+
+from sla_cli.src.common.config import Http
+from sla_cli.src.download.http import HttpClient
+from sla_cli.src.download.mednode.download import MednodeDownloader
+from sla_cli.tests.src.download.test_segmented import range_callback
+
+URL = "http://www.cs.rug.nl/~imaging/databases/melanoma_naevi/complete_mednode_dataset.zip"
+
+
+def mednode_zip() -> bytes:
+    """Returns a MEDNODE archive as bytes."""
+    buffer = io.BytesIO()
+    with ZipFile(buffer, "w") as zf:
+        zf.writestr("complete_mednode_dataset/melanoma/1.jpg", b"1")
+        zf.writestr("complete_mednode_dataset/naevus/2.jpg", b"2")
+        zf.writestr("complete_mednode_dataset/Thumbs.db", b"")
+
+    return buffer.getvalue()
+
+
+def test_download(downloader_options_factory, tmpdir):
+    """
+    :GIVEN: A downloaded MEDNODE archive.
+    :WHEN:  Laying out the dataset.
+    :THEN:  Verify the images are placed and labelled by the folder they were archived in.
+    """
+    with open(os.path.join(str(tmpdir), "mednode.zip"), "wb") as fh:
+        fh.write(mednode_zip())
+
+    MednodeDownloader(downloader_options_factory(dataset="MEDNODE", skip=True)).download()
+
+    extracted_path = os.path.join(str(tmpdir), "mednode")
+    df = pd.read_csv(os.path.join(extracted_path, "metadata.csv"), dtype=str).sort_values("image_name")
+    assert sorted(os.listdir(extracted_path)) == ["images", "metadata.csv"]
+    assert sorted(os.listdir(os.path.join(extracted_path, "images"))) == ["1.jpg", "2.jpg"]
+    assert df.values.tolist() == [["1", "melanoma"], ["2", "nevus"]]
+
+
+@httpretty.activate
+@pytest.mark.parametrize("ranged", [True, False])
+def test_download_label(ranged, downloader_options_factory, tmpdir):
+    """
+    :GIVEN: A MEDNODE archive on a server that does or does not serve byte ranges.
+    :WHEN:  Pulling the images of one diagnosis.
+    :THEN:  Verify only those images are placed, falling back to the whole archive, and every image is listed in the metadata.
+    """
+    body = mednode_zip()
+    register_uri(httpretty.GET, URL, body=range_callback(body) if ranged else body)
+    options = replace(downloader_options_factory(url=URL, dataset="MEDNODE"), labels=["melanoma"])
+
+    with patch.object(HttpClient, "_settings", Http(retries=0)), patch.object(HttpClient, "_session", None):
+        MednodeDownloader(options).download()
+
+    extracted_path = os.path.join(str(tmpdir), "mednode")
+    df = pd.read_csv(os.path.join(extracted_path, "metadata.csv"), dtype=str)
+    assert os.listdir(os.path.join(extracted_path, "images")) == ["1.jpg"]
+    assert sorted(df["dx"]) == ["melanoma", "nevus"]
+    assert os.path.exists(os.path.join(str(tmpdir), "mednode.zip")) != ranged
+
+
+def test_download_repair(downloader_options_factory, tmpdir):
+    """
+    :GIVEN: A laid out MEDNODE dataset missing an image.
+    :WHEN:  Repairing it from the archive.
+    :THEN:  Verify the missing image is restored and the present one left untouched.
+    """
+    with open(os.path.join(str(tmpdir), "mednode.zip"), "wb") as fh:
+        fh.write(mednode_zip())
+    images_path = tmpdir.mkdir("mednode").mkdir("images")
+    images_path.join("1.jpg").write("present")
+
+    options = replace(downloader_options_factory(dataset="MEDNODE", skip=True), repair=True)
+    MednodeDownloader(options).download()
+
+    assert images_path.join("1.jpg").read() == "present"
+    assert images_path.join("2.jpg").read() == "2"
@@ -0,0 +1,83 @@
+"""
+Author:     David Walshe
+Date:       17 October 2026
+"""
+
+import os
+import re
+import hashlib
+
+import pytest
+import httpretty
+from httpretty import register_uri
+from unittest.mock import patch
+
+import sla_cli.src.download.checksum as sut
+import sla_cli.src.download.utils as utils
+from sla_cli.src.common.config import Http
+from sla_cli.src.download.http import HttpClient
+
+URL = "http://www.cs.rug.nl/~imaging/databases/melanoma_naevi/complete_mednode_dataset.zip"
+
+
+def range_callback(body: bytes):
+    """Returns a httpretty callback serving byte ranges of a body."""
+
+    def callback(request, uri, headers):
+        match = re.match(r"bytes=(\d+)-(\d+)", request.headers.get("Range", ""))
+        start, end = int(match.group(1)), int(match.group(2))
+        headers["Content-Range"] = f"bytes {start}-{end}/{len(body)}"
+        return 206, headers, body[start:end + 1]
+
+    return callback
+
+
+@pytest.mark.parametrize("checksum, expected",
+                         [
+                             ("sha256:ABC123", sut.Checksum("sha256", "abc123")),
+                             ("MD5: abc123", sut.Checksum("md5", "abc123")),
+                         ])
+def test_parse(checksum, expected):
+    """
+    :GIVEN: A checksum written as '<algorithm>:<hex digest>'.
+    :WHEN:  Parsing the checksum.
+    :THEN:  Verify the algorithm and digest are read, ignoring case.
+    """
+    assert sut.Checksum.parse(checksum) == expected
+
+
+@pytest.mark.parametrize("checksum", ["abc123", "sha256:", "crc99:abc123"])
+def test_parse_invalid(checksum):
+    """
+    :GIVEN: A checksum without a known algorithm or digest.
+    :WHEN:  Parsing the checksum.
+    :THEN:  Verify a ValueError is raised.
+    """
+    with pytest.raises(ValueError):
+        sut.Checksum.parse(checksum)
+
+
+@httpretty.activate
+@pytest.mark.parametrize("ranged", [True, False])
+@pytest.mark.parametrize("corrupt", [False, True])
+def test_download_file_checksum(ranged, corrupt, tmpdir):
+    """
+    :GIVEN: An archive served with or without Range support, and its checksum.
+    :WHEN:  Downloading the archive, with the bytes corrupted in transit or not.
+    :THEN:  Verify a matching archive is kept and a corrupt one removed and raised before it reaches its destination.
+    """
+    body = os.urandom(100000)
+    checksum = f"sha256:{hashlib.sha256(body).hexdigest()}"
+    served = body[:-1] + b"\x00" if corrupt else body
+    register_uri(httpretty.GET, URL, body=range_callback(served) if ranged else served)
+
+    destination = os.path.join(str(tmpdir), "archive.zip")
+    with patch.object(HttpClient, "_settings", Http(retries=0, segments=3, min_segment_size=0.01)), \
+            patch.object(HttpClient, "_session", None):
+        if corrupt:
+            with pytest.raises(sut.ChecksumError):
+                utils.download_file(URL, destination, 0.1, checksum=checksum)
+        else:
+            utils.download_file(URL, destination, 0.1, checksum=checksum)
+
+    assert os.listdir(str(tmpdir)) == ([] if corrupt else ["archive.zip"])
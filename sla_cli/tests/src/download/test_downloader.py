@@ -0,0 +1,27 @@
+"""
+Author:     David Walshe
+Date:       17 October 2026
+"""
+
+import pytest
+
+import sla_cli.src.download.downloader as sut
+
+
+class UnlaidDownloader(sut.FileDownloader):
+    """File downloader without a layout."""
+
+    def _download(self):
+        pass
+
+
+def test_extract_without_layout(downloader_options_factory):
+    """
+    :GIVEN: A file downloader without a layout that does not implement '_extract'.
+    :WHEN:  Extracting its archive.
+    :THEN:  Verify a NotImplementedError naming the downloader is raised.
+    """
+    downloader = UnlaidDownloader(downloader_options_factory())
+
+    with pytest.raises(NotImplementedError, match="UnlaidDownloader"):
+        downloader._extract()
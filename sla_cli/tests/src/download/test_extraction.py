@@ -0,0 +1,145 @@
+"""
+Author:     David Walshe
+Date:       17 October 2026
+"""
+
+import os
+import time
+from zipfile import ZipFile, ZipInfo
+
+import pytest
+
+import sla_cli.src.download.extraction as sut
+
+
+def extract(archive: str, destination: str) -> str:
+    """Extracts an archive, as an extraction worker would."""
+    sut.extract_archives([(archive, destination)], max_workers=1)
+    os.remove(archive)
+
+    return archive
+
+
+def fail(*args):
+    """Extraction that always fails."""
+    raise ValueError("Bad archive")
+
+
+@pytest.mark.parametrize("max_workers, max_queued", [(1, 0), (2, 1), (4, 8)])
+def test_submit(max_workers, max_queued, tmpdir):
+    """
+    :GIVEN: A number of saved archives.
+    :WHEN:  Handing the archives to the extraction pool.
+    :THEN:  Verify every archive is extracted and reported as done.
+    """
+    archives = []
+    for i in range(6):
+        archive = os.path.join(str(tmpdir), f"download_{i}.zip")
+        with ZipFile(archive, "w") as zf:
+            zf.writestr(f"images/{i}.jpg", b"image")
+        archives.append(archive)
+
+    done = []
+    with sut.ExtractionPool(max_workers=max_workers, max_queued=max_queued) as pool:
+        for archive in archives:
+            pool.submit(extract, archive, str(tmpdir), on_done=done.append)
+
+    # Done callbacks may run just after the pool is shut down.
+    for _ in range(100):
+        if len(done) == len(archives):
+            break
+        time.sleep(0.01)
+
+    assert sorted(done) == sorted(archives)
+    assert sorted(os.listdir(os.path.join(str(tmpdir), "images"))) == [f"{i}.jpg" for i in range(6)]
+
+
+def test_submit_failure(caplog):
+    """
+    :GIVEN: An extraction that raises an error.
+    :WHEN:  Handing it to the extraction pool.
+    :THEN:  Verify the failure is logged and the done callback is not called.
+    """
+    done = []
+    with sut.ExtractionPool(max_workers=1, max_queued=0) as pool:
+        pool.submit(fail, on_done=done.append)
+        # A second submit only returns once the failed extraction released its slot.
+        pool.submit(fail, on_done=done.append)
+
+    for _ in range(100):
+        if len([m for m in caplog.messages if m.startswith("Extraction failed")]) == 2:
+            break
+        time.sleep(0.01)
+
+    assert done == []
+    assert "Extraction failed: Bad archive" in caplog.messages
+
+
+def make_archive(path: str, members: dict) -> str:
+    """Creates a ZIP archive from a mapping of member name to content."""
+    with ZipFile(path, "w") as zf:
+        for name, content in members.items():
+            zf.writestr(name, content)
+
+    return path
+
+
+@pytest.mark.parametrize("parts, expected",
+                         [
+                             (1, [["c", "b", "a"]]),
+                             (2, [["c"], ["b", "a"]]),
+                             (5, [["c"], ["b"], ["a"]]),
+                         ])
+def test_split_members(parts, expected):
+    """
+    :GIVEN: Archive members of different sizes.
+    :WHEN:  Splitting them into parts.
+    :THEN:  Verify the parts are balanced by size and empty parts are dropped.
+    """
+    infos = []
+    for name, size in [("a", 10), ("b", 20), ("c", 30)]:
+        info = ZipInfo(name)
+        info.file_size = size
+        infos.append(info)
+
+    assert sut.split_members(infos, parts) == expected
+
+
+@pytest.mark.parametrize("max_workers", [1, 3])
+def test_extract_archives(max_workers, tmpdir, monkeypatch):
+    """
+    :GIVEN: Several archives sharing member folders.
+    :WHEN:  Extracting them together, in the calling process or across a process pool.
+    :THEN:  Verify every kept member of every archive is extracted with its content.
+    """
+    monkeypatch.setattr(sut, "MIN_PARALLEL_SIZE", 0)
+    members = {f"imgs_part_{part}/PAT_{part}_{i}.png": os.urandom(100) for part in range(3) for i in range(10)}
+    archives = []
+    for part in range(3):
+        archive = os.path.join(str(tmpdir), f"part_{part}.zip")
+        make_archive(archive, {name: content for name, content in members.items() if name.startswith(f"imgs_part_{part}")})
+        archives.append((archive, os.path.join(str(tmpdir), "images")))
+    make_archive(archives[0][0], {**{name: content for name, content in members.items() if name.startswith("imgs_part_0")}, "imgs_part_0/LICENSE.txt": b"license"})
+
+    extracted = sut.extract_archives(archives, max_workers=max_workers, keep=lambda name: name.endswith(".png"))
+
+    assert extracted == len(members)
+    for name, content in members.items():
+        with open(os.path.join(str(tmpdir), "images", *name.split("/")), "rb") as fh:
+            assert fh.read() == content
+    assert not os.path.exists(os.path.join(str(tmpdir), "images", "imgs_part_0", "LICENSE.txt"))
+
+
+@pytest.mark.parametrize("name, expected",
+                         [
+                             ("a/b.png", os.path.join("dst", "a", "b.png")),
+                             ("../a/./b.png", os.path.join("dst", "a", "b.png")),
+                             ("/a/b.png", os.path.join("dst", "a", "b.png")),
+                         ])
+def test_member_path(name, expected):
+    """
+    :GIVEN: An archive member name.
+    :WHEN:  Resolving the path it is extracted to.
+    :THEN:  Verify it is sanitised as ZipFile.extract does.
+    """
+    assert sut._member_path("dst", name) == expected
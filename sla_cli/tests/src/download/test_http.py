@@ -0,0 +1,219 @@
+"""
+Author:     David Walshe
+Date:       17 October 2026
+"""
+
+from unittest.mock import MagicMock
+
+import pytest
+import httpretty
+from httpretty import register_uri
+from requests.exceptions import ChunkedEncodingError, HTTPError, TooManyRedirects
+
+import sla_cli.src.download.http as sut
+from sla_cli.src.common.config import Http, Scheduler
+
+
+@pytest.fixture
+def no_sleep(monkeypatch):
+    """Skips the backoff delays between retries."""
+    monkeypatch.setattr(sut.time, "sleep", lambda seconds: None)
+
+
+@pytest.mark.parametrize("attempt, backoff, max_backoff, upper",
+                         [
+                             (0, 0.5, 30, 0.5),
+                             (3, 0.5, 30, 4.0),
+                             (10, 0.5, 30, 30),
+                         ])
+def test_backoff_delay(attempt, backoff, max_backoff, upper):
+    """
+    :GIVEN: A retry attempt and backoff settings.
+    :WHEN:  Computing the delay before the next attempt.
+    :THEN:  Verify the delay is jittered between zero and the capped exponential bound.
+    """
+    delays = [sut.backoff_delay(attempt, backoff, max_backoff) for _ in range(100)]
+
+    assert all(0 <= delay <= upper for delay in delays)
+    assert len(set(delays)) > 1
+
+
+@httpretty.activate
+def test_request_retries_transient_status(no_sleep):
+    """
+    :GIVEN: A server that responds with 503 twice before succeeding.
+    :WHEN:  Making a request with the retrying session.
+    :THEN:  Verify the request is retried and the successful response returned.
+    """
+    url = "https://isic-archive.com/api/v1/image"
+    register_uri(httpretty.GET, url, responses=[
+        httpretty.Response(body="busy", status=503),
+        httpretty.Response(body="busy", status=503),
+        httpretty.Response(body="ok", status=200),
+    ])
+
+    session = sut.RetryingSession(Http(retries=3), pool_size=4)
+
+    assert session.get(url).text == "ok"
+    assert len(httpretty.latest_requests()) == 3
+
+
+@httpretty.activate
+@pytest.mark.parametrize("status, retries, expected_requests",
+                         [
+                             (404, 3, 1),
+                             (500, 2, 3),
+                         ])
+def test_request_raises_status(status, retries, expected_requests, no_sleep):
+    """
+    :GIVEN: A server that always responds with an error status.
+    :WHEN:  Making a request with the retrying session.
+    :THEN:  Verify an HTTPError is raised, after retrying only transient statuses.
+    """
+    url = "https://isic-archive.com/api/v1/image"
+    register_uri(httpretty.GET, url, body="error", status=status)
+
+    session = sut.RetryingSession(Http(retries=retries, breaker_threshold=100), pool_size=4)
+
+    with pytest.raises(HTTPError):
+        session.get(url)
+
+    assert len(httpretty.latest_requests()) == expected_requests
+
+
+def test_request_sets_default_timeout(monkeypatch):
+    """
+    :GIVEN: A retrying session.
+    :WHEN:  Making a request without a timeout.
+    :THEN:  Verify the configured (connect, read) timeout is applied.
+    """
+    session = sut.RetryingSession(Http(connect_timeout=3, read_timeout=7), pool_size=4)
+    mock = MagicMock(return_value=MagicMock(status_code=200))
+    monkeypatch.setattr(sut.Session, "request", mock)
+
+    session.get("https://isic-archive.com/api/v1/image")
+
+    assert mock.call_args[1]["timeout"] == (3.0, 7.0)
+
+
+def test_circuit_breaker(monkeypatch):
+    """
+    :GIVEN: A circuit breaker with a threshold of two failures.
+    :WHEN:  Recording failures, waiting for the reset timeout and recording a success.
+    :THEN:  Verify the breaker opens, lets a single trial through and closes again.
+    """
+    now = [0.0]
+    monkeypatch.setattr(sut.time, "monotonic", lambda: now[0])
+    breaker = sut.CircuitBreaker(threshold=2, reset_timeout=10)
+
+    breaker.record_failure()
+    breaker.before_request("host")
+    breaker.record_failure()
+    assert breaker.is_open
+
+    with pytest.raises(sut.CircuitOpenError):
+        breaker.before_request("host")
+
+    now[0] = 11.0
+    breaker.before_request("host")
+    with pytest.raises(sut.CircuitOpenError):
+        breaker.before_request("host")
+
+    breaker.record_success()
+    assert not breaker.is_open
+    breaker.before_request("host")
+
+
+@pytest.mark.parametrize("error", [ChunkedEncodingError, TooManyRedirects, KeyboardInterrupt])
+def test_circuit_breaker_trial_error(error, monkeypatch):
+    """
+    :GIVEN: An open circuit breaker past its reset timeout.
+    :WHEN:  The trial request fails with an error other than a connection error or timeout.
+    :THEN:  Verify the breaker opens again and lets another trial through after the next reset timeout.
+    """
+    now = [0.0]
+    monkeypatch.setattr(sut.time, "monotonic", lambda: now[0])
+    session = sut.RetryingSession(Http(retries=0, breaker_threshold=1, breaker_reset=10), pool_size=4)
+    breaker = session.breaker("https://isic-archive.com/api/v1/image")
+    breaker.record_failure()
+    monkeypatch.setattr(sut.Session, "request", MagicMock(side_effect=error))
+
+    now[0] = 11.0
+    with pytest.raises(error):
+        session.get("https://isic-archive.com/api/v1/image")
+    with pytest.raises(sut.CircuitOpenError):
+        session.get("https://isic-archive.com/api/v1/image")
+
+    now[0] = 22.0
+    breaker.before_request("host")
+
+
+def test_http_client_shares_session():
+    """
+    :GIVEN: The process wide HTTP client configured for a download concurrency.
+    :WHEN:  Requesting the session several times.
+    :THEN:  Verify the same session is returned with a pool large enough for the concurrency.
+    """
+    config = MagicMock()
+    config.http = Http()
+    config.isic.adaptive = False
+    config.isic.max_workers = 24
+    config.isic.max_in_flight = 5
+    config.isic.metadata_workers = 4
+    config.scheduler = Scheduler()
+
+    sut.HttpClient.configure(config)
+    try:
+        session = sut.HttpClient.session()
+
+        assert sut.HttpClient.session() is session
+        assert session.pool_size >= 24
+    finally:
+        sut.HttpClient.close()
+
+
+def test_http_client_limits_connections():
+    """
+    :GIVEN: A scheduler configuration with a global connection and bandwidth limit.
+    :WHEN:  Configuring the process wide HTTP client.
+    :THEN:  Verify the pool is capped at the limit, blocks when full and shares the bandwidth limit.
+    """
+    config = MagicMock()
+    config.http = Http()
+    config.isic.adaptive = False
+    config.isic.max_workers = 24
+    config.isic.max_in_flight = 5
+    config.isic.metadata_workers = 4
+    config.scheduler = Scheduler(max_connections=8, max_bandwidth=2)
+
+    sut.HttpClient.configure(config)
+    try:
+        session = sut.HttpClient.session()
+
+        assert session.pool_size == 8
+        assert session.get_adapter("https://isic-archive.com")._pool_block
+        assert sut.HttpClient.throttle().rate == 2 * 1024 ** 2
+    finally:
+        sut.HttpClient.configure(MagicMock(http=Http(), isic=config.isic, scheduler=Scheduler()))
+        sut.HttpClient.close()
+
+
+@pytest.mark.parametrize("max_bandwidth, sizes, expected_delay",
+                         [
+                             (0, [10 * 1024 ** 2], 0.0),
+                             (1, [512 * 1024], 0.0),
+                             (1, [1024 ** 2, 1024 ** 2], 1.0),
+                             (2, [2 * 1024 ** 2, 1024 ** 2], 0.5),
+                         ])
+def test_throttle_reserve(max_bandwidth, sizes, expected_delay, monkeypatch):
+    """
+    :GIVEN: A throttle with a bandwidth limit in MB/s and no time passing.
+    :WHEN:  Reserving several reads of bytes.
+    :THEN:  Verify the wait for the last read keeps the transfer within the limit.
+    """
+    monkeypatch.setattr(sut.time, "monotonic", lambda: 0.0)
+    throttle = sut.Throttle(max_bandwidth)
+
+    delays = [throttle.reserve(size) for size in sizes]
+
+    assert delays[-1] == pytest.approx(expected_delay)
@@ -0,0 +1,96 @@
+"""
+Author:     David Walshe
+Date:       17 October 2026
+"""
+
+import io
+import os
+from zipfile import ZipFile
+
+import pytest
+
+from sla_cli.src.download.layout import Layout, Rule, ARCHIVE, METADATA
+
+LAYOUT = Layout([
+    Rule("images/*.zip", ARCHIVE),
+    Rule("*/metadata.csv", METADATA),
+    Rule("*/melanoma/*.png", label="melanoma"),
+    Rule("*.png"),
+])
+
+
+def inner_zip(members: dict) -> bytes:
+    """Returns a ZIP archive of the given members as bytes."""
+    buffer = io.BytesIO()
+    with ZipFile(buffer, "w") as zf:
+        for name, data in members.items():
+            zf.writestr(name, data)
+
+    return buffer.getvalue()
+
+
+@pytest.mark.parametrize(
+    "name, pattern",
+    [
+        ("images/part_1.zip", "images/*.zip"),
+        ("dataset/metadata.csv", "*/metadata.csv"),
+        ("dataset/melanoma/a.png", "*/melanoma/*.png"),
+        ("dataset/nevus/b.png", "*.png"),
+        ("dataset/readme.txt", None),
+        ("dataset/melanoma/", None),
+    ]
+)
+def test_match(name, pattern):
+    """
+    :GIVEN: A layout and an archive member.
+    :WHEN:  Matching the member against the layout.
+    :THEN:  Verify the first matching rule is returned, or None for skipped members and folders.
+    """
+    rule = LAYOUT.match(name)
+
+    assert (rule.pattern if rule else None) == pattern
+
+
+def test_materialize(tmpdir):
+    """
+    :GIVEN: A ZIP archive holding images, metadata, a nested image archive and unneeded files.
+    :WHEN:  Materializing the archive with a layout.
+    :THEN:  Verify the images and metadata land in place in one pass and nothing else is written.
+    """
+    archive = os.path.join(str(tmpdir), "dataset.zip")
+    root = os.path.join(str(tmpdir), "dataset")
+    metadata_path = os.path.join(root, "dataset.csv")
+    with ZipFile(archive, "w") as zf:
+        zf.writestr("dataset/", b"")
+        zf.writestr("dataset/metadata.csv", b"image_name,dx\n")
+        zf.writestr("dataset/melanoma/a.png", b"a")
+        zf.writestr("dataset/readme.txt", b"readme")
+        zf.writestr("images/part_1.zip", inner_zip({"part_1/b.png": b"b", "part_1/notes.txt": b"notes"}))
+
+    placed = LAYOUT.materialize(archive, root, metadata_path, max_workers=1)
+
+    assert sorted(os.listdir(root)) == ["dataset.csv", "images"]
+    assert sorted(os.listdir(os.path.join(root, "images"))) == ["a.png", "b.png"]
+    assert placed.metadata == metadata_path
+    assert {os.path.basename(path): rule.label for path, rule in placed.images.items()} == {"a.png": "melanoma", "b.png": None}
+
+
+def test_place(tmpdir):
+    """
+    :GIVEN: A folder holding an unpacked archive.
+    :WHEN:  Placing its files with a layout.
+    :THEN:  Verify the images and metadata are moved in place and the unpacked folder is removed.
+    """
+    source = tmpdir.mkdir("unpacked")
+    source.mkdir("dataset").join("metadata.csv").write("image_name,dx\n")
+    source.join("dataset").mkdir("nevus").join("b.png").write("b")
+    source.join("dataset").join("readme.txt").write("readme")
+    root = os.path.join(str(tmpdir), "dataset")
+    metadata_path = os.path.join(root, "metadata.csv")
+
+    placed = LAYOUT.place(str(source), root, metadata_path)
+
+    assert not os.path.exists(str(source))
+    assert sorted(os.listdir(root)) == ["images", "metadata.csv"]
+    assert list(placed.images) == [os.path.join(root, "images", "b.png")]
+    assert placed.metadata == metadata_path
@@ -0,0 +1,144 @@
+"""
+Author:     David Walshe
+Date:       17 October 2026
+"""
+
+import io
+import os
+from zipfile import ZipFile, ZIP_STORED, ZIP_DEFLATED
+
+import pytest
+import httpretty
+from httpretty import register_uri
+from unittest.mock import patch
+
+import sla_cli.src.download.remote_zip as sut
+from sla_cli.src.common.config import Http
+from sla_cli.src.download.http import RetryingSession, HttpClient
+from sla_cli.src.download.layout import Layout, Rule, ARCHIVE, METADATA, IMAGE
+from sla_cli.tests.src.download.test_segmented import range_callback
+
+URL = "https://www.dropbox.com/s/dataset.zip"
+
+LAYOUT = Layout([
+    Rule("images/*.zip", ARCHIVE),
+    Rule("*/metadata.csv", METADATA),
+    Rule("*/melanoma/*", label="melanoma"),
+    Rule("*/naevus/*", label="nevus"),
+    Rule("*.png"),
+])
+
+
+def make_zip(members: dict, compression: int = ZIP_DEFLATED) -> bytes:
+    """Returns a ZIP archive of the given members as bytes."""
+    buffer = io.BytesIO()
+    with ZipFile(buffer, "w", compression=compression) as zf:
+        for name, data in members.items():
+            zf.writestr(name, data, compress_type=compression if not name.endswith(".zip") else ZIP_STORED)
+
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def archive():
+    """Returns a dataset archive with labelled images, metadata, unneeded files and a nested image archive."""
+    return make_zip({
+        "dataset/metadata.csv": b"image_name,dx\n",
+        "dataset/melanoma/1.jpg": os.urandom(5000),
+        "dataset/melanoma/2.jpg": os.urandom(5000),
+        "dataset/readme.txt": os.urandom(300000),
+        "dataset/naevus/3.jpg": os.urandom(5000),
+        "images/part_1.zip": make_zip({"part_1/4.png": os.urandom(5000), "part_1/notes.txt": b"notes"}),
+    })
+
+
+@pytest.fixture
+def session():
+    return RetryingSession(Http(retries=0), pool_size=4)
+
+
+@pytest.mark.parametrize("names, max_gap, expected",
+                         [
+                             (["dataset/melanoma/1.jpg", "dataset/melanoma/2.jpg"], sut.MAX_GAP, [2]),
+                             (["dataset/melanoma/1.jpg", "dataset/naevus/3.jpg"], sut.MAX_GAP, [1, 1]),
+                             (["dataset/melanoma/1.jpg", "dataset/naevus/3.jpg"], 10 ** 6, [2]),
+                             (["dataset/metadata.csv", "dataset/melanoma/2.jpg"], 0, [1, 1]),
+                         ])
+@httpretty.activate
+def test_spans(names, max_gap, expected, archive, session):
+    """
+    :GIVEN: A remote archive and the members to fetch.
+    :WHEN:  Grouping the members into spans.
+    :THEN:  Verify neighbouring members share a span unless too many unneeded bytes lie between them.
+    """
+    register_uri(httpretty.GET, URL, body=range_callback(archive))
+    remote = sut.RemoteZip.open(session, URL)
+
+    with patch.object(sut, "MAX_GAP", max_gap):
+        spans = remote.spans([remote.zip.getinfo(name) for name in names])
+
+    assert [len(infos) for _, _, infos in spans] == expected
+
+
+@httpretty.activate
+def test_open_not_ranged(archive, session):
+    """
+    :GIVEN: A server that does not serve byte ranges.
+    :WHEN:  Opening a remote archive on it.
+    :THEN:  Verify a RemoteZipError is raised.
+    """
+    register_uri(httpretty.GET, URL, body=archive)
+
+    with pytest.raises(sut.RemoteZipError):
+        sut.RemoteZip.open(session, URL)
+
+
+@pytest.mark.parametrize("keep, images, metadata, matched, max_requests",
+                         [
+                             (None, ["1.jpg", "2.jpg", "3.jpg", "4.png"], True, ["1.jpg", "2.jpg", "3.jpg", "4.png"], 7),
+                             (lambda rule, target: rule.kind == METADATA, [], True, ["1.jpg", "2.jpg", "3.jpg"], 3),
+                             (lambda rule, target: rule.kind != IMAGE or rule.label == "melanoma", ["1.jpg", "2.jpg"], True, ["1.jpg", "2.jpg", "3.jpg", "4.png"], 6),
+                             (lambda rule, target: rule.kind != METADATA and not target.endswith("1.jpg"), ["2.jpg", "3.jpg", "4.png"], False, ["1.jpg", "2.jpg", "3.jpg", "4.png"], 7),
+                         ])
+@httpretty.activate
+def test_fetch(keep, images, metadata, matched, max_requests, archive, tmpdir):
+    """
+    :GIVEN: A remote dataset archive and a selection of its members.
+    :WHEN:  Fetching the selection over Range requests.
+    :THEN:  Verify only the selected members are written, in a few requests and never the whole archive.
+    """
+    register_uri(httpretty.GET, URL, body=range_callback(archive))
+    root = os.path.join(str(tmpdir), "dataset")
+    metadata_path = os.path.join(root, "metadata.csv")
+
+    with patch.object(HttpClient, "_settings", Http(retries=0)), patch.object(HttpClient, "_session", None):
+        placed = LAYOUT.fetch(URL, root, metadata_path, keep=keep)
+
+    images_path = os.path.join(root, "images")
+    assert sorted(os.listdir(images_path) if os.path.exists(images_path) else []) == images
+    assert os.path.exists(metadata_path) == metadata
+    assert sorted(os.path.basename(path) for path in placed.matched) == matched
+    assert not os.path.exists(os.path.join(root, ".nested"))
+    requests = httpretty.latest_requests()
+    assert len(requests) <= max_requests
+    assert all("Range" in request.headers for request in requests)
+
+
+@httpretty.activate
+def test_fetch_nested_compressed(tmpdir):
+    """
+    :GIVEN: A remote archive holding a compressed nested archive.
+    :WHEN:  Fetching its images.
+    :THEN:  Verify the nested archive is fetched whole and its images extracted.
+    """
+    buffer = io.BytesIO()
+    with ZipFile(buffer, "w", compression=ZIP_DEFLATED) as zf:
+        zf.writestr("images/part_1.zip", make_zip({"part_1/4.png": b"4"}))
+    register_uri(httpretty.GET, URL, body=range_callback(buffer.getvalue()))
+    root = os.path.join(str(tmpdir), "dataset")
+
+    with patch.object(HttpClient, "_settings", Http(retries=0)), patch.object(HttpClient, "_session", None):
+        LAYOUT.fetch(URL, root, os.path.join(root, "metadata.csv"))
+
+    assert os.listdir(os.path.join(root, "images")) == ["4.png"]
+    assert os.listdir(root) == ["images"]
@@ -0,0 +1,136 @@
+"""
+Author:     David Walshe
+Date:       17 October 2026
+"""
+
+import io
+import os
+import re
+
+import pytest
+import httpretty
+from httpretty import register_uri
+from unittest.mock import patch, MagicMock
+
+import sla_cli.src.download.resume as sut
+import sla_cli.src.download.utils as utils
+from sla_cli.src.common.config import Http
+from sla_cli.src.download.http import HttpClient
+
+URL = "https://md-datasets-cache-zipfiles-prod.s3.eu-west-1.amazonaws.com/zr7vgbcyr2-1.zip"
+
+
+def range_callback(body: bytes, etag: str = '"v1"', fail_after: int = None):
+    """Returns a httpretty callback serving byte ranges of a body, optionally cutting ranges short after a byte."""
+
+    def callback(request, uri, headers):
+        match = re.match(r"bytes=(\d+)-(\d+)", request.headers.get("Range", ""))
+        start, end = int(match.group(1)), int(match.group(2))
+        headers["Content-Range"] = f"bytes {start}-{end}/{len(body)}"
+        headers["ETag"] = etag
+        if fail_after is not None and end > fail_after:
+            end = max(start, fail_after)
+        return 206, headers, body[start:end + 1]
+
+    return callback
+
+
+@pytest.fixture
+def client():
+    """Configures the shared HTTP client to download small archives over two ranges."""
+    with patch.object(HttpClient, "_settings", Http(retries=0, segments=2, min_segment_size=0.0001)), \
+            patch.object(HttpClient, "_session", None):
+        yield
+
+
+def test_save_load(tmpdir):
+    """
+    :GIVEN: A partial download.
+    :WHEN:  Saving and loading its sidecar.
+    :THEN:  Verify the sidecar is only loaded while its partial file exists.
+    """
+    destination = os.path.join(str(tmpdir), "archive.zip")
+    partial = sut.PartialDownload(url=URL, length=10, etag='"v1"', ranges=[(0, 4), (5, 9)])
+    partial.received = [5, 2]
+    partial.save(destination)
+
+    assert sut.PartialDownload.load(destination) is None
+
+    open(sut.PartialDownload.part_path(destination), "wb").close()
+
+    assert sut.PartialDownload.load(destination) == partial
+
+
+@httpretty.activate
+def test_download_file_resumes(client, tmpdir):
+    """
+    :GIVEN: A server cutting its responses short part way through an archive.
+    :WHEN:  Downloading the archive, then downloading it again once the server recovers.
+    :THEN:  Verify the first run leaves a partial download and the second continues it from the bytes received.
+    """
+    body = os.urandom(1000)
+    destination = os.path.join(str(tmpdir), "archive.zip")
+    register_uri(httpretty.GET, URL, body=range_callback(body, fail_after=699))
+
+    with pytest.raises(IOError):
+        utils.download_file(URL, destination, 0.001)
+
+    assert not os.path.exists(destination)
+    assert sut.PartialDownload.load(destination).received == [500, 200]
+
+    httpretty.reset()
+    register_uri(httpretty.GET, URL, body=range_callback(body))
+    utils.download_file(URL, destination, 0.001)
+
+    with open(destination, "rb") as fh:
+        assert fh.read() == body
+    assert [request.headers["Range"] for request in httpretty.latest_requests()] == ["bytes=0-0", "bytes=700-999"]
+    assert os.listdir(str(tmpdir)) == ["archive.zip"]
+
+
+@httpretty.activate
+def test_download_file_restarts_changed_archive(client, tmpdir):
+    """
+    :GIVEN: A partial download of an archive that has since changed on the server.
+    :WHEN:  Downloading the archive.
+    :THEN:  Verify the partial download is discarded and the archive downloaded from the start.
+    """
+    body = os.urandom(1000)
+    destination = os.path.join(str(tmpdir), "archive.zip")
+    with open(sut.PartialDownload.part_path(destination), "wb") as fh:
+        fh.write(bytes(1000))
+    sut.PartialDownload(url=URL, length=1000, etag='"v1"', ranges=[(0, 999)], received=[600]).save(destination)
+
+    register_uri(httpretty.GET, URL, body=range_callback(body, etag='"v2"'))
+    utils.download_file(URL, destination, 0.001)
+
+    with open(destination, "rb") as fh:
+        assert fh.read() == body
+    assert sorted(request.headers["Range"] for request in httpretty.latest_requests()) == ["bytes=0-0", "bytes=0-499", "bytes=500-999"]
+
+
+@httpretty.activate
+def test_download_file_short_stream(client, tmpdir):
+    """
+    :GIVEN: A server without Range support closing the connection cleanly part way through an archive.
+    :WHEN:  Downloading the archive, then downloading it again once the server serves byte ranges.
+    :THEN:  Verify the short archive is not published but kept, and the second run continues it.
+    """
+    body = os.urandom(1000)
+    destination = os.path.join(str(tmpdir), "archive.zip")
+    res = MagicMock(headers={"Content-Length": "1000", "ETag": '"v1"'}, raw=io.BytesIO(body[:600]))
+
+    with patch.object(utils, "_plan_download", lambda url, path: None), \
+            patch.object(HttpClient, "session", lambda: MagicMock(get=lambda *args, **kwargs: res)):
+        with pytest.raises(IOError):
+            utils.download_file(URL, destination, 0.001)
+
+    assert not os.path.exists(destination)
+    assert sut.PartialDownload.load(destination).received == [600]
+
+    register_uri(httpretty.GET, URL, body=range_callback(body))
+    utils.download_file(URL, destination, 0.001)
+
+    with open(destination, "rb") as fh:
+        assert fh.read() == body
+    assert [request.headers["Range"] for request in httpretty.latest_requests()] == ["bytes=0-0", "bytes=600-999"]
@@ -0,0 +1,100 @@
+"""
+Author:     David Walshe
+Date:       17 October 2026
+"""
+
+import io
+import json
+import threading
+
+import pytest
+
+from sla_cli.src.common.events import EventStream
+from sla_cli.src.common.progress import Progress, progress_bar
+from sla_cli.src.download.scheduler import DownloadScheduler, DownloadJob
+
+
+def make_job(name, size, calls, barrier=None, fail=False):
+    """Returns a job recording its name when run."""
+
+    def run():
+        if barrier is not None:
+            barrier.wait(timeout=5)
+        with progress_bar(10, title=f"Downloading {name}") as bar:
+            bar(incr=10)
+        calls.append(name)
+        if fail:
+            raise ValueError("Broken download.")
+
+    return DownloadJob(name=name, size=size, run=run)
+
+
+def test_run_sequential_smallest_first():
+    """
+    :GIVEN: A scheduler running one dataset at a time.
+    :WHEN:  Running jobs of different sizes.
+    :THEN:  Verify the jobs run smallest first, without a combined progress view.
+    """
+    calls = []
+    jobs = [make_job("bcn_20000", 12000, calls), make_job("ph2", 200, calls), make_job("mednode", 30, calls)]
+
+    failed = DownloadScheduler(max_datasets=1).run(jobs)
+
+    assert calls == ["mednode", "ph2", "bcn_20000"]
+    assert failed == []
+    assert Progress.reporter is None
+
+
+def test_run_concurrent():
+    """
+    :GIVEN: A scheduler running several datasets at a time.
+    :WHEN:  Running jobs that wait for each other to start.
+    :THEN:  Verify the jobs run at the same time and the combined view is removed afterwards.
+    """
+    calls = []
+    barrier = threading.Barrier(3)
+    jobs = [make_job(name, size, calls, barrier) for name, size in [("ham10000", 3000), ("ph2", 200), ("mednode", 30)]]
+
+    failed = DownloadScheduler(max_datasets=3).run(jobs)
+
+    assert sorted(calls) == ["ham10000", "mednode", "ph2"]
+    assert failed == []
+    assert Progress.reporter is None
+
+
+@pytest.mark.parametrize("max_datasets", [1, 2])
+def test_run_reports_failures(max_datasets):
+    """
+    :GIVEN: A scheduler and a job that fails.
+    :WHEN:  Running the jobs.
+    :THEN:  Verify the other jobs still run and the failed dataset is returned.
+    """
+    calls = []
+    jobs = [make_job("ph2", 200, calls, fail=True), make_job("mednode", 30, calls)]
+
+    failed = DownloadScheduler(max_datasets=max_datasets).run(jobs)
+
+    assert sorted(calls) == ["mednode", "ph2"]
+    assert failed == ["ph2"]
+
+
+def test_run_events(monkeypatch):
+    """
+    :GIVEN: Progress reported as events.
+    :WHEN:  Running several jobs at the same time, one failing.
+    :THEN:  Verify no combined view is shown and each job's start, end or error is written as an event.
+    """
+    stream = io.StringIO()
+    monkeypatch.setattr(Progress, "events", EventStream(stream, interval=60))
+    calls = []
+    jobs = [make_job("ph2", 200, calls), make_job("mednode", 30, calls, fail=True)]
+
+    failed = DownloadScheduler(max_datasets=2).run(jobs)
+
+    events = [json.loads(line) for line in stream.getvalue().splitlines()]
+    jobs = {(event["task"], event["state"]) for event in events if event["event"] == "job"}
+    phases = {event["task"] for event in events if event["event"] == "phase"}
+
+    assert failed == ["mednode"]
+    assert jobs == {("ph2", "start"), ("ph2", "end"), ("mednode", "start"), ("mednode", "error")}
+    assert phases == {"ph2", "mednode"}
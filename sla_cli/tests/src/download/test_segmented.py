@@ -0,0 +1,176 @@
+"""
+Author:     David Walshe
+Date:       17 October 2026
+"""
+
+import os
+import re
+import threading
+import hashlib
+
+import pytest
+import httpretty
+from httpretty import register_uri
+from unittest.mock import MagicMock, patch
+
+import sla_cli.src.download.segmented as sut
+import sla_cli.src.download.utils as utils
+from sla_cli.src.common.config import Http
+from sla_cli.src.download.http import RetryingSession, HttpClient
+
+URL = "https://skinclass.de/MClass/MClass-D.zip"
+
+
+def range_callback(body: bytes):
+    """Returns a httpretty callback serving byte ranges of a body, as a server supporting Range requests would."""
+
+    def callback(request, uri, headers):
+        match = re.match(r"bytes=(\d+)-(\d+)", request.headers.get("Range", ""))
+        if match is None:
+            return 200, headers, body
+        start, end = int(match.group(1)), min(int(match.group(2)), len(body) - 1)
+        headers["Content-Range"] = f"bytes {start}-{end}/{len(body)}"
+        headers["ETag"] = '"v1"'
+        return 206, headers, body[start:end + 1]
+
+    return callback
+
+
+@pytest.mark.parametrize("length, segments, min_segment_size, expected",
+                         [
+                             (10, 3, 1, [(0, 3), (4, 6), (7, 9)]),
+                             (10, 4, 5, [(0, 4), (5, 9)]),
+                             (10, 4, 20, [(0, 9)]),
+                             (8, 1, 1, [(0, 7)]),
+                         ])
+def test_split_ranges(length, segments, min_segment_size, expected):
+    """
+    :GIVEN: A resource length, a number of segments and a minimum segment size.
+    :WHEN:  Splitting the resource into byte ranges.
+    :THEN:  Verify the ranges cover every byte once, with no range below the minimum size.
+    """
+    assert sut.split_ranges(length, segments, min_segment_size) == expected
+
+
+@httpretty.activate
+@pytest.mark.parametrize("ranged, expected", [(True, sut.RemoteFile(1000, '"v1"')), (False, None)])
+def test_probe_range_support(ranged, expected):
+    """
+    :GIVEN: A server that does or does not serve byte ranges.
+    :WHEN:  Probing it for Range support.
+    :THEN:  Verify the resource length and ETag are found only when ranges are served.
+    """
+    body = os.urandom(1000)
+    register_uri(httpretty.GET, URL, body=range_callback(body) if ranged else body)
+
+    assert sut.probe_range_support(RetryingSession(Http(retries=0), pool_size=4), URL) == expected
+
+
+@httpretty.activate
+@pytest.mark.parametrize("ranged, expected_requests", [(True, 5), (False, 2)])
+def test_download_file_segmented(ranged, expected_requests, tmpdir):
+    """
+    :GIVEN: A server that does or does not serve byte ranges.
+    :WHEN:  Downloading an archive from it.
+    :THEN:  Verify the archive is fetched over parallel ranges when supported, falling back to a single stream.
+    """
+    body = os.urandom(100000)
+    register_uri(httpretty.GET, URL, body=range_callback(body) if ranged else body)
+
+    dst_path = os.path.join(str(tmpdir), "archive.zip")
+    with patch.object(HttpClient, "_settings", Http(retries=0, segments=4, min_segment_size=0.01)), \
+            patch.object(HttpClient, "_session", None):
+        utils.download_file(URL, dst_path, 0.1)
+
+    with open(dst_path, "rb") as fh:
+        assert fh.read() == body
+    assert len(httpretty.latest_requests()) == expected_requests
+
+
+@httpretty.activate
+def test_segmented_download_short_range(tmpdir):
+    """
+    :GIVEN: A server sending fewer bytes than requested for a range.
+    :WHEN:  Downloading the resource over ranges.
+    :THEN:  Verify the download fails its length check.
+    """
+    register_uri(httpretty.GET, URL, status=206, body=b"short")
+
+    download = sut.SegmentedDownload(RetryingSession(Http(retries=0), pool_size=4), URL, os.path.join(str(tmpdir), "archive.zip"), 20, [(0, 9), (10, 19)])
+
+    with pytest.raises(IOError):
+        download.run()
+
+
+def test_segmented_download_closes_ignored_range(tmpdir):
+    """
+    :GIVEN: A server answering a Range request with the whole resource.
+    :WHEN:  Downloading the resource over ranges.
+    :THEN:  Verify the download fails and the response is closed, returning its connection to the pool.
+    """
+    res = MagicMock(status_code=200)
+    res.__enter__.return_value = res
+    session = MagicMock(get=MagicMock(return_value=res))
+
+    download = sut.SegmentedDownload(session, URL, os.path.join(str(tmpdir), "archive.zip"), 10, [(0, 9)])
+
+    with pytest.raises(IOError, match="status 200"):
+        download.run()
+    res.__exit__.assert_called_once()
+
+
+@httpretty.activate
+def test_segmented_download_continues(tmpdir):
+    """
+    :GIVEN: A file holding the first bytes of each range of a previous download.
+    :WHEN:  Continuing the download.
+    :THEN:  Verify only the remaining bytes of each range are requested and the file is complete.
+    """
+    body = os.urandom(1000)
+    register_uri(httpretty.GET, URL, body=range_callback(body))
+
+    path = os.path.join(str(tmpdir), "archive.zip")
+    with open(path, "wb") as fh:
+        fh.write(body[:100] + bytes(400) + body[500:650] + bytes(350))
+
+    checkpoints = []
+    download = sut.SegmentedDownload(RetryingSession(Http(retries=0), pool_size=4), URL, path, 1000, [(0, 499), (500, 999)],
+                                     offsets=[100, 150], on_checkpoint=checkpoints.append)
+    download.run()
+
+    with open(path, "rb") as fh:
+        assert fh.read() == body
+    assert sorted(request.headers["Range"] for request in httpretty.latest_requests()) == ["bytes=100-499", "bytes=650-999"]
+    assert checkpoints[-1] == [500, 500]
+
+
+@httpretty.activate
+@pytest.mark.parametrize("offsets", [None, [100, 150]])
+def test_segmented_download_hash(offsets, tmpdir):
+    """
+    :GIVEN: A resource downloaded over ranges, fresh or continuing a previous download.
+    :WHEN:  Hashing the resource as it arrives.
+    :THEN:  Verify the digest is that of the whole resource, in byte order, read back off the range writers.
+    """
+    body = os.urandom(1000)
+    register_uri(httpretty.GET, URL, body=range_callback(body))
+
+    path = os.path.join(str(tmpdir), "archive.zip")
+    with open(path, "wb") as fh:
+        fh.write(body[:100] + bytes(400) + body[500:650] + bytes(350))
+
+    download = sut.SegmentedDownload(RetryingSession(Http(retries=0), pool_size=4), URL, path, 1000, [(0, 499), (500, 999)],
+                                     offsets=offsets, hasher=hashlib.sha256())
+    catch_up_hash = download._catch_up_hash
+    threads = []
+
+    def read_back(end):
+        threads.append(threading.current_thread().name)
+        catch_up_hash(end)
+
+    download._catch_up_hash = read_back
+    download.run()
+
+    assert download.hexdigest() == hashlib.sha256(body).hexdigest()
+    # The range writers never read the file back, so never wait on it.
+    assert threads and not any(name.startswith("ThreadPoolExecutor") for name in threads)
@@ -0,0 +1,147 @@
+"""
+Author:     David Walshe
+Date:       17 October 2026
+"""
+
+import io
+import os
+from zipfile import ZipFile, ZIP_STORED, ZIP_DEFLATED, BadZipFile
+
+import pytest
+
+import sla_cli.src.download.stream_zip as sut
+
+
+class Unseekable(io.RawIOBase):
+    """Write-only stream forcing zipfile to emit data descriptors, as a streamed HTTP response would."""
+
+    def __init__(self):
+        self.buffer = bytearray()
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.buffer += data
+        return len(data)
+
+
+def make_archive(members: dict, compression: int, streamed: bool) -> bytes:
+    """Creates a ZIP archive in memory from a mapping of member name to content."""
+    stream = Unseekable() if streamed else io.BytesIO()
+    with ZipFile(stream, "w", compression=compression) as zf:
+        for name, content in members.items():
+            zf.writestr(name, content)
+
+    return bytes(stream.buffer) if streamed else stream.getvalue()
+
+
+@pytest.fixture
+def members():
+    """Returns archive members shaped like an ISIC batch download."""
+    return {
+        "ISIC-images/UDA-1/ISIC_0000000.jpg": os.urandom(5000) + b"PK\x07\x08" + os.urandom(100),
+        "ISIC-images/UDA-1/ISIC_0000001.jpg": b"\x00" * 20000,
+        "ISIC-images/UDA-1/ISIC_0000000.txt": b"CC-0",
+        "ISIC-images/UDA-1/empty.jpg": b"",
+    }
+
+
+@pytest.mark.parametrize("compression", [ZIP_STORED, ZIP_DEFLATED])
+@pytest.mark.parametrize("streamed", [True, False])
+@pytest.mark.parametrize("chunk_size", [1, 7, 1024, 10 ** 6])
+def test_extract(compression, streamed, chunk_size, members, tmpdir):
+    """
+    :GIVEN: A ZIP archive, with or without data descriptors, split into chunks.
+    :WHEN:  Feeding the chunks to the streaming extractor.
+    :THEN:  Verify every member is extracted with the original content.
+    """
+    archive = make_archive(members, compression, streamed)
+
+    with sut.StreamingZipExtractor(str(tmpdir)) as extractor:
+        for i in range(0, len(archive), chunk_size):
+            extractor.write(archive[i:i + chunk_size])
+
+    assert len(extractor.extracted) == len(members)
+    for name, content in members.items():
+        with open(os.path.join(str(tmpdir), *name.split("/")), "rb") as fh:
+            assert fh.read() == content
+
+
+def test_extract_keep(members, tmpdir):
+    """
+    :GIVEN: A ZIP archive and a predicate rejecting '.txt' members.
+    :WHEN:  Streaming the archive through the extractor.
+    :THEN:  Verify the rejected members are not written.
+    """
+    archive = make_archive(members, ZIP_DEFLATED, True)
+
+    with sut.StreamingZipExtractor(str(tmpdir), keep=lambda name: not name.endswith(".txt")) as extractor:
+        extractor.write(archive)
+
+    assert sorted(os.listdir(os.path.join(str(tmpdir), "ISIC-images", "UDA-1"))) == ["ISIC_0000000.jpg", "ISIC_0000001.jpg", "empty.jpg"]
+
+
+@pytest.mark.parametrize("compression", [ZIP_STORED, ZIP_DEFLATED])
+def test_extract_truncated(compression, members, tmpdir):
+    """
+    :GIVEN: A ZIP archive cut off part way through a member.
+    :WHEN:  Closing the extractor.
+    :THEN:  Verify an error is raised and no partial member is left behind.
+    """
+    archive = make_archive(members, compression, True)
+
+    extractor = sut.StreamingZipExtractor(str(tmpdir))
+    extractor.write(archive[:3000])
+
+    with pytest.raises(BadZipFile):
+        extractor.close()
+
+    assert extractor.extracted == []
+    assert os.listdir(os.path.join(str(tmpdir), "ISIC-images", "UDA-1")) == []
+
+
+def test_extract_not_a_zip(tmpdir):
+    """
+    :GIVEN: A response body that is not a ZIP archive.
+    :WHEN:  Feeding it to the extractor.
+    :THEN:  Verify a BadZipFile error is raised.
+    """
+    with pytest.raises(BadZipFile):
+        sut.StreamingZipExtractor(str(tmpdir)).write(b"<html>Service Unavailable</html>")
+
+
+@pytest.mark.parametrize("name, expected",
+                         [
+                             ("ISIC-images/UDA-1/ISIC_0000000.jpg", os.path.join("dst", "ISIC-images", "UDA-1", "ISIC_0000000.jpg")),
+                             ("./a/b.jpg", os.path.join("dst", "a", "b.jpg")),
+                             ("/etc/passwd", os.path.join("dst", "etc", "passwd")),
+                             ("../../etc/passwd", None),
+                             ("a/../../b", None),
+                         ])
+def test_safe_member_path(name, expected):
+    """
+    :GIVEN: An archive member name.
+    :WHEN:  Resolving its extraction path.
+    :THEN:  Verify names escaping the destination are rejected.
+    """
+    assert sut.safe_member_path("dst", name) == expected
+
+
+def test_extract_route(tmpdir):
+    """
+    :GIVEN: A ZIP archive and a route sending each member to its own destination or nowhere.
+    :WHEN:  Streaming the archive through the extractor.
+    :THEN:  Verify each member is written under its routed destination and unrouted members are skipped.
+    """
+    archive = make_archive({"a/1.jpg": b"one", "b/2.jpg": b"two", "c/3.jpg": b"three"}, ZIP_DEFLATED, True)
+    routes = {"a/1.jpg": os.path.join(str(tmpdir), "first"), "b/2.jpg": os.path.join(str(tmpdir), "second")}
+
+    with sut.StreamingZipExtractor(None, route=routes.get) as extractor:
+        extractor.write(archive)
+
+    assert sorted(os.listdir(str(tmpdir))) == ["first", "second"]
+    with open(os.path.join(str(tmpdir), "first", "a", "1.jpg"), "rb") as fh:
+        assert fh.read() == b"one"
+    with open(os.path.join(str(tmpdir), "second", "b", "2.jpg"), "rb") as fh:
+        assert fh.read() == b"two"
@@ -0,0 +1,81 @@
+"""
+Author:     David Walshe
+Date:       17 October 2026
+"""
+
+import os
+import gzip
+
+import pytest
+import httpretty
+from requests.exceptions import ChunkedEncodingError, ConnectionError, RequestException
+from urllib3.exceptions import ProtocolError, ReadTimeoutError
+from httpretty import register_uri
+from unittest.mock import patch
+
+import sla_cli.src.download.transfer as sut
+from sla_cli.src.common.config import Http
+from sla_cli.src.download.http import RetryingSession
+
+URL = "https://www.dropbox.com/s/k88qukc20ljnbuo/PH2Dataset.rar?dl=1"
+
+
+@httpretty.activate
+@pytest.mark.parametrize("size", [1, 1000, 4096, 10 ** 6])
+def test_copy_response(size):
+    """
+    :GIVEN: A streamed response.
+    :WHEN:  Copying it through buffers of different sizes.
+    :THEN:  Verify every byte is copied in order, in blocks no larger than the buffer.
+    """
+    body = os.urandom(5000)
+    register_uri(httpretty.GET, URL, body=body)
+    res = RetryingSession(Http(retries=0), pool_size=4).get(URL, stream=True)
+
+    blocks = []
+    copied = sut.copy_response(res, lambda block: blocks.append(bytes(block)), size=size)
+
+    assert copied == len(body)
+    assert b"".join(blocks) == body
+    assert max(len(block) for block in blocks) <= size
+    assert res.raw.decode_content is False
+
+
+@httpretty.activate
+@pytest.mark.parametrize("body", [os.urandom(2000), bytes(10 ** 6)])
+def test_copy_response_decodes_content(body):
+    """
+    :GIVEN: A response compressed with a Content-Encoding, incompressible or decoding to far more than the buffer.
+    :WHEN:  Copying it.
+    :THEN:  Verify the decoded body is copied, as iter_content would give, never read into the fixed buffer.
+    """
+    register_uri(httpretty.GET, URL, body=gzip.compress(body), adding_headers={"Content-Encoding": "gzip"})
+    res = RetryingSession(Http(retries=0), pool_size=4).get(URL, stream=True)
+
+    blocks = []
+    with patch.object(res.raw, "readinto", side_effect=AssertionError("Decoded into a fixed buffer.")):
+        copied = sut.copy_response(res, lambda block: blocks.append(bytes(block)), size=512)
+
+    assert copied == len(body)
+    assert b"".join(blocks) == body
+
+
+@httpretty.activate
+@pytest.mark.parametrize("error, expected",
+                         [
+                             (ProtocolError("Connection broken."), ChunkedEncodingError),
+                             (ReadTimeoutError(None, URL, "Read timed out."), ConnectionError),
+                         ])
+def test_copy_response_wraps_errors(error, expected):
+    """
+    :GIVEN: A streamed response whose connection breaks or times out mid body.
+    :WHEN:  Copying it.
+    :THEN:  Verify the urllib3 error is raised as the matching requests error.
+    """
+    register_uri(httpretty.GET, URL, body=os.urandom(5000))
+    res = RetryingSession(Http(retries=0), pool_size=4).get(URL, stream=True)
+
+    with patch.object(res.raw, "readinto", side_effect=error), pytest.raises(expected) as e:
+        sut.copy_response(res, lambda block: None)
+
+    assert isinstance(e.value, RequestException)